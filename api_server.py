@@ -0,0 +1,571 @@
+import argparse
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+from collections.abc import Awaitable, Callable
+from http import HTTPStatus
+from typing import Any
+from urllib.parse import parse_qsl
+from urllib.parse import urlsplit
+
+from async_db import AsyncAuthManager
+from async_db import AsyncContactManager
+from async_db import AsyncDatabaseManager
+from reges import isValidEmail
+from reges import isValidPhone
+from schemas.contacts import Contact
+from sessions import SESSION_TTL
+from sessions import SessionManager
+
+"""HTTP/JSON API для работы с контактами по локальной сети
+
+Сервер написан на asyncio без сторонних зависимостей и работает поверх
+AsyncAuthManager и AsyncContactManager: чтения выполняются в пуле потоков,
+записи пачками в потоке-писателе. Соединения HTTP/1.1 по умолчанию остаются
+открытыми (keep-alive), поэтому клиент не тратит время на новое TCP-соединение
+для каждого запроса.
+
+Методы:
+    POST   /register               {"username", "password"}
+    POST   /login                  {"username", "password"} -> {"token"}
+    POST   /logout
+    GET    /contacts?limit=&after=&before=
+    POST   /contacts               {"first_name", "last_name", "phone", "email"}
+    GET    /contacts/search?q=&limit=
+    GET    /contacts/<id>
+    PATCH  /contacts/<id>          любые поля контакта
+    DELETE /contacts/<id>
+
+Все методы, кроме /register и /login, требуют заголовок
+"Authorization: Bearer <token>".
+
+Пример запуска: python api_server.py --db contacts.db --port 8080"""
+
+logger = logging.getLogger("contacts.api")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+KEEP_ALIVE_TIMEOUT = 15.0
+MAX_HEADER_LINES = 100
+MAX_BODY_SIZE = 1024 * 1024
+MAX_PAGE_SIZE = 500
+SESSION_PURGE_INTERVAL = 60.0
+CONTACT_FIELDS = ("first_name", "last_name", "phone", "email")
+
+Handler = Callable[..., Awaitable[tuple[int, Any]]]
+
+
+class HTTPError(Exception):
+    """
+    Ошибка, которая возвращается клиенту как JSON {"error": message}
+
+    Attributes:
+        status (int): Код ответа HTTP
+        message (str): Описание ошибки
+    """
+
+    def __init__(self, status: int, message: str) -> None:
+        """
+        Инициализирует ошибку
+
+        Args:
+            status (int): Код ответа HTTP
+            message (str): Описание ошибки
+        """
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    """
+    Разобранный HTTP-запрос
+
+    Attributes:
+        method (str): Метод запроса
+        path (str): Путь без строки запроса
+        query (dict[str, str]): Параметры строки запроса
+        headers (dict[str, str]): Заголовки с именами в нижнем регистре
+        body (bytes): Тело запроса
+        version (str): Версия протокола, например "HTTP/1.1"
+    """
+
+    def __init__(
+        self,
+        method: str,
+        target: str,
+        version: str,
+        headers: dict[str, str],
+        body: bytes = b"",
+    ) -> None:
+        """Инициализирует запрос, разбирая путь и строку запроса"""
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path
+        self.query = dict(parse_qsl(url.query))
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self) -> bool:
+        """Нужно ли оставить соединение открытым после ответа"""
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self) -> dict[str, Any]:
+        """
+        Разбирает тело запроса как JSON-объект
+
+        Returns:
+            dict[str, Any]: Объект из тела запроса, пустой словарь для пустого тела
+        """
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Тело запроса не является JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Ожидается JSON-объект")
+        return data
+
+
+async def read_request(reader: asyncio.StreamReader) -> Request | None:
+    """
+    Читает один HTTP-запрос из потока
+
+    Args:
+        reader (asyncio.StreamReader): Поток соединения
+
+    Returns:
+        Request | None: Запрос или None, если клиент закрыл соединение
+    """
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Некорректная строка запроса")
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HTTPError(
+            HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Слишком много заголовков"
+        )
+    if "transfer-encoding" in headers:
+        raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "Нужен заголовок Content-Length")
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Некорректный Content-Length")
+    if length > MAX_BODY_SIZE:
+        raise HTTPError(
+            HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Слишком большое тело запроса"
+        )
+    body = await reader.readexactly(length) if length > 0 else b""
+    return Request(method.upper(), target, version, headers, body)
+
+
+def render_response(status: int, payload: Any, keep_alive: bool) -> bytes:
+    """
+    Собирает HTTP-ответ с JSON-телом
+
+    Args:
+        status (int): Код ответа
+        payload (Any): Данные для JSON или None для пустого ответа
+        keep_alive (bool): Оставить ли соединение открытым
+
+    Returns:
+        bytes: Ответ целиком
+    """
+    body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode()
+    headers = [
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+        f"Content-Length: {len(body)}",
+    ]
+    if body:
+        headers.append("Content-Type: application/json; charset=utf-8")
+    if keep_alive:
+        headers.append("Connection: keep-alive")
+        headers.append(f"Keep-Alive: timeout={KEEP_ALIVE_TIMEOUT:.0f}")
+    else:
+        headers.append("Connection: close")
+    return ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body
+
+
+def _int_param(
+    query: dict[str, str], name: str, default: int | None = None
+) -> int | None:
+    """Возвращает целочисленный параметр строки запроса"""
+    if name not in query:
+        return default
+    try:
+        return int(query[name])
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Параметр {name} должен быть числом")
+
+
+def _string_field(data: dict[str, Any], name: str) -> str:
+    """Возвращает обязательное строковое поле тела запроса"""
+    value = data.get(name)
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Поле {name} обязательно")
+    return value.strip()
+
+
+def _validate_contact(fields: dict[str, str]) -> None:
+    """Проверяет номер телефона и почту так же, как консольное приложение"""
+    if "phone" in fields and not isValidPhone(fields["phone"]):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Некорректный номер телефона")
+    if "email" in fields and not isValidEmail(fields["email"]):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Некорректный email")
+
+
+def _bearer_token(request: Request) -> str:
+    """Возвращает токен из заголовка "Authorization: Bearer <token>" или пустую строку"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return token.strip() if scheme.lower() == "bearer" else ""
+
+
+class ContactsAPI:
+    """
+    Этот класс обрабатывает запросы API и обслуживает соединения клиентов
+
+    Токены выдаются при входе через SessionManager: проверка токена в каждом
+    запросе - поиск в словаре без обращения к базе, а сессии сохраняются
+    в таблице sessions и переживают перезапуск сервера. Запись сессий идет
+    через поток-писатель, как и остальные записи
+
+    Attributes:
+        db (AsyncDatabaseManager): Асинхронный менеджер базы данных
+        auth (AsyncAuthManager): Асинхронный менеджер аутентификации
+        contacts (AsyncContactManager): Асинхронный менеджер контактов
+        sessions (SessionManager): Менеджер сессий
+    """
+
+    def __init__(
+        self, db_manager: AsyncDatabaseManager, session_ttl: float = SESSION_TTL
+    ) -> None:
+        """
+        Инициализирует API и таблицу маршрутов
+
+        Args:
+            db_manager (AsyncDatabaseManager): Асинхронный менеджер базы данных
+            session_ttl (float): Время жизни токена в секундах. По умолчанию 12 часов
+        """
+        self.db = db_manager
+        self.auth = AsyncAuthManager(db_manager)
+        self.contacts = AsyncContactManager(db_manager)
+        self.sessions = SessionManager(db_manager.db, session_ttl)
+        # Сессии загружены из потока цикла событий, его соединение возвращается
+        # в пул, иначе потокам чтения и писателю не хватит соединений
+        db_manager.db.release_connection()
+        self.routes: list[tuple[str, re.Pattern, Handler, bool]] = [
+            ("POST", re.compile(r"/register"), self.register, False),
+            ("POST", re.compile(r"/login"), self.login, False),
+            ("POST", re.compile(r"/logout"), self.logout, True),
+            ("GET", re.compile(r"/contacts"), self.list_contacts, True),
+            ("POST", re.compile(r"/contacts"), self.add_contact, True),
+            ("GET", re.compile(r"/contacts/search"), self.search_contacts, True),
+            ("GET", re.compile(r"/contacts/(\d+)"), self.get_contact, True),
+            ("PATCH", re.compile(r"/contacts/(\d+)"), self.edit_contact, True),
+            ("DELETE", re.compile(r"/contacts/(\d+)"), self.delete_contact, True),
+        ]
+
+    def authenticate(self, request: Request) -> int:
+        """
+        Возвращает пользователя по токену из заголовка Authorization
+
+        Args:
+            request (Request): Запрос
+
+        Returns:
+            int: Идентификатор пользователя
+        """
+        user_id = self.sessions.validate(_bearer_token(request))
+        if user_id is None:
+            raise HTTPError(HTTPStatus.UNAUTHORIZED, "Нужен действительный токен")
+        return user_id
+
+    async def dispatch(self, request: Request) -> tuple[int, Any]:
+        """
+        Находит обработчик запроса и выполняет его
+
+        Args:
+            request (Request): Запрос
+
+        Returns:
+            tuple[int, Any]: Код ответа и данные для JSON
+        """
+        allowed = False
+        for method, pattern, handler, needs_auth in self.routes:
+            match = pattern.fullmatch(request.path)
+            if match is None:
+                continue
+            if method != request.method:
+                allowed = True
+                continue
+            args = [self.authenticate(request)] if needs_auth else []
+            args += [int(group) for group in match.groups()]
+            return await handler(request, *args)
+        if allowed:
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Метод не поддерживается")
+        raise HTTPError(HTTPStatus.NOT_FOUND, "Неизвестный путь")
+
+    async def handle(self, request: Request) -> tuple[int, Any]:
+        """
+        Выполняет запрос и превращает ошибки в ответы
+
+        Непредвиденная ошибка записывается в журнал и превращается в ответ 500,
+        после которого сервер закрывает соединение
+
+        Args:
+            request (Request): Запрос
+
+        Returns:
+            tuple[int, Any]: Код ответа и данные для JSON
+        """
+        try:
+            return await self.dispatch(request)
+        except HTTPError as error:
+            return error.status, {"error": error.message}
+        except sqlite3.IntegrityError:
+            return HTTPStatus.CONFLICT, {"error": "Запись конфликтует с существующей"}
+        except Exception:
+            logger.exception("Ошибка при обработке %s %s", request.method, request.path)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {
+                "error": "Внутренняя ошибка сервера"
+            }
+
+    async def serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Обслуживает одно соединение, пока клиент держит его открытым
+
+        Args:
+            reader (asyncio.StreamReader): Поток чтения соединения
+            writer (asyncio.StreamWriter): Поток записи соединения
+        """
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(
+                        read_request(reader), KEEP_ALIVE_TIMEOUT
+                    )
+                except HTTPError as error:
+                    writer.write(
+                        render_response(error.status, {"error": error.message}, False)
+                    )
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                status, payload = await self.handle(request)
+                keep_alive = (
+                    request.keep_alive and status != HTTPStatus.INTERNAL_SERVER_ERROR
+                )
+                writer.write(render_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def register(self, request: Request) -> tuple[int, Any]:
+        """Регистрирует пользователя"""
+        data = request.json()
+        username = _string_field(data, "username")
+        password = _string_field(data, "password")
+        try:
+            await self.auth.register_user(username, password)
+        except sqlite3.IntegrityError:
+            raise HTTPError(HTTPStatus.CONFLICT, "Имя пользователя уже занято")
+        return HTTPStatus.CREATED, {"username": username}
+
+    async def login(self, request: Request) -> tuple[int, Any]:
+        """Проверяет пароль и выдает токен"""
+        data = request.json()
+        user_id = await self.auth.login(
+            _string_field(data, "username"), _string_field(data, "password")
+        )
+        if user_id is None:
+            raise HTTPError(
+                HTTPStatus.UNAUTHORIZED, "Неверное имя пользователя или пароль"
+            )
+        # Память меняется только после фиксации: пачку писателя могут откатить
+        # и повторить операции по одной
+        token, session = await self.db.run_write(
+            lambda _db: self.sessions.store(user_id)
+        )
+        self.sessions.remember(*session)
+        return HTTPStatus.OK, {"token": token, "user_id": user_id}
+
+    async def logout(self, request: Request, user_id: int) -> tuple[int, Any]:
+        """Отзывает токен запроса"""
+        token = _bearer_token(request)
+        token_hash = await self.db.run_write(lambda _db: self.sessions.delete(token))
+        self.sessions.forget(token_hash)
+        return HTTPStatus.NO_CONTENT, None
+
+    async def list_contacts(self, request: Request, user_id: int) -> tuple[int, Any]:
+        """Возвращает страницу контактов, листание по after и before"""
+        limit = _int_param(request.query, "limit", 50)
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"limit от 1 до {MAX_PAGE_SIZE}")
+        page = await self.contacts.view_contacts_page(
+            user_id,
+            limit,
+            _int_param(request.query, "after"),
+            _int_param(request.query, "before"),
+        )
+        return HTTPStatus.OK, {
+            "contacts": [contact.as_dict() for contact in page],
+            "next_after": page[-1].id if len(page) == limit else None,
+        }
+
+    async def add_contact(self, request: Request, user_id: int) -> tuple[int, Any]:
+        """Добавляет контакт, если у пользователя нет такого номера"""
+        data = request.json()
+        fields = {field: _string_field(data, field) for field in CONTACT_FIELDS}
+        _validate_contact(fields)
+        contact_id = await self.contacts.add_contact(user_id, **fields)
+        if contact_id is None:
+            raise HTTPError(
+                HTTPStatus.CONFLICT, "Контакт с таким номером телефона уже существует"
+            )
+        return HTTPStatus.CREATED, {"id": contact_id, "user_id": user_id, **fields}
+
+    async def search_contacts(self, request: Request, user_id: int) -> tuple[int, Any]:
+        """Ищет контакты пользователя"""
+        query = request.query.get("q", "").strip()
+        if not query:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Параметр q обязателен")
+        limit = _int_param(request.query, "limit", 50)
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"limit от 1 до {MAX_PAGE_SIZE}")
+        contacts = await self.contacts.search_contacts(user_id, query, limit)
+        return HTTPStatus.OK, {"contacts": [contact.as_dict() for contact in contacts]}
+
+    async def _own_contact(self, user_id: int, contact_id: int) -> Contact:
+        """Возвращает контакт, если он принадлежит пользователю"""
+        contact = await self.contacts.view_contact_details(contact_id)
+        if contact is None or contact.user_id != user_id:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "Контакт не найден")
+        return contact
+
+    async def get_contact(
+        self, request: Request, user_id: int, contact_id: int
+    ) -> tuple[int, Any]:
+        """Возвращает контакт"""
+        return HTTPStatus.OK, (await self._own_contact(user_id, contact_id)).as_dict()
+
+    async def edit_contact(
+        self, request: Request, user_id: int, contact_id: int
+    ) -> tuple[int, Any]:
+        """Изменяет переданные поля контакта"""
+        data = request.json()
+        fields = {
+            field: _string_field(data, field)
+            for field in CONTACT_FIELDS
+            if field in data
+        }
+        if not fields:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Нет полей для изменения")
+        _validate_contact(fields)
+        await self._own_contact(user_id, contact_id)
+        await self.contacts.edit_contact(contact_id, **fields)
+        return HTTPStatus.OK, (await self._own_contact(user_id, contact_id)).as_dict()
+
+    async def delete_contact(
+        self, request: Request, user_id: int, contact_id: int
+    ) -> tuple[int, Any]:
+        """Удаляет контакт"""
+        await self._own_contact(user_id, contact_id)
+        await self.contacts.delete_contact(contact_id)
+        return HTTPStatus.NO_CONTENT, None
+
+
+async def purge_sessions(api: ContactsAPI, interval: float) -> None:
+    """
+    Периодически удаляет истекшие сессии
+
+    Args:
+        api (ContactsAPI): API, сессии которого нужно чистить
+        interval (float): Интервал между очистками в секундах
+    """
+    while True:
+        await asyncio.sleep(interval)
+        await api.db.run_write(lambda _db: api.sessions.purge_expired())
+
+
+async def serve(
+    db_name: str,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    max_workers: int = 4,
+    search_mode: str = "like",
+    session_ttl: float = SESSION_TTL,
+) -> None:
+    """
+    Запускает сервер и обслуживает клиентов до отмены
+
+    Args:
+        db_name (str): Имя файла базы данных
+        host (str): Адрес для прослушивания. По умолчанию только локальный
+        port (int): Порт. По умолчанию 8080
+        max_workers (int): Количество потоков чтения. По умолчанию 4
+        search_mode (str): Способ поиска контактов. По умолчанию "like"
+        session_ttl (float): Время жизни токена в секундах. По умолчанию 12 часов
+    """
+    db_manager = AsyncDatabaseManager(db_name, max_workers, search_mode=search_mode)
+    api = ContactsAPI(db_manager, session_ttl)
+    purger = asyncio.create_task(purge_sessions(api, SESSION_PURGE_INTERVAL))
+    server = await asyncio.start_server(api.serve_connection, host, port)
+    print(f"Сервер запущен на http://{host}:{port}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        purger.cancel()
+        await db_manager.close_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP/JSON API контактов")
+    parser.add_argument("--db", default="./contacts.db")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--session-ttl", type=float, default=SESSION_TTL, help="с")
+    parser.add_argument(
+        "--search-mode", default="like", choices=["like", "fts", "fuzzy"]
+    )
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(
+            serve(
+                args.db,
+                args.host,
+                args.port,
+                args.workers,
+                args.search_mode,
+                args.session_ttl,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
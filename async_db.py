@@ -0,0 +1,447 @@
+import asyncio
+import os
+import queue
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from operator import methodcaller
+from typing import Any
+
+from db import DatabaseManager
+from schemas.contacts import Contact
+from utils import hash_password
+from utils import needs_rehash
+from utils import verify_password
+
+"""Асинхронные обертки над DatabaseManager, AuthManager и ContactManager
+
+Чтение выполняется в ограниченном пуле потоков, у каждого из которых своё
+соединение из ConnectionPool. Все операции записи передаются одному потоку-писателю,
+который забирает из очереди сразу несколько накопившихся операций и выполняет их
+в одной транзакции, поэтому при большом количестве конкурентных корутин
+commit выполняется один раз на пачку, а не на каждую операцию"""
+
+Write = tuple[Callable[..., Any], tuple, asyncio.Future, asyncio.AbstractEventLoop]
+
+
+def _resolve(
+    future: asyncio.Future, result: Any = None, error: BaseException | None = None
+) -> None:
+    """Передает результат операции в future, если его ещё ждут"""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class AsyncDatabaseManager:
+    """
+    Этот класс предоставляет асинхронный интерфейс к базе данных, не блокируя цикл событий
+
+    Attributes:
+        db (DatabaseManager): Синхронный менеджер базы данных в пуловом режиме
+        max_batch (int): Максимальное количество операций записи в одной транзакции
+    """
+
+    def __init__(
+        self,
+        db_name: str,
+        max_workers: int = 4,
+        max_batch: int = 256,
+        search_mode: str = "like",
+    ) -> None:
+        """
+        Инициализирует менеджер, пул потоков чтения и поток-писатель
+
+        Args:
+            db_name (str): Имя файла базы данных
+            max_workers (int): Количество потоков для чтения. По умолчанию 4
+            max_batch (int): Максимальное количество операций записи в одной транзакции. По умолчанию 256
+            search_mode (str): Способ поиска контактов: "like" или "fts". По умолчанию "like"
+        """
+        self.db = DatabaseManager(db_name, search_mode, pool_size=max_workers + 1)
+        self.max_batch = max_batch
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="contacts-reader"
+        )
+        self._writes: queue.Queue[Write | None] = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="contacts-writer", daemon=True
+        )
+        self._writer.start()
+
+    async def run_read(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Выполняет func(db, *args) в пуле потоков чтения"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, self.db, *args))
+
+    async def run_write(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Ставит func(db, *args) в очередь потока-писателя и ждет результата"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._writes.put((func, args, future, loop))
+        return await future
+
+    def _write_loop(self) -> None:
+        """Забирает операции записи из очереди и выполняет их пачками"""
+        while True:
+            item = self._writes.get()
+            if item is None:
+                break
+            batch = [item]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._run_batch(batch)
+            if stop:
+                break
+        self.db.release_connection()
+
+    def _run_batch(self, batch: list[Write]) -> None:
+        """
+        Выполняет пачку операций в одной транзакции
+
+        Если какая-то операция падает, транзакция откатывается и операции пачки
+        повторяются по одной, чтобы ошибка досталась только своей корутине
+        """
+        try:
+            with self.db.transaction():
+                results = [func(self.db, *args) for func, args, _, _ in batch]
+        except Exception:
+            for func, args, future, loop in batch:
+                try:
+                    with self.db.transaction():
+                        result = func(self.db, *args)
+                except Exception as error:
+                    loop.call_soon_threadsafe(_resolve, future, None, error)
+                else:
+                    loop.call_soon_threadsafe(_resolve, future, result)
+            return
+        for (_, _, future, loop), result in zip(batch, results):
+            loop.call_soon_threadsafe(_resolve, future, result)
+
+    async def add_user(self, username: str, password: str) -> None:
+        """Асинхронная версия DatabaseManager.add_user"""
+        await self.run_write(methodcaller("add_user", username, password))
+
+    async def authenticate_user(self, username: str, password: str) -> int | None:
+        """
+        Асинхронная версия DatabaseManager.authenticate_user
+
+        Чтение и проверка пароля выполняются в пуле потоков чтения, а пересчет
+        хэша старого формата, как и остальные записи, - в потоке-писателе
+        """
+        credentials = await self.run_read(
+            methodcaller("get_user_credentials", username)
+        )
+        if credentials is None:
+            return None
+        user_id, password_hash = credentials
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(
+            self._executor, verify_password, password, password_hash
+        ):
+            return None
+        if needs_rehash(password_hash):
+            new_hash = await loop.run_in_executor(
+                self._executor, hash_password, password
+            )
+            await self.run_write(
+                methodcaller("update_password_hash", user_id, new_hash)
+            )
+        return user_id
+
+    async def check_duplicate_phone(
+        self, phone: str, user_id: int | None = None
+    ) -> bool:
+        """Асинхронная версия DatabaseManager.check_duplicate_phone"""
+        return await self.run_read(
+            methodcaller("check_duplicate_phone", phone, user_id)
+        )
+
+    async def add_contact(
+        self, user_id: int, first_name: str, last_name: str, phone: str, email: str
+    ) -> int:
+        """Асинхронная версия DatabaseManager.add_contact"""
+        return await self.run_write(
+            methodcaller("add_contact", user_id, first_name, last_name, phone, email)
+        )
+
+    async def edit_contact(
+        self,
+        contact_id: int,
+        first_name: str | None = None,
+        last_name: str | None = None,
+        phone: str | None = None,
+        email: str | None = None,
+    ) -> None:
+        """Асинхронная версия DatabaseManager.edit_contact"""
+        await self.run_write(
+            methodcaller(
+                "edit_contact",
+                contact_id,
+                first_name,
+                last_name,
+                phone,
+                email,
+            )
+        )
+
+    async def delete_contact(self, contact_id: int) -> None:
+        """Асинхронная версия DatabaseManager.delete_contact"""
+        await self.run_write(methodcaller("delete_contact", contact_id))
+
+    async def search_contacts(
+        self, user_id: int, query: str, limit: int | None = None
+    ) -> list[Contact]:
+        """Асинхронная версия DatabaseManager.search_contacts"""
+        return await self.run_read(
+            methodcaller("search_contacts", user_id, query, limit)
+        )
+
+    async def get_contact_details(self, contact_id: int) -> Contact | None:
+        """Асинхронная версия DatabaseManager.get_contact_details"""
+        return await self.run_read(methodcaller("get_contact_details", contact_id))
+
+    async def get_contacts(self, user_id: int) -> list[Contact]:
+        """Асинхронная версия DatabaseManager.get_contacts"""
+        return await self.run_read(methodcaller("get_contacts", user_id))
+
+    async def get_contacts_page(
+        self,
+        user_id: int,
+        page_size: int = 50,
+        after_id: int | None = None,
+        before_id: int | None = None,
+    ) -> list[Contact]:
+        """Асинхронная версия DatabaseManager.get_contacts_page"""
+        return await self.run_read(
+            methodcaller("get_contacts_page", user_id, page_size, after_id, before_id)
+        )
+
+    async def close_connection(self) -> None:
+        """Дожидается выполнения всех операций записи и закрывает соединения"""
+        self._writes.put(None)
+        await asyncio.get_running_loop().run_in_executor(None, self._writer.join)
+        self._executor.shutdown()
+        self.db.close_connection()
+
+
+class AsyncAuthManager:
+    """
+    Этот класс отвечает за асинхронную аутентификацию пользователей
+
+    Хэширование и проверка паролей (scrypt) выполняются в отдельном пуле kdf_executor,
+    а не в потоках базы данных: scrypt отпускает GIL, поэтому всплеск входов
+    распределяется по всем ядрам и не занимает потоки чтения и поток-писатель
+
+    Attributes:
+        db (AsyncDatabaseManager): Асинхронный менеджер базы данных
+        kdf_executor (Executor): Пул для вычисления хэшей паролей
+    """
+
+    def __init__(
+        self,
+        db_manager: "AsyncDatabaseManager",
+        kdf_executor: Executor | None = None,
+    ):
+        """
+        Инициализирует объект менеджера аутентификации
+
+        Args:
+            db_manager (AsyncDatabaseManager): Асинхронный менеджер базы данных
+            kdf_executor (Executor | None): Пул потоков или процессов для хэширования паролей.
+                По умолчанию пул потоков по числу ядер
+        """
+        self.db = db_manager
+        self.kdf_executor = kdf_executor or ThreadPoolExecutor(
+            os.cpu_count(), thread_name_prefix="contacts-kdf"
+        )
+
+    async def _kdf(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Выполняет функцию хэширования в kdf_executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.kdf_executor, func, *args)
+
+    async def register_user(self, username: str, password: str) -> None:
+        """
+        Регистрирует нового пользователя
+
+        Args:
+            username (str): Имя пользователя
+            password (str): Пароль пользователя
+        """
+        password_hash = await self._kdf(hash_password, password)
+        await self.db.run_write(methodcaller("add_user_hash", username, password_hash))
+
+    async def login(self, username: str, password: str) -> int | None:
+        """
+        Аутентифицирует пользователя и возвращает его идентификатор
+
+        Хэши старого формата при успешном входе пересчитываются, как и в синхронной версии
+
+        Args:
+            username (str): Имя пользователя
+            password (str): Пароль пользователя
+
+        Returns:
+            int | None: Идентификатор пользователя, если аутентификация успешна, иначе None
+        """
+        credentials = await self.db.run_read(
+            methodcaller("get_user_credentials", username)
+        )
+        if credentials is None:
+            return None
+        user_id, password_hash = credentials
+        if not await self._kdf(verify_password, password, password_hash):
+            return None
+        if needs_rehash(password_hash):
+            new_hash = await self._kdf(hash_password, password)
+            await self.db.run_write(
+                methodcaller("update_password_hash", user_id, new_hash)
+            )
+        return user_id
+
+
+def _add_unique_contact(
+    db: DatabaseManager,
+    user_id: int,
+    first_name: str,
+    last_name: str,
+    phone: str,
+    email: str,
+) -> int | None:
+    """Добавляет контакт, если у пользователя ещё нет такого номера телефона"""
+    if db.check_duplicate_phone(phone, user_id):
+        return None
+    return db.add_contact(user_id, first_name, last_name, phone, email)
+
+
+class AsyncContactManager:
+    """
+    Этот класс асинхронно управляет контактами пользователей
+
+    Attributes:
+        db (AsyncDatabaseManager): Асинхронный менеджер базы данных
+    """
+
+    def __init__(self, db_manager: "AsyncDatabaseManager"):
+        """
+        Инициализирует объект менеджера контактов
+
+        Args:
+            db_manager (AsyncDatabaseManager): Асинхронный менеджер базы данных
+        """
+        self.db = db_manager
+
+    async def add_contact(
+        self, user_id: int, first_name: str, last_name: str, phone: str, email: str
+    ) -> int | None:
+        """
+        Добавляет контакт пользователя, предварительно проверяя уникальность номера телефона
+
+        Проверка и вставка выполняются в потоке-писателе одной операцией,
+        поэтому две конкурентные корутины не могут добавить один и тот же номер
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            first_name (str): Имя контакта
+            last_name (str): Фамилия контакта
+            phone (str): Номер телефона контакта
+            email (str): Email контакта
+
+        Returns:
+            int | None: Идентификатор добавленного контакта или None, если номер уже существует
+        """
+        return await self.db.run_write(
+            _add_unique_contact, user_id, first_name, last_name, phone, email
+        )
+
+    async def edit_contact(
+        self,
+        contact_id: int,
+        first_name: str | None = None,
+        last_name: str | None = None,
+        phone: str | None = None,
+        email: str | None = None,
+    ) -> None:
+        """
+        Редактирует контакт пользователя
+
+        Args:
+            contact_id (int): Идентификатор контакта
+            first_name (str | None): Новое имя контакта. По умолчанию None
+            last_name (str | None): Новая фамилия контакта. По умолчанию None
+            phone (str | None): Новый номер телефона контакта. По умолчанию None
+            email (str | None): Новый email контакта. По умолчанию None
+        """
+        await self.db.edit_contact(contact_id, first_name, last_name, phone, email)
+
+    async def delete_contact(self, contact_id: int) -> None:
+        """
+        Удаляет контакт пользователя
+
+        Args:
+            contact_id (int): Идентификатор контакта
+        """
+        await self.db.delete_contact(contact_id)
+
+    async def search_contacts(
+        self, user_id: int, query: str, limit: int | None = None
+    ) -> list[Contact]:
+        """
+        Поиск контактов пользователя
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            query (str): Поисковый запрос
+            limit (int | None): Максимальное количество результатов. По умолчанию без ограничения
+
+        Returns:
+            list[Contact]: Найденные контакты
+        """
+        return await self.db.search_contacts(user_id, query, limit)
+
+    async def view_contact_details(self, contact_id: int) -> Contact | None:
+        """
+        Получение детальной информации о контакте
+
+        Args:
+            contact_id (int): Идентификатор контакта
+
+        Returns:
+            Contact | None: Контакт или None, если он не найден
+        """
+        return await self.db.get_contact_details(contact_id)
+
+    async def view_contacts_page(
+        self,
+        user_id: int,
+        page_size: int = 20,
+        after_id: int | None = None,
+        before_id: int | None = None,
+    ) -> list[Contact]:
+        """
+        Получение одной страницы контактов пользователя
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            page_size (int): Количество контактов на странице. По умолчанию 20
+            after_id (int | None): Страница после контакта с этим id. По умолчанию None
+            before_id (int | None): Страница перед контактом с этим id. По умолчанию None
+
+        Returns:
+            list[Contact]: Контакты страницы в порядке возрастания id
+        """
+        return await self.db.get_contacts_page(user_id, page_size, after_id, before_id)
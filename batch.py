@@ -0,0 +1,289 @@
+import json
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import Any, TextIO
+
+from db import DatabaseManager
+from reges import isValidEmail
+from reges import isValidPhone
+from reges import normalize_phone
+from schemas.contacts import Contact
+
+"""Пакетный режим: выполнение команд над контактами из файла или stdin
+
+Каждая строка входа - JSON-объект одной операции, поле "op" выбирает ее:
+    {"op": "add", "first_name": ..., "last_name": ..., "phone": ..., "email": ...}
+    {"op": "edit", "id": 5, "phone": ...}        любые поля контакта
+    {"op": "delete", "id": 5}
+    {"op": "get", "id": 5}
+    {"op": "search", "query": "Иван", "limit": 20}
+    {"op": "list", "limit": 50, "after": 100}
+
+На каждую строку выводится JSON-объект с номером строки, полем "ok"
+и результатом или описанием ошибки. Операции выполняются через одно
+соединение, по batch_size операций в одной транзакции. Ошибка операции
+не откатывает остальные операции пачки: все проверки выполняются до записи"""
+
+FIELDS = ("first_name", "last_name", "phone", "email")
+DEFAULT_LIMIT = 50
+
+
+class BatchReport:
+    """
+    Итоги выполнения пакета команд
+
+    Attributes:
+        total (int): Количество прочитанных операций
+        succeeded (int): Количество успешных операций
+        failed (int): Количество операций с ошибкой
+        elapsed (float): Время выполнения в секундах
+    """
+
+    def __init__(self) -> None:
+        """Инициализирует пустой отчёт"""
+        self.total: int = 0
+        self.succeeded: int = 0
+        self.failed: int = 0
+        self.elapsed: float = 0.0
+
+    @property
+    def ops_per_sec(self) -> float:
+        """Возвращает скорость выполнения в операциях в секунду"""
+        if self.elapsed == 0:
+            return 0.0
+        return self.total / self.elapsed
+
+    def __repr__(self) -> str:
+        """Возвращает строковое представление отчёта"""
+        return (
+            f"BatchReport(total: {self.total}, succeeded: {self.succeeded}, "
+            f"failed: {self.failed}, ops/sec: {self.ops_per_sec:.0f})"
+        )
+
+
+def read_operations(lines: Iterable[str]) -> Iterator[tuple[int, dict | None]]:
+    """
+    Разбирает строки JSONL в операции, пропуская пустые строки
+
+    Args:
+        lines (Iterable[str]): Строки входа
+
+    Returns:
+        Iterator[tuple[int, dict | None]]: Номер строки и операция или None, если строка не разобрана
+    """
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            operation = json.loads(line)
+        except json.JSONDecodeError:
+            operation = None
+        yield line_no, operation if isinstance(operation, dict) else None
+
+
+def _text(operation: dict, field: str) -> str:
+    """Возвращает обязательное текстовое поле операции"""
+    value = operation.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"поле {field} обязательно")
+    return value.strip()
+
+
+def _number(operation: dict, field: str, default: int | None = None) -> int | None:
+    """Возвращает целочисленное поле операции"""
+    value = operation.get(field, default)
+    if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+        raise ValueError(f"поле {field} должно быть целым числом")
+    return value
+
+
+def _limit(operation: dict) -> int:
+    """Возвращает положительный размер выборки из поля limit"""
+    limit = _number(operation, "limit", DEFAULT_LIMIT)
+    if limit < 1:
+        raise ValueError("поле limit должно быть положительным")
+    return limit
+
+
+class BatchRunner:
+    """
+    Этот класс выполняет операции над контактами одного пользователя пакетно
+
+    Номера телефонов пользователя загружаются один раз, поэтому проверка
+    дубликата при добавлении не обращается к базе
+
+    Attributes:
+        db (DatabaseManager): Менеджер базы данных для выполнения запросов
+        user_id (int): Идентификатор пользователя, от имени которого выполняются операции
+        batch_size (int): Количество операций в одной транзакции
+    """
+
+    def __init__(
+        self, db_manager: "DatabaseManager", user_id: int, batch_size: int = 1000
+    ):
+        """
+        Инициализирует исполнитель
+
+        Args:
+            db_manager (DatabaseManager): Менеджер базы данных для выполнения запросов
+            user_id (int): Идентификатор пользователя
+            batch_size (int): Количество операций в одной транзакции. По умолчанию 1000
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size должен быть положительным")
+        self.db = db_manager
+        self.user_id = user_id
+        self.batch_size = batch_size
+        self._phones = self.db.get_phones(user_id)
+        self._handlers = {
+            "add": self._add,
+            "edit": self._edit,
+            "delete": self._delete,
+            "get": self._get,
+            "search": self._search,
+            "list": self._list,
+        }
+
+    def run(self, lines: Iterable[str], out: TextIO) -> BatchReport:
+        """
+        Выполняет операции из строк JSONL и пишет результаты в out
+
+        Args:
+            lines (Iterable[str]): Строки входа, например открытый файл или sys.stdin
+            out (TextIO): Поток для результатов в формате JSONL
+
+        Returns:
+            BatchReport: Итоги выполнения
+        """
+        report = BatchReport()
+        started = time.perf_counter()
+        operations = read_operations(lines)
+        while chunk := list(islice(operations, self.batch_size)):
+            with self.db.transaction():
+                results = [self.execute(line_no, op) for line_no, op in chunk]
+            for result in results:
+                if result["ok"]:
+                    report.succeeded += 1
+                else:
+                    report.failed += 1
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            report.total += len(chunk)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def execute(self, line_no: int, operation: dict | None) -> dict[str, Any]:
+        """
+        Выполняет одну операцию
+
+        Args:
+            line_no (int): Номер строки входа
+            operation (dict | None): Операция или None, если строку не удалось разобрать
+
+        Returns:
+            dict[str, Any]: Результат с полями line, ok и op, а также результатом или error
+        """
+        if operation is None:
+            return {
+                "line": line_no,
+                "ok": False,
+                "error": "строка не является JSON-объектом",
+            }
+        name = operation.get("op")
+        handler = self._handlers.get(name)
+        if handler is None:
+            return {
+                "line": line_no,
+                "ok": False,
+                "op": name,
+                "error": "неизвестная операция",
+            }
+        try:
+            result = handler(operation)
+        except ValueError as error:
+            return {"line": line_no, "ok": False, "op": name, "error": str(error)}
+        except sqlite3.IntegrityError:
+            return {
+                "line": line_no,
+                "ok": False,
+                "op": name,
+                "error": "запись конфликтует с существующей",
+            }
+        return {"line": line_no, "ok": True, "op": name, **result}
+
+    def _own_contact(self, operation: dict) -> Contact:
+        """Возвращает контакт из поля id, если он принадлежит пользователю"""
+        contact_id = _number(operation, "id")
+        if contact_id is None:
+            raise ValueError("поле id обязательно")
+        contact = self.db.get_contact_details(contact_id)
+        if contact is None or contact.user_id != self.user_id:
+            raise ValueError("контакт не найден")
+        return contact
+
+    def _check_fields(self, fields: dict[str, str]) -> str | None:
+        """Проверяет телефон и почту и возвращает нормализованный номер"""
+        if "phone" in fields and not isValidPhone(fields["phone"]):
+            raise ValueError("некорректный номер телефона")
+        if "email" in fields and not isValidEmail(fields["email"]):
+            raise ValueError("некорректный email")
+        return normalize_phone(fields["phone"]) if "phone" in fields else None
+
+    def _add(self, operation: dict) -> dict[str, Any]:
+        """Добавляет контакт"""
+        fields = {field: _text(operation, field) for field in FIELDS}
+        phone = self._check_fields(fields)
+        if phone in self._phones:
+            raise ValueError("контакт с таким номером телефона уже существует")
+        contact_id = self.db.add_contact(self.user_id, **fields)
+        self._phones.add(phone)
+        return {"id": contact_id}
+
+    def _edit(self, operation: dict) -> dict[str, Any]:
+        """Изменяет переданные поля контакта"""
+        fields = {
+            field: _text(operation, field) for field in FIELDS if field in operation
+        }
+        if not fields:
+            raise ValueError("нет полей для изменения")
+        phone = self._check_fields(fields)
+        contact = self._own_contact(operation)
+        old_phone = normalize_phone(contact.phone)
+        if phone is not None and phone != old_phone and phone in self._phones:
+            raise ValueError("контакт с таким номером телефона уже существует")
+        self.db.edit_contact(contact.id, **fields)
+        if phone is not None and phone != old_phone:
+            self._phones.discard(old_phone)
+            self._phones.add(phone)
+        return {"id": contact.id}
+
+    def _delete(self, operation: dict) -> dict[str, Any]:
+        """Удаляет контакт"""
+        contact = self._own_contact(operation)
+        self.db.delete_contact(contact.id)
+        self._phones.discard(normalize_phone(contact.phone))
+        return {"id": contact.id}
+
+    def _get(self, operation: dict) -> dict[str, Any]:
+        """Возвращает контакт"""
+        return {"contact": self._own_contact(operation).as_dict()}
+
+    def _search(self, operation: dict) -> dict[str, Any]:
+        """Ищет контакты пользователя"""
+        contacts = self.db.search_contacts(
+            self.user_id,
+            _text(operation, "query"),
+            _limit(operation),
+        )
+        return {"contacts": [contact.as_dict() for contact in contacts]}
+
+    def _list(self, operation: dict) -> dict[str, Any]:
+        """Возвращает страницу контактов по возрастанию id"""
+        page = self.db.get_contacts_page(
+            self.user_id,
+            _limit(operation),
+            _number(operation, "after"),
+        )
+        return {"contacts": [contact.as_dict() for contact in page]}
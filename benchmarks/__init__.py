@@ -0,0 +1,3 @@
+"""Бенчмарки производительности менеджеров базы данных
+
+Запускаются из корня репозитория как модули, например: python -m benchmarks.search"""
@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from async_db import AsyncContactManager
+from async_db import AsyncDatabaseManager
+
+"""Нагрузочный тест асинхронного API
+
+Запускает заданное количество корутин, каждая выполняет смесь чтений и записей,
+и выводит суммарное количество запросов в секунду.
+
+Пример запуска: python -m benchmarks.async_load --coroutines 1000"""
+
+
+async def client(
+    contacts: AsyncContactManager, client_id: int, requests: int, write_share: float
+) -> None:
+    """
+    Выполняет requests запросов от имени одного клиента
+
+    Args:
+        contacts (AsyncContactManager): Асинхронный менеджер контактов
+        client_id (int): Номер клиента, он же идентификатор пользователя
+        requests (int): Количество запросов
+        write_share (float): Доля запросов на запись
+    """
+    rng = random.Random(client_id)
+    for i in range(requests):
+        if rng.random() < write_share:
+            await contacts.add_contact(
+                client_id, "Имя", "Фамилия", f"{client_id:04d}{i:06d}", "a@example.com"
+            )
+        else:
+            await contacts.view_contacts_page(client_id, 20)
+
+
+async def main(
+    db_name: str, coroutines: int, requests: int, write_share: float, workers: int
+) -> float:
+    """
+    Запускает корутины и возвращает количество запросов в секунду
+
+    Args:
+        db_name (str): Имя файла базы данных
+        coroutines (int): Количество одновременных корутин
+        requests (int): Количество запросов на одну корутину
+        write_share (float): Доля запросов на запись
+        workers (int): Количество потоков чтения
+    """
+    db = AsyncDatabaseManager(db_name, max_workers=workers)
+    contacts = AsyncContactManager(db)
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(client(contacts, i, requests, write_share) for i in range(coroutines))
+    )
+    elapsed = time.perf_counter() - started
+    await db.close_connection()
+    return coroutines * requests / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нагрузочный тест асинхронного API")
+    parser.add_argument("--coroutines", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--write-share", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rps = asyncio.run(
+            main(
+                os.path.join(tmp, "bench.db"),
+                args.coroutines,
+                args.requests,
+                args.write_share,
+                args.workers,
+            )
+        )
+    print(f"{args.coroutines} корутин: {rps:.0f} запросов/с")
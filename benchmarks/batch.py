@@ -0,0 +1,78 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+
+from batch import BatchRunner
+from benchmarks.dataset import generate_contacts
+from db import DatabaseManager
+
+"""Скорость пакетного режима при разных размерах транзакции
+
+Генерируется поток операций: в основном добавления, а также изменения,
+просмотры, поиск, страницы и удаления уже добавленных контактов. Один и тот же
+поток выполняется на новой базе с разными batch_size, результаты пишутся
+в /dev/null. batch_size 1 соответствует фиксации после каждой операции.
+
+Пример запуска: python -m benchmarks.batch --ops 50000 --batch-sizes 1 100 1000"""
+
+FIELDS = ("first_name", "last_name", "phone", "email")
+
+
+def generate_operations(count: int, seed: int = 0) -> list[str]:
+    """
+    Генерирует строки JSONL с операциями
+
+    Идентификаторы контактов совпадают с порядковыми номерами добавлений,
+    так как операции выполняются на пустой базе
+
+    Args:
+        count (int): Количество операций
+        seed (int): Зерно генератора случайных чисел. По умолчанию 0
+
+    Returns:
+        list[str]: Строки JSONL
+    """
+    rng = random.Random(seed)
+    contacts = generate_contacts(1, count, rng)
+    lines, added, alive = [], 0, []
+    for _ in range(count):
+        kind = rng.random() if len(alive) > 1 else 0.0
+        if kind < 0.6:
+            added += 1
+            alive.append(added)
+            operation = {"op": "add", **dict(zip(FIELDS, next(contacts)[1:]))}
+        elif kind < 0.7:
+            operation = {"op": "edit", "id": rng.choice(alive), "last_name": "Новиков"}
+        elif kind < 0.8:
+            operation = {"op": "get", "id": rng.choice(alive)}
+        elif kind < 0.9:
+            operation = {"op": "search", "query": "Иван", "limit": 20}
+        elif kind < 0.95:
+            operation = {"op": "list", "limit": 20, "after": rng.choice(alive)}
+        else:
+            # Последний контакт не удаляется: SQLite выдал бы его id следующему добавлению
+            operation = {"op": "delete", "id": alive.pop(rng.randrange(len(alive) - 1))}
+        lines.append(json.dumps(operation, ensure_ascii=False))
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк пакетного режима")
+    parser.add_argument("--ops", type=int, default=50_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 1000])
+    args = parser.parse_args()
+
+    lines = generate_operations(args.ops)
+    for batch_size in args.batch_sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseManager(os.path.join(tmp, "bench.db"))
+            with open(os.devnull, "w") as out:
+                report = BatchRunner(db, 1, batch_size).run(lines, out)
+            db.close_connection()
+        print(
+            f"batch_size {batch_size:>5}: {report.total} операций за "
+            f"{report.elapsed:.1f} с, {report.ops_per_sec:,.0f} операций/с, "
+            f"ошибок {report.failed}"
+        )
@@ -0,0 +1,124 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.dataset import generate
+from benchmarks.run import measure
+from changes import ContactMirror
+from db import DatabaseManager
+
+"""Инкрементальная синхронизация по журналу изменений против полной перезагрузки
+
+На базе с синтетическими контактами строится копия ContactMirror всех
+пользователей. Затем в базе изменяется, добавляется и удаляется заданное
+количество контактов, и сравнивается время синхронизации копии по журналу
+со временем полной загрузки. Отдельно замеряется цена записи в журнал
+(add_contact с триггерами журнала и без них) и сжатие журнала.
+
+Пример запуска: python -m benchmarks.changes --contacts 100000 --changes 10 100 1000"""
+
+CHANGE_TRIGGERS = (
+    "contact_changes_insert",
+    "contact_changes_update",
+    "contact_changes_delete",
+)
+
+
+def mutate(
+    db: DatabaseManager,
+    ids: list[int],
+    user_ids: list[int],
+    count: int,
+    rng: random.Random,
+) -> None:
+    """
+    Выполняет count изменений: 80% правок, 10% добавлений и 10% удалений
+
+    Args:
+        db (DatabaseManager): Менеджер базы данных
+        ids (list[int]): Идентификаторы существующих контактов, список обновляется
+        user_ids (list[int]): Идентификаторы пользователей для новых контактов
+        count (int): Количество изменений
+        rng (random.Random): Генератор случайных чисел
+    """
+    with db.transaction():
+        for i in range(count):
+            kind = rng.random()
+            if kind < 0.8:
+                db.edit_contact(rng.choice(ids), last_name=f"Изменен{i}")
+            elif kind < 0.9:
+                ids.append(
+                    db.add_contact(
+                        rng.choice(user_ids),
+                        "Новый",
+                        "Контакт",
+                        f"+1{rng.randrange(10**9):09d}",
+                        "new@example.com",
+                    )
+                )
+            else:
+                db.delete_contact(ids.pop(rng.randrange(len(ids))))
+
+
+def add_latency_ms(db_name: str, with_log: bool, iterations: int) -> float:
+    """Возвращает p50 add_contact в миллисекундах на новой базе с журналом или без него"""
+    db = DatabaseManager(db_name)
+    if not with_log:
+        for trigger in CHANGE_TRIGGERS:
+            db.conn.execute(f"DROP TRIGGER {trigger}")
+    stats = measure(
+        lambda i: db.add_contact(1, "Имя", "Фамилия", f"+7{i:010d}", "a@example.com"),
+        iterations,
+    )
+    db.close_connection()
+    return stats["p50_ms"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк журнала изменений")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--contacts", type=int, default=100_000)
+    parser.add_argument("--changes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--writes", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        for with_log in (False, True):
+            name = "с журналом" if with_log else "без журнала"
+            latency = add_latency_ms(
+                os.path.join(tmp, f"writes_{with_log}.db"), with_log, args.writes
+            )
+            print(f"add_contact {name}: p50 {latency:.3f} мс")
+
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        user_ids = generate(db, args.users, args.contacts)
+        ids = [contact.id for contact in db.iter_all_contacts()]
+        mirror = ContactMirror(db)
+        mirror.sync()
+        for count in args.changes:
+            mutate(db, ids, user_ids, count, rng)
+            started = time.perf_counter()
+            applied = mirror.sync()
+            incremental = time.perf_counter() - started
+            started = time.perf_counter()
+            fresh = ContactMirror(db)
+            fresh.sync()
+            full = time.perf_counter() - started
+            assert mirror.contacts == fresh.contacts
+            print(
+                f"{count} изменений: по журналу {incremental * 1000:.2f} мс "
+                f"({applied} записей), полная загрузка {full * 1000:.0f} мс "
+                f"({len(fresh.contacts)} контактов), x{full / incremental:,.0f}"
+            )
+
+        before = db.conn.execute("SELECT COUNT(*) FROM contact_changes").fetchone()[0]
+        started = time.perf_counter()
+        deleted = db.compact_changes(mirror.seq)
+        print(
+            f"Сжатие до позиции {mirror.seq}: удалено {deleted} из {before} записей "
+            f"за {(time.perf_counter() - started) * 1000:.0f} мс"
+        )
+        db.close_connection()
@@ -0,0 +1,66 @@
+import argparse
+import json
+import sys
+
+"""Сравнение двух JSON-отчетов benchmarks.run
+
+Операция считается регрессией, если выбранная метрика задержки выросла
+больше чем на threshold процентов. При наличии регрессий код выхода 1.
+
+Пример запуска: python -m benchmarks.compare base.json new.json --threshold 10"""
+
+
+def compare(
+    base: dict, new: dict, metric: str = "p95_ms"
+) -> list[tuple[str, str, float, float, float]]:
+    """
+    Сравнивает отчеты и возвращает изменения по всем общим операциям
+
+    Args:
+        base (dict): Базовый отчет
+        new (dict): Новый отчет
+        metric (str): Метрика задержки. По умолчанию "p95_ms"
+
+    Returns:
+        list[tuple[str, str, float, float, float]]: Масштаб, операция, старое и новое
+        значение метрики и изменение в процентах
+    """
+    rows = []
+    for scale, operations in new["scales"].items():
+        base_operations = base["scales"].get(scale, {})
+        for name, stats in operations.items():
+            if name not in base_operations:
+                continue
+            old_value = base_operations[name][metric]
+            new_value = stats[metric]
+            change = (new_value - old_value) / old_value * 100 if old_value else 0.0
+            rows.append((scale, name, old_value, new_value, change))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сравнение отчетов бенчмарка")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument(
+        "--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"]
+    )
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    regressions = 0
+    for scale, name, old_value, new_value, change in compare(base, new, args.metric):
+        flag = ""
+        if change > args.threshold:
+            flag = "  РЕГРЕССИЯ"
+            regressions += 1
+        print(
+            f"{scale:>9} {name:<40} {old_value:9.3f} -> {new_value:9.3f} мс "
+            f"({change:+6.1f}%){flag}"
+        )
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,93 @@
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.dataset import fill_contacts
+from db import DatabaseManager
+
+"""Нагрузочный тест пулового режима DatabaseManager
+
+Несколько потоков одновременно читают страницы контактов и добавляют новые,
+для каждого количества потоков выводится суммарная пропускная способность.
+
+Пример запуска: python -m benchmarks.concurrency --threads 1 2 4 8"""
+
+
+def worker(
+    db: DatabaseManager,
+    writer: bool,
+    worker_id: int,
+    deadline: float,
+    counts: list[int],
+) -> None:
+    """
+    Выполняет операции до наступления deadline и записывает их количество в counts
+
+    Args:
+        db (DatabaseManager): Менеджер базы данных в пуловом режиме
+        writer (bool): True - добавлять контакты, False - читать страницы
+        worker_id (int): Номер потока, используется для уникальных номеров телефонов
+        deadline (float): Момент окончания теста по time.perf_counter()
+        counts (list[int]): Список для результата
+    """
+    done = 0
+    try:
+        while time.perf_counter() < deadline:
+            if writer:
+                db.add_contact(
+                    1, "Имя", "Фамилия", f"{worker_id:03d}{done:07d}", "a@example.com"
+                )
+            else:
+                db.get_contacts_page(1, 20, after_id=done % 1000)
+            done += 1
+    finally:
+        db.release_connection()
+    counts[worker_id] = done
+
+
+def run(db_name: str, threads: int, writers: int, duration: float) -> tuple[int, int]:
+    """
+    Запускает потоки и возвращает количество операций записи и чтения
+
+    Args:
+        db_name (str): Имя файла базы данных
+        threads (int): Общее количество потоков
+        writers (int): Сколько из них пишут
+        duration (float): Длительность теста в секундах
+    """
+    db = DatabaseManager(db_name, pool_size=threads)
+    counts = [0] * threads
+    deadline = time.perf_counter() + duration
+    pool = [
+        threading.Thread(target=worker, args=(db, i < writers, i, deadline, counts))
+        for i in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    db.close_connection()
+    return sum(counts[:writers]), sum(counts[writers:])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нагрузочный тест пула соединений")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--writer-share", type=float, default=0.25)
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+
+    for threads in args.threads:
+        writers = max(1, round(threads * args.writer_share)) if threads > 1 else 0
+        with tempfile.TemporaryDirectory() as tmp:
+            db_name = os.path.join(tmp, "bench.db")
+            db = DatabaseManager(db_name)
+            fill_contacts(db, 1, 1000)
+            db.close_connection()
+            writes, reads = run(db_name, threads, writers, args.duration)
+        print(
+            f"{threads:>2} потоков ({writers} пишут): "
+            f"{writes / args.duration:8.0f} записей/с, {reads / args.duration:8.0f} чтений/с"
+        )
@@ -0,0 +1,156 @@
+import argparse
+import random
+from collections.abc import Iterator
+
+from db import DatabaseManager
+from utils import hash_password
+
+"""Генератор синтетических пользователей и контактов
+
+Количество контактов на пользователя и частоты имен могут быть равномерными
+или распределенными по закону Ципфа, когда немногие пользователи и имена
+встречаются намного чаще остальных, как в реальных данных.
+
+Пример запуска: python -m benchmarks.dataset scratch.db --users 100 --contacts 100000"""
+
+FIRST_NAMES = [
+    "Иван", "Пётр", "Анна", "Мария", "Олег", "Ольга", "Сергей", "Елена",
+    "Дмитрий", "Наталья", "Алексей", "Татьяна", "Андрей", "Ирина", "Павел",
+    "John", "Mary", "Alex", "Kate", "Nick",
+]  # fmt: skip
+LAST_NAMES = [
+    "Иванов", "Петров", "Сидоров", "Смирнов", "Кузнецов", "Попов", "Волков",
+    "Соколов", "Лебедев", "Козлов", "Новиков", "Морозов", "Smith", "Brown",
+]  # fmt: skip
+PHONE_FORMATS = [
+    "8{0}{1}",
+    "+7 ({0}) {1}",
+    "8 {0} {1}",
+    "+7{0}{1}",
+]
+DEFAULT_PASSWORD = "password"
+
+
+def zipf_weights(count: int, skew: float) -> list[float]:
+    """
+    Возвращает веса распределения Ципфа для count значений
+
+    Args:
+        count (int): Количество значений
+        skew (float): Показатель Ципфа, 0 - равномерное распределение
+    """
+    return [1 / (rank**skew) for rank in range(1, count + 1)]
+
+
+def contacts_per_user(users: int, contacts: int, skew: float, seed: int) -> list[int]:
+    """
+    Распределяет contacts контактов между users пользователями
+
+    Args:
+        users (int): Количество пользователей
+        contacts (int): Общее количество контактов
+        skew (float): Показатель Ципфа, 0 - поровну
+        seed (int): Зерно генератора случайных чисел
+    """
+    weights = zipf_weights(users, skew)
+    random.Random(seed).shuffle(weights)
+    total = sum(weights)
+    counts = [int(contacts * weight / total) for weight in weights]
+    counts[0] += contacts - sum(counts)
+    return counts
+
+
+def generate_contacts(
+    user_id: int, count: int, rng: random.Random, name_skew: float = 1.0
+) -> Iterator[tuple]:
+    """
+    Генерирует контакты пользователя с уникальными номерами телефонов
+
+    Args:
+        user_id (int): Идентификатор пользователя
+        count (int): Количество контактов
+        rng (random.Random): Генератор случайных чисел
+        name_skew (float): Показатель Ципфа для частоты имен. По умолчанию 1.0
+
+    Returns:
+        Iterator[tuple]: Кортежи (user_id, first_name, last_name, phone, email)
+    """
+    first_weights = zipf_weights(len(FIRST_NAMES), name_skew)
+    last_weights = zipf_weights(len(LAST_NAMES), name_skew)
+    for i in range(count):
+        first_name = rng.choices(FIRST_NAMES, first_weights)[0]
+        last_name = rng.choices(LAST_NAMES, last_weights)[0]
+        number = f"{9000000000 + i:010d}"
+        phone = rng.choice(PHONE_FORMATS).format(number[:3], number[3:])
+        yield user_id, first_name, last_name, phone, f"user{user_id}.{i}@example.com"
+
+
+def fill_contacts(
+    db: DatabaseManager, user_id: int, count: int, seed: int = 0, batch: int = 10_000
+) -> None:
+    """
+    Заполняет базу синтетическими контактами одного пользователя
+
+    Args:
+        db (DatabaseManager): Менеджер базы данных
+        user_id (int): Идентификатор пользователя
+        count (int): Количество контактов
+        seed (int): Зерно генератора случайных чисел. По умолчанию 0
+        batch (int): Количество контактов в одной транзакции. По умолчанию 10000
+    """
+    rng = random.Random(seed)
+    rows = generate_contacts(user_id, count, rng)
+    for start in range(0, count, batch):
+        with db.transaction():
+            db.add_contacts(next(rows) for _ in range(min(batch, count - start)))
+
+
+def generate(
+    db: DatabaseManager,
+    users: int,
+    contacts: int,
+    user_skew: float = 1.0,
+    seed: int = 0,
+) -> list[int]:
+    """
+    Создает пользователей и распределяет между ними контакты
+
+    У всех пользователей пароль DEFAULT_PASSWORD. Хэш считается один раз,
+    иначе генерация упиралась бы в scrypt
+
+    Args:
+        db (DatabaseManager): Менеджер базы данных
+        users (int): Количество пользователей
+        contacts (int): Общее количество контактов
+        user_skew (float): Показатель Ципфа для числа контактов на пользователя. По умолчанию 1.0
+        seed (int): Зерно генератора случайных чисел. По умолчанию 0
+
+    Returns:
+        list[int]: Идентификаторы созданных пользователей
+    """
+    password_hash = hash_password(DEFAULT_PASSWORD)
+    with db.transaction():
+        for i in range(users):
+            db.add_user_hash(f"bench_user_{seed}_{i}", password_hash)
+    user_ids = [
+        db.get_user_credentials(f"bench_user_{seed}_{i}")[0] for i in range(users)
+    ]
+    counts = contacts_per_user(users, contacts, user_skew, seed)
+    for offset, (user_id, count) in enumerate(zip(user_ids, counts)):
+        fill_contacts(db, user_id, count, seed + offset)
+    return user_ids
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Генерация синтетических данных")
+    parser.add_argument("db", help="Файл базы данных")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--contacts", type=int, default=100_000)
+    parser.add_argument("--user-skew", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    user_ids = generate(db, args.users, args.contacts, args.user_skew, args.seed)
+    db.close_connection()
+    print(f"Создано пользователей: {len(user_ids)}, контактов: {args.contacts}")
@@ -0,0 +1,103 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.dataset import fill_contacts
+from db import DatabaseManager
+from dedup import Deduplicator
+from reges import normalize_phone
+
+"""Время поиска и объединения дубликатов контактов
+
+База заполняется контактами нескольких пользователей, после чего часть
+контактов копируется напрямую в таблицу так, как их оставила бы старая версия
+приложения: с phone_norm = NULL, номером в другом формате и почтой в верхнем
+регистре. Еще часть копий получает только почту и имя без последней буквы,
+их находит блок по почте со сравнением имен.
+
+Пример запуска: python -m benchmarks.dedup --contacts 1000000 --users 10"""
+
+
+def inject_duplicates(db: DatabaseManager, share: float, seed: int = 0) -> int:
+    """
+    Добавляет в базу копии случайных контактов в обход проверок
+
+    Args:
+        db (DatabaseManager): Менеджер базы данных
+        share (float): Доля копируемых контактов
+        seed (int): Зерно генератора случайных чисел. По умолчанию 0
+
+    Returns:
+        int: Количество добавленных копий
+    """
+    rng = random.Random(seed)
+    rows = []
+    for contact in db.iter_all_contacts():
+        if rng.random() >= share:
+            continue
+        if rng.random() < 0.5:
+            digits = normalize_phone(contact.phone)[2:]
+            phone = f"8 ({digits[:3]}) {digits[3:6]}-{digits[6:8]}-{digits[8:]}"
+            rows.append(
+                (
+                    contact.user_id,
+                    contact.first_name,
+                    None,
+                    phone,
+                    contact.email.upper(),
+                )
+            )
+        else:
+            rows.append(
+                (
+                    contact.user_id,
+                    contact.first_name,
+                    contact.last_name[:-1],
+                    None,
+                    f" {contact.email} ",
+                )
+            )
+    with db.bulk_load():
+        db.cur.executemany(
+            "INSERT INTO contacts (user_id, first_name, last_name, phone, email) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+    return len(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска дубликатов")
+    parser.add_argument("--contacts", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--share", type=float, default=0.05, help="доля дубликатов")
+    parser.add_argument("--batch", type=int, default=1000, help="групп в транзакции")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        started = time.perf_counter()
+        per_user = args.contacts // args.users
+        for user_id in range(1, args.users + 1):
+            fill_contacts(db, user_id, per_user, seed=user_id)
+        injected = inject_duplicates(db, args.share)
+        print(
+            f"Заполнение {per_user * args.users} контактов и {injected} дубликатов: "
+            f"{time.perf_counter() - started:.1f} с"
+        )
+
+        deduplicator = Deduplicator(db, batch_size=args.batch)
+        report = deduplicator.run()
+        print(
+            f"Поиск: {report.scanned} контактов за {report.elapsed:.2f} с "
+            f"({report.scanned / report.elapsed:,.0f} контактов/с), "
+            f"групп {report.groups}, дубликатов {report.duplicates}"
+        )
+        report = deduplicator.run(apply=True)
+        print(
+            f"Поиск и объединение: {report.merged} дубликатов за {report.elapsed:.2f} с"
+        )
+        remaining = db.cur.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+        print(f"Осталось контактов: {remaining}, повторный поиск: {deduplicator.run()}")
+        db.close_connection()
@@ -0,0 +1,85 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.dataset import FIRST_NAMES
+from benchmarks.dataset import LAST_NAMES
+from benchmarks.dataset import fill_contacts
+from benchmarks.run import summarize
+from db import DatabaseManager
+from fuzzy import normalize_name
+
+"""Задержка и точность нечеткого поиска по индексу contacts_fuzzy
+
+Запросы - имена и фамилии из генератора данных, записанные латиницей
+с одной опечаткой. Попаданием считается результат, у которого первое слово
+имени совпадает с исходным словом запроса.
+
+Пример запуска: python -m benchmarks.fuzzy --contacts 100000 --budget 50"""
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """Транслитерирует слово и вносит в него одну опечатку"""
+    word = "".join(normalize_name(word))
+    position = rng.randrange(1, len(word))
+    kind = rng.choice(["replace", "delete", "swap"])
+    if kind == "replace":
+        return word[:position] + rng.choice("aeiouy") + word[position + 1 :]
+    if kind == "delete":
+        return word[:position] + word[position + 1 :]
+    return (
+        word[: position - 1]
+        + word[position]
+        + word[position - 1]
+        + word[position + 1 :]
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк нечеткого поиска")
+    parser.add_argument("--contacts", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--budget", type=float, default=50.0, help="мс")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = FIRST_NAMES + LAST_NAMES
+    targets = [rng.choice(words) for _ in range(args.queries)]
+    queries = [misspell(word, rng) for word in targets]
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        started = time.perf_counter()
+        fill_contacts(db, 1, args.contacts)
+        print(
+            f"Заполнение {args.contacts} контактов с индексом: "
+            f"{time.perf_counter() - started:.1f} с"
+        )
+        latencies, hits = [], 0
+        for target, query in zip(targets, queries):
+            started = time.perf_counter()
+            results = db.fuzzy_search(1, query, args.limit, time_budget_ms=args.budget)
+            latencies.append(time.perf_counter() - started)
+            expected = normalize_name(target)
+            hits += any(
+                expected[0]
+                in normalize_name(contact.first_name)
+                + normalize_name(contact.last_name)
+                for contact, _ in results
+            )
+        like = [
+            len(db.search_contacts(1, query, limit=args.limit)) for query in queries
+        ]
+        db.close_connection()
+
+    stats = summarize(latencies)
+    print(
+        f"fuzzy_search: p50 {stats['p50_ms']:.1f} мс, p95 {stats['p95_ms']:.1f} мс, "
+        f"p99 {stats['p99_ms']:.1f} мс, попаданий {hits / len(queries):.0%}"
+    )
+    print(
+        "LIKE по тем же запросам нашел хоть что-то в "
+        f"{sum(map(bool, like)) / len(queries):.0%} случаев"
+    )
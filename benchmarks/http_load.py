@@ -0,0 +1,318 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+
+from benchmarks.run import summarize
+
+"""Нагрузочный тест HTTP API контактов
+
+Каждый клиент регистрирует своего пользователя, входит и в течение заданного
+времени выполняет смесь запросов: страница контактов, поиск, просмотр контакта
+и добавление контакта. Выводятся запросы в секунду, перцентили задержки и
+гистограмма с логарифмическими корзинами по каждому типу запроса.
+
+По умолчанию сервер запускается отдельным процессом на временной базе. С --url
+нагружается уже запущенный сервер. С --no-keep-alive каждый запрос открывает
+новое соединение, что показывает выигрыш от keep-alive. С --rate общая частота
+запросов ограничивается заданным числом в секунду.
+
+Пример запуска: python -m benchmarks.http_load --clients 50 --duration 10"""
+
+PASSWORD = "password"
+SEARCH_QUERIES = ["Иван", "Пет", "Smith", "900", "Ольга Смирнова"]
+
+
+class HTTPClient:
+    """
+    Минимальный клиент HTTP/1.1 с поддержкой keep-alive
+
+    Attributes:
+        host (str): Адрес сервера
+        port (int): Порт сервера
+        keep_alive (bool): Переиспользовать ли соединение между запросами
+        token (str | None): Токен для заголовка Authorization
+    """
+
+    def __init__(self, host: str, port: int, keep_alive: bool = True) -> None:
+        """Инициализирует клиента без открытого соединения"""
+        self.host = host
+        self.port = port
+        self.keep_alive = keep_alive
+        self.token: str | None = None
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def request(
+        self, method: str, path: str, payload: dict | None = None
+    ) -> tuple[int, dict | None]:
+        """
+        Выполняет запрос и возвращает код ответа и JSON-тело
+
+        Args:
+            method (str): Метод запроса
+            path (str): Путь со строкой запроса
+            payload (dict | None): Тело запроса
+
+        Returns:
+            tuple[int, dict | None]: Код ответа и разобранное тело
+        """
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        body = b"" if payload is None else json.dumps(payload).encode()
+        headers = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if self.keep_alive else 'close'}",
+        ]
+        if self.token:
+            headers.append(f"Authorization: Bearer {self.token}")
+        self._writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + body)
+        status = int((await self._reader.readline()).split()[1])
+        length, close = 0, not self.keep_alive
+        while (line := await self._reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+            elif name.lower() == "connection":
+                close = close or value.strip().lower() == "close"
+        data = await self._reader.readexactly(length) if length else b""
+        if close:
+            await self.close()
+        return status, json.loads(data) if data else None
+
+    async def close(self) -> None:
+        """Закрывает соединение"""
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._reader = self._writer = None
+
+
+class LoadStats:
+    """
+    Задержки запросов по типам
+
+    Attributes:
+        latencies (dict[str, list[float]]): Время выполнения запросов в секундах
+        errors (int): Количество ответов с неожиданным кодом
+    """
+
+    def __init__(self) -> None:
+        """Инициализирует пустую статистику"""
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: int = 0
+
+    def add(self, kind: str, elapsed: float) -> None:
+        """Учитывает один запрос"""
+        self.latencies.setdefault(kind, []).append(elapsed)
+
+
+def histogram(latencies: list[float], width: int = 40) -> list[str]:
+    """
+    Строит текстовую гистограмму задержек с корзинами 2^k микросекунд
+
+    Args:
+        latencies (list[float]): Время выполнения запросов в секундах
+        width (int): Длина самого большого столбца. По умолчанию 40
+
+    Returns:
+        list[str]: Строки гистограммы
+    """
+    buckets: dict[int, int] = {}
+    for elapsed in latencies:
+        bucket = max(0, math.ceil(math.log2(max(elapsed * 1e6, 1))))
+        buckets[bucket] = buckets.get(bucket, 0) + 1
+    peak = max(buckets.values())
+    lines = []
+    for bucket in range(min(buckets), max(buckets) + 1):
+        count = buckets.get(bucket, 0)
+        bar = "#" * math.ceil(count * width / peak) if count else ""
+        lines.append(f"  <= {2**bucket / 1000:9.3f} мс {count:8d} {bar}")
+    return lines
+
+
+async def client(
+    host: str,
+    port: int,
+    client_id: int,
+    deadline: float,
+    interval: float,
+    write_share: float,
+    keep_alive: bool,
+    stats: LoadStats,
+) -> None:
+    """
+    Регистрирует пользователя и выполняет запросы до deadline
+
+    Args:
+        host (str): Адрес сервера
+        port (int): Порт сервера
+        client_id (int): Номер клиента
+        deadline (float): Момент окончания по time.perf_counter
+        interval (float): Минимальный интервал между запросами клиента в секундах
+        write_share (float): Доля запросов на добавление контакта
+        keep_alive (bool): Переиспользовать ли соединение
+        stats (LoadStats): Общая статистика
+    """
+    rng = random.Random(client_id)
+    http = HTTPClient(host, port, keep_alive)
+    username = f"load_{os.getpid()}_{client_id}"
+    credentials = {"username": username, "password": PASSWORD}
+    await http.request("POST", "/register", credentials)
+    _, data = await http.request("POST", "/login", credentials)
+    http.token = data["token"]
+    contact_ids = []
+    number = 0
+    next_start = time.perf_counter()
+    while next_start < deadline:
+        if interval:
+            await asyncio.sleep(max(0.0, next_start - time.perf_counter()))
+            next_start += interval
+        if not contact_ids or rng.random() < write_share:
+            number += 1
+            kind, method, path, expected = "add", "POST", "/contacts", 201
+            payload = {
+                "first_name": "Иван",
+                "last_name": "Петров",
+                "phone": f"+7{client_id:04d}{number:06d}",
+                "email": f"{username}.{number}@example.com",
+            }
+        else:
+            payload = None
+            kind = rng.choice(["page", "search", "get"])
+            method, expected = "GET", 200
+            if kind == "page":
+                path = "/contacts?limit=20"
+            elif kind == "search":
+                query = {"q": rng.choice(SEARCH_QUERIES), "limit": 20}
+                path = f"/contacts/search?{urlencode(query)}"
+            else:
+                path = f"/contacts/{rng.choice(contact_ids)}"
+        started = time.perf_counter()
+        status, data = await http.request(method, path, payload)
+        stats.add(kind, time.perf_counter() - started)
+        if status != expected:
+            stats.errors += 1
+        elif kind == "add":
+            contact_ids.append(data["id"])
+        if not interval:
+            next_start = time.perf_counter()
+    await http.close()
+
+
+def free_port() -> int:
+    """Возвращает свободный локальный порт"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(db_name: str, port: int, workers: int) -> subprocess.Popen:
+    """
+    Запускает сервер отдельным процессом и ждет, пока он начнет принимать соединения
+
+    Args:
+        db_name (str): Имя файла базы данных
+        port (int): Порт
+        workers (int): Количество потоков чтения сервера
+
+    Returns:
+        subprocess.Popen: Процесс сервера
+    """
+    server = subprocess.Popen(
+        [sys.executable, "-m", "api_server", "--db", db_name, "--port", str(port)]
+        + ["--workers", str(workers)],
+        stdout=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Сервер не запустился")
+
+
+async def main(
+    args: argparse.Namespace, host: str, port: int
+) -> tuple[LoadStats, float]:
+    """Запускает клиентов и возвращает статистику и фактическое время нагрузки"""
+    stats = LoadStats()
+    interval = args.clients / args.rate if args.rate else 0.0
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(
+        *(
+            client(
+                host,
+                port,
+                i,
+                deadline,
+                interval,
+                args.write_share,
+                not args.no_keep_alive,
+                stats,
+            )
+            for i in range(args.clients)
+        )
+    )
+    return stats, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нагрузочный тест HTTP API")
+    parser.add_argument(
+        "--url", help="адрес запущенного сервера, например http://127.0.0.1:8080"
+    )
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="с")
+    parser.add_argument("--rate", type=float, help="общее ограничение запросов/с")
+    parser.add_argument("--write-share", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--no-keep-alive", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            host, port = "127.0.0.1", free_port()
+            server = start_server(os.path.join(tmp, "bench.db"), port, args.workers)
+        try:
+            stats, elapsed = asyncio.run(main(args, host, port))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    total = sum(len(latencies) for latencies in stats.latencies.values())
+    mode = "без keep-alive" if args.no_keep_alive else "keep-alive"
+    print(
+        f"{args.clients} клиентов, {mode}: {total} запросов за {elapsed:.1f} с, "
+        f"{total / elapsed:.0f} запросов/с, ошибок {stats.errors}"
+    )
+    for kind, latencies in sorted(stats.latencies.items()):
+        if len(latencies) < 2:
+            continue
+        summary = summarize(latencies)
+        print(
+            f"{kind}: {len(latencies)} запросов, p50 {summary['p50_ms']:.2f} мс, "
+            f"p95 {summary['p95_ms']:.2f} мс, p99 {summary['p99_ms']:.2f} мс"
+        )
+        print("\n".join(histogram(latencies)))
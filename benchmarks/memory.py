@@ -0,0 +1,89 @@
+import argparse
+import random
+import sqlite3
+import time
+import tracemalloc
+
+from benchmarks.dataset import generate_contacts
+from db import CONTACT_COLUMNS
+from schemas.contacts import contact_factory
+
+"""Память, занимаемая выборкой контактов в разных представлениях строки
+
+Контакты выбираются из таблицы в памяти с разными фабриками строк sqlite3,
+размер результата fetchall измеряется через tracemalloc. Строковые поля во всех
+вариантах одинаковы, поэтому разница - это накладные расходы самого объекта строки.
+Время fetchall замеряется под tracemalloc и годится только для сравнения вариантов.
+
+Пример запуска: python -m benchmarks.memory --rows 1000000"""
+
+
+class DictContact:
+    """Контакт с обычным __dict__ для сравнения"""
+
+    def __init__(self, contact_id, user_id, first_name, last_name, phone, email):
+        self.id = contact_id
+        self.user_id = user_id
+        self.first_name = first_name
+        self.last_name = last_name
+        self.phone = phone
+        self.email = email
+
+
+def dict_factory(cursor: sqlite3.Cursor, row: tuple) -> dict:
+    """Собирает строку в словарь по именам столбцов"""
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+FACTORIES = {
+    "tuple": None,
+    "sqlite3.Row": sqlite3.Row,
+    "dict": dict_factory,
+    "класс с __dict__": lambda cursor, row: DictContact(*row),
+    "Contact (__slots__)": contact_factory,
+}
+
+
+def measure(conn: sqlite3.Connection, row_factory) -> tuple[float, int]:
+    """
+    Выбирает все контакты и возвращает время выборки и размер результата
+
+    Args:
+        conn (sqlite3.Connection): Соединение с базой данных
+        row_factory: Фабрика строк sqlite3 или None
+
+    Returns:
+        tuple[float, int]: Время в секундах и размер результата в байтах
+    """
+    cur = conn.cursor()
+    cur.row_factory = row_factory
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = cur.execute(f"SELECT {CONTACT_COLUMNS} FROM contacts").fetchall()
+    elapsed = time.perf_counter() - started
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rows
+    return elapsed, size
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк памяти записей контактов")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE contacts (id INTEGER PRIMARY KEY, user_id INTEGER, "
+        "first_name TEXT, last_name TEXT, phone TEXT, email TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO contacts (user_id, first_name, last_name, phone, email) VALUES (?, ?, ?, ?, ?)",
+        generate_contacts(1, args.rows, random.Random(0)),
+    )
+    for name, row_factory in FACTORIES.items():
+        elapsed, size = measure(conn, row_factory)
+        print(
+            f"{name:<20} {size / 2**20:8.1f} МБ, {size / args.rows:6.0f} байт/запись, "
+            f"fetchall {elapsed:6.2f} с"
+        )
@@ -0,0 +1,51 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import hash_password
+from utils import verify_password
+
+"""Скорость проверки паролей в зависимости от параметра стоимости scrypt
+
+Для каждого n измеряется количество проверок в секунду в одном потоке
+и в пуле потоков по числу ядер (scrypt отпускает GIL).
+
+Пример запуска: python -m benchmarks.password --costs 12 13 14 15"""
+
+
+def logins_per_sec(password_hash: str, logins: int, workers: int) -> float:
+    """
+    Возвращает количество проверок пароля в секунду
+
+    Args:
+        password_hash (str): Хэш пароля
+        logins (int): Количество проверок
+        workers (int): Количество потоков
+    """
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as executor:
+        results = list(
+            executor.map(verify_password, ["secret"] * logins, [password_hash] * logins)
+        )
+    assert all(results)
+    return logins / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк хэширования паролей")
+    parser.add_argument(
+        "--costs", type=int, nargs="+", default=[12, 13, 14, 15], help="log2(n)"
+    )
+    parser.add_argument("--logins", type=int, default=64)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    for cost in args.costs:
+        password_hash = hash_password("secret", n=2**cost)
+        single = logins_per_sec(password_hash, args.logins, 1)
+        pooled = logins_per_sec(password_hash, args.logins, cores)
+        print(
+            f"n=2^{cost}: {single:8.1f} входов/с в 1 потоке, "
+            f"{pooled:8.1f} входов/с в {cores} потоках"
+        )
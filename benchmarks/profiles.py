@@ -0,0 +1,142 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.dataset import generate
+from benchmarks.run import measure
+from db import DatabaseManager
+from profiles import PROFILES
+
+"""Пропускная способность чтения и записи для каждого профиля SQLite
+
+Исходная база с синтетическими контактами генерируется один раз. Для каждого
+профиля создается новый файл (чтобы применился page_size профиля), в который
+контакты переносятся через ATTACH внутри bulk_load() - это замер массовой
+загрузки. Затем замеряются добавление контакта с фиксацией каждой записи,
+страница контактов, карточка контакта и поиск через LIKE. Профили
+замеряются по очереди в несколько кругов, выводится медиана по кругам.
+
+Пример запуска: python -m benchmarks.profiles --contacts 1000000"""
+
+LOADED_TABLES = ("users", "contacts", "contacts_fuzzy")
+
+
+def load(db: DatabaseManager, seed_name: str) -> float:
+    """
+    Переносит пользователей, контакты и индекс нечеткого поиска из исходной базы
+
+    Args:
+        db (DatabaseManager): Менеджер новой базы
+        seed_name (str): Имя файла исходной базы
+
+    Returns:
+        float: Время загрузки в секундах
+    """
+    started = time.perf_counter()
+    db.conn.execute("ATTACH DATABASE ? AS seed", (seed_name,))
+    with db.bulk_load():
+        for table in LOADED_TABLES:
+            db.conn.execute(f"INSERT INTO {table} SELECT * FROM seed.{table}")
+    elapsed = time.perf_counter() - started
+    db.conn.execute("DETACH DATABASE seed")
+    return elapsed
+
+
+def measure_ops(
+    db: DatabaseManager,
+    contacts: int,
+    user_ids: list[int],
+    iterations: int,
+    round_number: int,
+) -> dict[str, float]:
+    """
+    Замеряет запись и чтения на загруженной базе
+
+    Args:
+        db (DatabaseManager): Менеджер базы данных
+        contacts (int): Количество контактов в базе
+        user_ids (list[int]): Идентификаторы пользователей
+        iterations (int): Количество повторений каждой операции, поиска - в 10 раз меньше
+        round_number (int): Номер круга, чтобы номера добавляемых контактов не повторялись
+
+    Returns:
+        dict[str, float]: Операций в секунду по названиям операций
+    """
+    rng = random.Random(round_number)
+    return {
+        "add_contact": measure(
+            lambda i: db.add_contact(
+                rng.choice(user_ids),
+                "Имя",
+                "Фамилия",
+                f"+5{round_number:03d}{i:07d}",
+                "a@example.com",
+            ),
+            iterations,
+        )["ops_per_sec"],
+        "страница": measure(
+            lambda i: db.get_contacts_page(
+                rng.choice(user_ids), 20, after_id=rng.randrange(contacts)
+            ),
+            iterations,
+        )["ops_per_sec"],
+        "карточка": measure(
+            lambda i: db.get_contact_details(rng.randrange(1, contacts + 1)),
+            iterations,
+        )["ops_per_sec"],
+        "поиск LIKE": measure(
+            lambda i: db.search_contacts(rng.choice(user_ids), "ова", 20),
+            max(iterations // 10, 1),
+        )["ops_per_sec"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк профилей SQLite")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--contacts", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_name = os.path.join(tmp, "seed.db")
+        seed = DatabaseManager(seed_name, profile="bulk-load")
+        started = time.perf_counter()
+        user_ids = generate(seed, args.users, args.contacts)
+        seed.close_connection()
+        print(
+            f"Исходная база: {args.contacts} контактов за {time.perf_counter() - started:.0f} с"
+        )
+
+        managers = {}
+        results: dict[str, dict[str, list[float]]] = {}
+        for profile in args.profiles:
+            db = DatabaseManager(os.path.join(tmp, f"{profile}.db"), profile=profile)
+            managers[profile] = db
+            results[profile] = {"загрузка": [args.contacts / load(db, seed_name)]}
+
+        # профили чередуются по кругам, чтобы фоновый шум виртуальной машины
+        # и прогрев кэша ОС не доставались одному профилю
+        for round_number in range(args.rounds):
+            for profile, db in managers.items():
+                measured = measure_ops(
+                    db, args.contacts, user_ids, args.iterations, round_number
+                )
+                for name, value in measured.items():
+                    results[profile].setdefault(name, []).append(value)
+
+        for profile, db in managers.items():
+            db.close_connection()
+            size = os.path.getsize(os.path.join(tmp, f"{profile}.db")) / 1024 / 1024
+            print(
+                f"{profile} ({size:.0f} МБ): "
+                + ", ".join(
+                    f"{name} {statistics.median(values):,.0f}/с"
+                    for name, values in results[profile].items()
+                )
+            )
@@ -0,0 +1,199 @@
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from benchmarks.dataset import generate
+from benchmarks.run import summarize
+from db import DatabaseManager
+from replica import ReplicatedDatabaseManager
+
+"""Смешанная нагрузка чтения и записи: одна база против основной базы с репликой
+
+Потоки-читатели листают страницы, ищут контакты и открывают карточки,
+потоки-писатели добавляют и правят контакты. Один и тот же тест выполняется
+на DatabaseManager в пуловом режиме и на ReplicatedDatabaseManager, где чтения
+идут с реплики. Для каждого прогона выводятся задержки чтений и записей
+и количество операций в секунду, для реплики - еще отставание, замеренное
+раз в 50 мс во время теста.
+
+Пример запуска: python -m benchmarks.replica --readers 6 --writers 2 --duration 5"""
+
+
+def read_op(
+    db: DatabaseManager, user_ids: list[int], ids: list[int], rng: random.Random
+) -> None:
+    """Выполняет одно случайное чтение: страницу, поиск или карточку контакта"""
+    kind = rng.random()
+    if kind < 0.5:
+        db.get_contacts_page(rng.choice(user_ids), 20)
+    elif kind < 0.8:
+        db.search_contacts(rng.choice(user_ids), "ан", 20)
+    else:
+        db.get_contact_details(rng.choice(ids))
+
+
+def write_op(
+    db: DatabaseManager,
+    user_ids: list[int],
+    ids: list[int],
+    rng: random.Random,
+    worker_id: int,
+    number: int,
+) -> None:
+    """Добавляет контакт или правит фамилию случайного контакта"""
+    if number % 2:
+        db.edit_contact(rng.choice(ids), last_name=f"Правка{number}")
+    else:
+        db.add_contact(
+            rng.choice(user_ids),
+            "Новый",
+            "Контакт",
+            f"+5{worker_id:02d}{number:08d}",
+            "new@example.com",
+        )
+
+
+def worker(
+    db: DatabaseManager,
+    user_ids: list[int],
+    ids: list[int],
+    worker_id: int,
+    writer: bool,
+    deadline: float,
+    latencies: list[float],
+) -> None:
+    """
+    Выполняет чтения или записи до наступления deadline
+
+    Args:
+        db (DatabaseManager): Менеджер базы данных
+        user_ids (list[int]): Идентификаторы пользователей
+        ids (list[int]): Идентификаторы контактов
+        worker_id (int): Номер потока
+        writer (bool): Выполнять записи вместо чтений
+        deadline (float): Момент окончания теста по time.perf_counter()
+        latencies (list[float]): Список для времени выполнения операций в секундах
+    """
+    rng = random.Random(worker_id)
+    number = 0
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            if writer:
+                write_op(db, user_ids, ids, rng, worker_id, number)
+            else:
+                read_op(db, user_ids, ids, rng)
+            latencies.append(time.perf_counter() - started)
+            number += 1
+    finally:
+        db.release_connection()
+
+
+def run(
+    db: DatabaseManager,
+    user_ids: list[int],
+    ids: list[int],
+    readers: int,
+    writers: int,
+    duration: float,
+) -> tuple[list[float], list[float], list[dict[str, float]]]:
+    """
+    Запускает читателей и писателей и собирает задержки
+
+    Returns:
+        tuple: Задержки чтений, задержки записей и замеры отставания реплики
+    """
+    reads: list[float] = []
+    writes: list[float] = []
+    lags: list[dict[str, float]] = []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(
+                db,
+                user_ids,
+                ids,
+                i,
+                i < writers,
+                deadline,
+                writes if i < writers else reads,
+            ),
+        )
+        for i in range(readers + writers)
+    ]
+    for thread in threads:
+        thread.start()
+    while time.perf_counter() < deadline:
+        if isinstance(db, ReplicatedDatabaseManager):
+            lags.append(db.replica_lag())
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join()
+    return reads, writes, lags
+
+
+def report(name: str, latencies: list[float], duration: float) -> str:
+    """Форматирует задержки одного вида операций"""
+    stats = summarize(latencies)
+    return (
+        f"{name} {len(latencies) / duration:,.0f}/с, p50 {stats['p50_ms']:.2f} мс, "
+        f"p99 {stats['p99_ms']:.2f} мс"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк чтения с реплики")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--contacts", type=int, default=50_000)
+    parser.add_argument("--readers", type=int, default=6)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--max-staleness", type=float, default=1.0)
+    parser.add_argument("--sync-interval", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_name = os.path.join(tmp, "seed.db")
+        seed = DatabaseManager(seed_name)
+        user_ids = generate(seed, args.users, args.contacts)
+        ids = [contact.id for contact in seed.iter_all_contacts()]
+        seed.close_connection()
+
+        for replicated in (False, True):
+            db_name = os.path.join(tmp, f"bench_{replicated}.db")
+            shutil.copyfile(seed_name, db_name)
+            pool_size = args.readers + args.writers
+            if replicated:
+                started = time.perf_counter()
+                db = ReplicatedDatabaseManager(
+                    db_name,
+                    replica_pool_size=args.readers,
+                    max_staleness=args.max_staleness,
+                    sync_interval=args.sync_interval,
+                    pool_size=pool_size,
+                )
+                print(
+                    f"Создание реплики: {(time.perf_counter() - started) * 1000:.0f} мс"
+                )
+            else:
+                db = DatabaseManager(db_name, pool_size=pool_size)
+            reads, writes, lags = run(
+                db, user_ids, ids, args.readers, args.writers, args.duration
+            )
+            name = "С репликой" if replicated else "Одна база"
+            print(
+                f"{name}: {report('чтения', reads, args.duration)}; "
+                f"{report('записи', writes, args.duration)}"
+            )
+            if lags:
+                print(
+                    f"  отставание: в среднем {sum(lag['changes'] for lag in lags) / len(lags):.1f} "
+                    f"записей журнала, не больше {max(lag['changes'] for lag in lags)}; "
+                    f"возраст реплики не больше {max(lag['seconds'] for lag in lags) * 1000:.0f} мс"
+                )
+            db.close_connection()
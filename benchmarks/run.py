@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+
+from benchmarks.dataset import DEFAULT_PASSWORD
+from benchmarks.dataset import LAST_NAMES
+from benchmarks.dataset import generate
+from db import ContactManager
+from db import DatabaseManager
+
+"""Замеры операций DatabaseManager и ContactManager на разных объемах данных
+
+Для каждого масштаба создается временная база с синтетическими данными,
+каждая операция выполняется заданное количество раз, а в JSON-отчет попадают
+перцентили задержки p50/p95/p99 в миллисекундах и пропускная способность.
+
+Пример запуска: python -m benchmarks.run --scales 10000 100000 --output run.json"""
+
+
+def summarize(latencies: list[float]) -> dict[str, float]:
+    """
+    Считает перцентили задержки и пропускную способность
+
+    Args:
+        latencies (list[float]): Время выполнения операций в секундах
+
+    Returns:
+        dict[str, float]: p50_ms, p95_ms, p99_ms, mean_ms и ops_per_sec
+    """
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "ops_per_sec": len(latencies) / sum(latencies),
+    }
+
+
+def measure(operation: Callable[[int], object], iterations: int) -> dict[str, float]:
+    """
+    Выполняет операцию iterations раз и возвращает сводку задержек
+
+    Args:
+        operation (Callable[[int], object]): Операция, получающая номер итерации
+        iterations (int): Количество повторений
+    """
+    latencies = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        operation(i)
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+
+def run_scale(
+    db_name: str, contacts: int, users: int, iterations: int, seed: int
+) -> dict[str, dict[str, float]]:
+    """
+    Генерирует данные одного масштаба и замеряет все операции
+
+    Args:
+        db_name (str): Имя файла временной базы
+        contacts (int): Количество контактов
+        users (int): Количество пользователей
+        iterations (int): Количество повторений каждой операции
+        seed (int): Зерно генератора случайных чисел
+
+    Returns:
+        dict[str, dict[str, float]]: Сводка задержек по имени операции
+    """
+    db = DatabaseManager(db_name)
+    user_ids = generate(db, users, contacts, seed=seed)
+    manager = ContactManager(db)
+    rng = random.Random(seed)
+    user_id = user_ids[0]
+    db.cur.execute("SELECT MAX(id) FROM contacts")
+    max_contact_id = db.cur.fetchone()[0]
+    username = f"bench_user_{seed}_0"
+    operations: dict[str, Callable[[int], object]] = {
+        "DatabaseManager.add_contact": lambda i: db.add_contact(
+            user_id, "Бенч", "Тест", f"+1555{i:07d}", "bench@example.com"
+        ),
+        "ContactManager.add_contact": lambda i: manager.add_contact(
+            user_id, "Бенч", "Тест", f"+1556{i:07d}", "bench@example.com"
+        ),
+        "DatabaseManager.search_contacts": lambda i: db.search_contacts(
+            user_id, rng.choice(LAST_NAMES)[:4]
+        ),
+        "DatabaseManager.get_contacts": lambda i: db.get_contacts(user_id),
+        "DatabaseManager.get_contacts_page": lambda i: db.get_contacts_page(
+            user_id, 50
+        ),
+        "DatabaseManager.get_contact_details": lambda i: db.get_contact_details(
+            rng.randint(1, max_contact_id)
+        ),
+        "DatabaseManager.check_duplicate_phone": lambda i: db.check_duplicate_phone(
+            f"8900{i:07d}", user_id
+        ),
+        "DatabaseManager.authenticate_user": lambda i: db.authenticate_user(
+            username, DEFAULT_PASSWORD
+        ),
+    }
+    results = {name: measure(op, iterations) for name, op in operations.items()}
+    db.close_connection()
+    return results
+
+
+def run(
+    scales: list[int], users: int, iterations: int, seed: int, db_dir: str | None
+) -> dict:
+    """
+    Замеряет все масштабы и собирает JSON-отчет
+
+    Args:
+        scales (list[int]): Количества контактов
+        users (int): Количество пользователей
+        iterations (int): Количество повторений каждой операции
+        seed (int): Зерно генератора случайных чисел
+        db_dir (str | None): Каталог для временных баз. По умолчанию системный
+
+    Returns:
+        dict: Отчет с параметрами запуска и результатами по масштабам
+    """
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "users": users,
+            "iterations": iterations,
+            "seed": seed,
+        },
+        "scales": {},
+    }
+    for contacts in scales:
+        with tempfile.TemporaryDirectory(dir=db_dir) as tmp:
+            report["scales"][str(contacts)] = run_scale(
+                os.path.join(tmp, "bench.db"), contacts, users, iterations, seed
+            )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк операций с контактами")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db-dir", help="Каталог для временных баз")
+    parser.add_argument("--output", help="Файл для JSON-отчета, по умолчанию stdout")
+    args = parser.parse_args()
+
+    report = run(args.scales, args.users, args.iterations, args.seed, args.db_dir)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
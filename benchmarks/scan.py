@@ -0,0 +1,79 @@
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.dataset import fill_contacts
+from db import DatabaseManager
+from scan import AllOf
+from scan import AnyOf
+from scan import EmailDomain
+from scan import FieldRegex
+from scan import ParallelScanner
+from scan import PhonePrefix
+
+"""Масштабирование параллельного просмотра контактов по числу процессов
+
+Одному пользователю создается заданное количество контактов, затем они
+проверяются составным условием (валидный адрес в домене, фамилия по регулярному
+выражению или префикс номера) в 1, 2, 4 и 8 процессах. Для каждого числа
+процессов выводятся время, строк в секунду и ускорение относительно одного
+процесса; результаты всех прогонов сверяются между собой. Время первого
+прогона включает запуск процессов, поэтому выводится лучшее из --repeat.
+Отдельно выводится процессорное время главного процесса (разбор результатов
+и сборка Contact): эта часть не распараллеливается и ограничивает ускорение
+на машине с нужным количеством ядер.
+
+Пример запуска: python -m benchmarks.scan --contacts 1000000 --workers 1 2 4 8"""
+
+PREDICATE = AllOf(
+    EmailDomain("example.com"),
+    AnyOf(
+        FieldRegex("last_name", r"^(смирнов|кузнецов|попов|smith)"),
+        PhonePrefix("8900005"),
+    ),
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк параллельного просмотра")
+    parser.add_argument("--contacts", type=int, default=500_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Доступно ядер: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, "bench.db")
+        db = DatabaseManager(db_name)
+        started = time.perf_counter()
+        fill_contacts(db, 1, args.contacts)
+        db.close_connection()
+        print(
+            f"Создано {args.contacts} контактов за {time.perf_counter() - started:.1f} с"
+        )
+
+        expected = None
+        single = None
+        for workers in args.workers:
+            scanner = ParallelScanner(db_name, workers, args.chunk_size)
+            best = float("inf")
+            parent_cpu = float("inf")
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                cpu_started = time.process_time()
+                found = scanner.scan(PREDICATE, user_id=1)
+                best = min(best, time.perf_counter() - started)
+                parent_cpu = min(parent_cpu, time.process_time() - cpu_started)
+            scanner.close()
+            ids = [contact.id for contact in found]
+            if expected is None:
+                expected = ids
+            assert ids == expected, "результаты прогонов различаются"
+            single = single or best
+            print(
+                f"{workers} процессов: {best * 1000:.0f} мс, "
+                f"{args.contacts / best:,.0f} строк/с, найдено {len(ids)}, "
+                f"x{single / best:.2f}, CPU главного процесса {parent_cpu * 1000:.0f} мс"
+            )
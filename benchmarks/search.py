@@ -0,0 +1,56 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.dataset import LAST_NAMES
+from benchmarks.dataset import fill_contacts
+from db import DatabaseManager
+
+"""Сравнение поиска контактов через LIKE и через полнотекстовый индекс FTS5
+
+Пример запуска: python -m benchmarks.search --sizes 10000 100000 1000000"""
+
+
+def time_queries(db: DatabaseManager, user_id: int, queries: list[str]) -> float:
+    """
+    Возвращает среднее время одного поиска в миллисекундах
+
+    Args:
+        db (DatabaseManager): Менеджер базы данных
+        user_id (int): Идентификатор пользователя
+        queries (list[str]): Поисковые запросы
+    """
+    started = time.perf_counter()
+    for query in queries:
+        db.search_contacts(user_id, query, limit=20)
+    return (time.perf_counter() - started) / len(queries) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска контактов")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for size in args.sizes:
+        queries = [
+            rng.choice([rng.choice(LAST_NAMES)[:4], f"user1.{rng.randrange(size)}"])
+            for _ in range(args.queries)
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            db_name = os.path.join(tmp, "bench.db")
+            db = DatabaseManager(db_name)
+            if not db.fts_available:
+                print("SQLite собран без FTS5, сравнение невозможно")
+                break
+            fill_contacts(db, 1, size)
+            like_ms = time_queries(db, 1, queries)
+            db.search_mode = "fts"
+            fts_ms = time_queries(db, 1, queries)
+            db.close_connection()
+        print(f"{size:>9} контактов: LIKE {like_ms:8.2f} мс, FTS5 {fts_ms:8.2f} мс")
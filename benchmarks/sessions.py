@@ -0,0 +1,68 @@
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.dataset import DEFAULT_PASSWORD
+from benchmarks.run import measure
+from db import DatabaseManager
+from sessions import SessionManager
+
+"""Проверка токена сессии против повторной аутентификации по паролю
+
+Сравнивается время одной операции "узнать пользователя запроса":
+authenticate_user (поиск в users и scrypt) и SessionManager.validate
+(SHA-256 токена и поиск в словаре). Дополнительно замеряется выдача
+токена и загрузка сессий из базы при старте менеджера.
+
+Пример запуска: python -m benchmarks.sessions --sessions 100000"""
+
+
+def report(name: str, stats: dict[str, float]) -> None:
+    """Выводит перцентили и пропускную способность из сводки measure"""
+    print(
+        f"{name:<20} p50 {stats['p50_ms'] * 1000:10.1f} мкс, "
+        f"p99 {stats['p99_ms'] * 1000:10.1f} мкс, {stats['ops_per_sec']:12,.0f} оп/с"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк сессий")
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--validations", type=int, default=100_000)
+    parser.add_argument("--sessions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        db.add_user("bench", DEFAULT_PASSWORD)
+        user_id = db.authenticate_user("bench", DEFAULT_PASSWORD)
+        sessions = SessionManager(db)
+
+        report(
+            "authenticate_user",
+            measure(
+                lambda _: db.authenticate_user("bench", DEFAULT_PASSWORD), args.logins
+            ),
+        )
+        with db.transaction():
+            tokens = [sessions.create(user_id) for _ in range(args.sessions)]
+        report(
+            "validate",
+            measure(
+                lambda i: sessions.validate(tokens[i % len(tokens)]), args.validations
+            ),
+        )
+        report(
+            "validate (чужой)",
+            measure(lambda i: sessions.validate(f"unknown{i}"), args.validations),
+        )
+        report("create", measure(lambda _: sessions.create(user_id), args.logins))
+
+        started = time.perf_counter()
+        reloaded = SessionManager(db)
+        print(
+            f"Загрузка {len(reloaded)} сессий из базы: "
+            f"{(time.perf_counter() - started) * 1000:.0f} мс"
+        )
+        db.close_connection()
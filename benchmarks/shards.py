@@ -0,0 +1,148 @@
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from db import DatabaseManager
+from shards import ShardedDatabaseManager
+
+"""Пропускная способность шардированного хранилища против одного файла
+
+Несколько потоков одновременно добавляют контакты и читают страницы контактов
+своих пользователей. Один и тот же тест выполняется на одном файле
+DatabaseManager в пуловом режиме и на ShardedDatabaseManager с разным
+количеством шардов. После каждого шардированного прогона замеряется
+rebalance() на один шард больше: сколько пользователей перенесено и за какое время.
+
+Пример запуска: python -m benchmarks.shards --threads 8 --shards 2 4 8"""
+
+
+def worker(
+    db: DatabaseManager | ShardedDatabaseManager,
+    worker_id: int,
+    threads: int,
+    users: int,
+    write_share: float,
+    deadline: float,
+    counts: list[int],
+) -> None:
+    """
+    Выполняет операции до наступления deadline и записывает их количество в counts
+
+    Поток работает с пользователями worker_id, worker_id + threads, ...
+
+    Args:
+        db (DatabaseManager | ShardedDatabaseManager): Хранилище
+        worker_id (int): Номер потока
+        threads (int): Общее количество потоков
+        users (int): Общее количество пользователей
+        write_share (float): Доля операций добавления
+        deadline (float): Момент окончания теста по time.perf_counter()
+        counts (list[int]): Список для результата
+    """
+    own_users = list(range(worker_id + 1, users + 1, threads))
+    writes_every = round(1 / write_share) if write_share else 0
+    done = 0
+    try:
+        while time.perf_counter() < deadline:
+            user_id = own_users[done % len(own_users)]
+            if writes_every and done % writes_every == 0:
+                db.add_contact(
+                    user_id,
+                    "Имя",
+                    "Фамилия",
+                    f"+7{worker_id:03d}{done:07d}",
+                    "a@example.com",
+                )
+            else:
+                db.get_contacts_page(user_id, 20)
+            done += 1
+    finally:
+        db.release_connection()
+    counts[worker_id] = done
+
+
+def prepare(db: DatabaseManager | ShardedDatabaseManager, users: int) -> None:
+    """
+    Добавляет каждому пользователю по контакту до замера
+
+    В шардированном хранилище так пользователи заранее закрепляются за шардами,
+    и запись в каталог при первом контакте не попадает в замер
+    """
+    db.add_contacts(
+        (user_id, "Имя", "Фамилия", f"+1{user_id:09d}", "a@example.com")
+        for user_id in range(1, users + 1)
+    )
+    db.release_connection()
+
+
+def run(
+    db: DatabaseManager | ShardedDatabaseManager,
+    threads: int,
+    users: int,
+    write_share: float,
+    duration: float,
+) -> float:
+    """
+    Запускает потоки и возвращает количество операций в секунду
+
+    Args:
+        db (DatabaseManager | ShardedDatabaseManager): Хранилище
+        threads (int): Количество потоков
+        users (int): Количество пользователей
+        write_share (float): Доля операций добавления
+        duration (float): Длительность теста в секундах
+    """
+    counts = [0] * threads
+    started = time.perf_counter()
+    deadline = started + duration
+    pool = [
+        threading.Thread(
+            target=worker,
+            args=(db, i, threads, users, write_share, deadline, counts),
+        )
+        for i in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк шардированного хранилища")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--shards", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--write-share", type=float, default=0.5)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "single.db"), pool_size=args.threads)
+        prepare(db, args.users)
+        baseline = run(db, args.threads, args.users, args.write_share, args.duration)
+        db.close_connection()
+        print(f"Один файл: {baseline:,.0f} операций/с")
+
+        for shard_count in args.shards:
+            db = ShardedDatabaseManager(
+                os.path.join(tmp, f"sharded_{shard_count}"),
+                shard_count=shard_count,
+                pool_size=args.threads,
+            )
+            prepare(db, args.users)
+            throughput = run(
+                db, args.threads, args.users, args.write_share, args.duration
+            )
+            started = time.perf_counter()
+            moved = db.rebalance(shard_count + 1)
+            elapsed = time.perf_counter() - started
+            db.close_connection()
+            print(
+                f"{shard_count} шардов: {throughput:,.0f} операций/с "
+                f"(x{throughput / baseline:.2f}), rebalance на {shard_count + 1}: "
+                f"перенесено {moved} из {args.users} пользователей за {elapsed:.2f} с"
+            )
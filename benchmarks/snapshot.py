@@ -0,0 +1,71 @@
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.dataset import fill_contacts
+from db import DatabaseManager
+from snapshot import export_csv
+from snapshot import export_jsonl
+from snapshot import export_snapshot
+from snapshot import restore_snapshot
+
+"""Скорость экспорта контактов в снимок, CSV и JSONL и восстановления из снимка
+
+Для сравнения замеряется чтение всех контактов через get_contacts (fetchall).
+
+Пример запуска: python -m benchmarks.snapshot --rows 1000000"""
+
+EXPORTERS = {
+    "snapshot": (export_snapshot, "contacts.snap"),
+    "csv": (export_csv, "contacts.csv"),
+    "jsonl": (export_jsonl, "contacts.jsonl"),
+}
+
+
+def report(name: str, rows: int, elapsed: float, size: int | None = None) -> None:
+    """Печатает скорость операции и размер файла"""
+    line = f"{name:<22} {elapsed:7.2f} с, {rows / elapsed:>10.0f} строк/с"
+    if size is not None:
+        line += f", {size / 2**20:7.1f} МБ"
+    print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк экспорта контактов")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        fill_contacts(db, 1, args.rows)
+
+        started = time.perf_counter()
+        db.get_contacts(1)
+        report("get_contacts", args.rows, time.perf_counter() - started)
+
+        for name, (exporter, file_name) in EXPORTERS.items():
+            path = os.path.join(tmp, file_name)
+            started = time.perf_counter()
+            exporter(db, path, 1, args.chunk_size)
+            report(
+                f"экспорт {name}",
+                args.rows,
+                time.perf_counter() - started,
+                os.path.getsize(path),
+            )
+        db.close_connection()
+
+        for bulk in (True, False):
+            restored = DatabaseManager(os.path.join(tmp, f"restored_{bulk}.db"))
+            started = time.perf_counter()
+            count = restore_snapshot(
+                restored, os.path.join(tmp, "contacts.snap"), bulk=bulk
+            )
+            report(
+                "восстановление bulk" if bulk else "восстановление по кускам",
+                count,
+                time.perf_counter() - started,
+            )
+            restored.close_connection()
@@ -0,0 +1,123 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+"""Время запуска консольного приложения
+
+console_app.py запускается отдельным процессом без аргументов во временном
+каталоге и сразу получает пункт меню "Выход", поэтому замеряется импорт модулей
+и вывод меню: база в этом сценарии не открывается. Отдельно замеряется
+пакетный режим с неизвестным токеном, который разбирает аргументы, открывает
+базу и загружает сессии. Его первый запуск создает схему новой базы и выводится
+отдельно. Для сравнения замеряется запуск пустого интерпретатора. Если медиана
+запуска меню превышает --target-ms, бенчмарк завершается с кодом 1.
+
+С --importtime выводятся самые дорогие модули по отчету python -X importtime.
+
+Пример запуска: python -m benchmarks.startup --runs 30 --target-ms 60 --importtime"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONSOLE_APP = os.path.join(ROOT, "console_app.py")
+EXIT_CHOICE = "3\n"
+
+
+def run_once(command: list[str], cwd: str) -> float:
+    """
+    Запускает команду с пунктом "Выход" на stdin
+
+    Код завершения не проверяется: пакетный режим с неизвестным токеном
+    завершается с кодом 2
+
+    Args:
+        command (list[str]): Команда запуска
+        cwd (str): Рабочий каталог процесса
+
+    Returns:
+        float: Время до завершения процесса в секундах
+    """
+    started = time.perf_counter()
+    subprocess.run(
+        command,
+        input=EXIT_CHOICE,
+        text=True,
+        cwd=cwd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - started
+
+
+def median_ms(command: list[str], cwd: str, runs: int) -> float:
+    """Возвращает медиану времени запуска в миллисекундах"""
+    return statistics.median(run_once(command, cwd) for _ in range(runs)) * 1000
+
+
+def import_report(command: list[str], cwd: str, top: int) -> list[str]:
+    """
+    Возвращает самые дорогие импорты по суммарному времени с вложенными модулями
+
+    Args:
+        command (list[str]): Команда запуска
+        cwd (str): Рабочий каталог процесса
+        top (int): Количество строк отчета
+
+    Returns:
+        list[str]: Строки вида "время мс  модуль"
+    """
+    result = subprocess.run(
+        [command[0], "-X", "importtime", *command[1:]],
+        input=EXIT_CHOICE,
+        text=True,
+        cwd=cwd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        imports.append((int(cumulative), module.rstrip()))
+    imports.sort(reverse=True)
+    return [
+        f"{cumulative / 1000:8.1f} мс  {module}" for cumulative, module in imports[:top]
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк запуска console_app.py")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--target-ms", type=float, default=60.0)
+    parser.add_argument("--importtime", action="store_true")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        menu = [sys.executable, CONSOLE_APP]
+        script = menu + ["--db", "bench.db", "--script", "-", "--token", "unknown"]
+        first = run_once(script, tmp) * 1000
+        # Прогрев: байткод модулей записывается в __pycache__ при первом импорте
+        run_once(menu, tmp)
+        bare = median_ms([sys.executable, "-c", "pass"], tmp, args.runs)
+        startup = median_ms(menu, tmp, args.runs)
+        script_startup = median_ms(script, tmp, args.runs)
+        print(f"Пустой интерпретатор: {bare:.0f} мс")
+        print(
+            f"Меню: {startup:.0f} мс (без интерпретатора {startup - bare:.0f} мс), "
+            f"цель {args.target_ms:.0f} мс"
+        )
+        print(
+            f"Пакетный режим: {script_startup:.0f} мс, "
+            f"первый запуск с созданием схемы {first:.0f} мс"
+        )
+        if args.importtime:
+            print("Меню:")
+            print("\n".join(import_report(menu, tmp, args.top)))
+            print("Пакетный режим:")
+            print("\n".join(import_report(script, tmp, args.top)))
+
+    sys.exit(0 if startup <= args.target_ms else 1)
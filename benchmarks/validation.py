@@ -0,0 +1,77 @@
+import argparse
+import random
+import re
+import time
+
+from reges import isValidEmail
+from reges import isValidPhone
+from reges import normalize_phone
+from reges import ValidationResult
+from reges import validate_emails
+from reges import validate_phones
+
+"""Микробенчмарк валидаторов reges.py
+
+Сравнивает проверку по одному значению, пакетную проверку (которая дополнительно
+возвращает причину отказа и нормализованное значение) и прежний вариант,
+компилировавший регулярное выражение при каждом вызове.
+
+Пример запуска: python -m benchmarks.validation --count 200000"""
+
+
+def legacy_is_valid_phone(phone: str) -> bool:
+    """Прежняя реализация isValidPhone с re.compile на каждый вызов"""
+    regex = re.compile(r"^((8|\+7)[\- ]?)?(\(?\d{3,4}\)?[\- ]?)?[\d\- ]{5,10}$")
+    return bool(re.fullmatch(regex, phone))
+
+
+def single_phone_results(phones: list[str]) -> list[ValidationResult]:
+    """Строит те же результаты, что validate_phones, вызывая валидаторы по одному"""
+    return [
+        (
+            ValidationResult(p, True, None, normalize_phone(p))
+            if isValidPhone(p)
+            else ValidationResult(p, False, "неверный формат номера", None)
+        )
+        for p in phones
+    ]
+
+
+def rate(func, values: list[str]) -> float:
+    """
+    Возвращает количество проверок в секунду
+
+    Args:
+        func: Функция, принимающая список значений
+        values (list[str]): Значения для проверки
+    """
+    started = time.perf_counter()
+    func(values)
+    return len(values) / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк валидаторов")
+    parser.add_argument("--count", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    phones = [
+        rng.choice(["8", "+7 ", ""]) + str(rng.randrange(10**9, 10**10))
+        for _ in range(args.count)
+    ]
+    emails = [f"user{i}.name@example.com" for i in range(args.count)]
+    cases = [
+        (
+            "телефон, по одному (старый)",
+            lambda v: [legacy_is_valid_phone(p) for p in v],
+            phones,
+        ),
+        ("телефон, по одному", lambda v: [isValidPhone(p) for p in v], phones),
+        ("телефон + результат, по одному", single_phone_results, phones),
+        ("телефон + результат, пакетом", validate_phones, phones),
+        ("email, по одному", lambda v: [isValidEmail(e) for e in v], emails),
+        ("email, пакетом", validate_emails, emails),
+    ]
+    for name, func, values in cases:
+        print(f"{name:<30} {rate(func, values):12.0f} проверок/с")
@@ -0,0 +1,300 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from typing import Any
+
+from db import DatabaseManager
+from schemas.contacts import Contact
+
+"""Кэш чтения перед DatabaseManager
+
+Детали контакта кэшируются по id контакта, списки и страницы контактов - по id
+пользователя. Записи вытесняются по принципу LRU и сбрасываются при добавлении,
+изменении и удалении контактов через тот же менеджер. Contact изменяемый,
+поэтому вызывающий код получает копии, а объекты в кэше не меняются"""
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Этот класс хранит ограниченное количество значений, вытесняя самые давно использованные
+
+    Attributes:
+        maxsize (int): Максимальное количество записей
+        hits (int): Количество попаданий
+        misses (int): Количество промахов
+        evictions (int): Количество вытесненных записей
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        """
+        Инициализирует пустой кэш
+
+        Args:
+            maxsize (int): Максимальное количество записей. По умолчанию 1024
+        """
+        if maxsize < 1:
+            raise ValueError("Размер кэша должен быть положительным")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Возвращает значение по ключу и отмечает его как недавно использованное
+
+        Args:
+            key (Hashable): Ключ
+            default (Any): Значение при промахе. По умолчанию None
+
+        Returns:
+            Any: Сохраненное значение или default
+        """
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Возвращает значение по ключу, не меняя порядок вытеснения и счетчики
+
+        Args:
+            key (Hashable): Ключ
+            default (Any): Значение при отсутствии ключа. По умолчанию None
+
+        Returns:
+            Any: Сохраненное значение или default
+        """
+        with self._lock:
+            return self._data.get(key, default)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Сохраняет значение, при переполнении вытесняя самую старую запись
+
+        Args:
+            key (Hashable): Ключ
+            value (Any): Значение
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Удаляет запись по ключу, если она есть
+
+        Args:
+            key (Hashable): Ключ
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Удаляет все записи, счетчики сохраняются"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Возвращает счетчики кэша
+
+        Returns:
+            dict[str, int | float]: size, maxsize, hits, misses, evictions и hit_rate
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
+
+    def reset_stats(self) -> None:
+        """Обнуляет счетчики попаданий, промахов и вытеснений"""
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+
+def _contact_key(contact_id: int | str) -> tuple[str, Hashable]:
+    """Строит ключ кэша для контакта, id из input() приводится к числу"""
+    if isinstance(contact_id, str) and contact_id.strip().isdigit():
+        contact_id = int(contact_id)
+    return ("contact", contact_id)
+
+
+def _user_key(user_id: int) -> tuple[str, int]:
+    """Строит ключ кэша для списка контактов пользователя"""
+    return ("user", user_id)
+
+
+def _copy(contact: Contact) -> Contact:
+    """Возвращает копию контакта, чтобы изменения вызывающего кода не попадали в кэш"""
+    return Contact(*contact.as_tuple())
+
+
+class CachedDatabaseManager(DatabaseManager):
+    """
+    Менеджер базы данных с кэшем чтения get_contact_details, get_contacts
+    и get_contacts_page (через нее и iter_contacts)
+
+    Страницы пользователя хранятся под ключом с номером поколения, который
+    увеличивается при каждом изменении его контактов, поэтому одна запись
+    сбрасывает сразу все его страницы, а старые вытесняются по LRU
+
+    Изменения, сделанные в обход этого менеджера (другим процессом или другим
+    экземпляром), кэш не видит
+
+    Attributes:
+        cache (LRUCache): Кэш контактов и списков контактов
+    """
+
+    def __init__(self, db_name: str, cache_size: int = 1024, **kwargs: Any) -> None:
+        """
+        Инициализирует менеджер базы данных и пустой кэш
+
+        Args:
+            db_name (str): Имя файла базы данных
+            cache_size (int): Максимальное количество записей кэша. По умолчанию 1024
+            **kwargs: Остальные параметры DatabaseManager
+        """
+        self.cache = LRUCache(cache_size)
+        self._generations: dict[int, int] = {}
+        super().__init__(db_name, **kwargs)
+
+    def cache_stats(self) -> dict[str, int | float]:
+        """
+        Возвращает счетчики кэша
+
+        Returns:
+            dict[str, int | float]: size, maxsize, hits, misses, evictions и hit_rate
+        """
+        return self.cache.stats()
+
+    def _contact_owner(self, contact_id: int | str) -> int | None:
+        """Возвращает id владельца контакта, по возможности без запроса к базе"""
+        contact = self.cache.peek(_contact_key(contact_id))
+        if contact is not None:
+            return contact.user_id
+        self.cur.execute("SELECT user_id FROM contacts WHERE id=?", (contact_id,))
+        row = self.cur.fetchone()
+        return row[0] if row else None
+
+    def _invalidate_contact(self, contact_id: int | str, user_id: int | None) -> None:
+        """Сбрасывает кэш контакта и списка контактов его владельца"""
+        self.cache.invalidate(_contact_key(contact_id))
+        if user_id is not None:
+            self._invalidate_user(user_id)
+
+    def _invalidate_user(self, user_id: int) -> None:
+        """Сбрасывает кэш списка и всех страниц контактов пользователя"""
+        self.cache.invalidate(_user_key(user_id))
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def get_contact_details(self, contact_id: int) -> Contact | None:
+        """Возвращает контакт из кэша или из базы данных"""
+        key = _contact_key(contact_id)
+        contact = self.cache.get(key)
+        if contact is None:
+            contact = super().get_contact_details(contact_id)
+            if contact is None:
+                return None
+            self.cache.put(key, contact)
+        return _copy(contact)
+
+    def get_contacts(self, user_id: int) -> list[Contact]:
+        """Возвращает список контактов пользователя из кэша или из базы данных"""
+        key = _user_key(user_id)
+        contacts = self.cache.get(key)
+        if contacts is None:
+            contacts = tuple(super().get_contacts(user_id))
+            self.cache.put(key, contacts)
+        return [_copy(contact) for contact in contacts]
+
+    def get_contacts_page(
+        self,
+        user_id: int,
+        page_size: int = 50,
+        after_id: int | None = None,
+        before_id: int | None = None,
+    ) -> list[Contact]:
+        """Возвращает страницу контактов пользователя из кэша или из базы данных"""
+        key = (
+            "page",
+            user_id,
+            self._generations.get(user_id, 0),
+            page_size,
+            after_id,
+            before_id,
+        )
+        page = self.cache.get(key)
+        if page is None:
+            page = tuple(
+                super().get_contacts_page(user_id, page_size, after_id, before_id)
+            )
+            self.cache.put(key, page)
+        return [_copy(contact) for contact in page]
+
+    def add_contact(
+        self, user_id: int, first_name: str, last_name: str, phone: str, email: str
+    ) -> int:
+        """Добавляет контакт и сбрасывает кэш списка контактов пользователя"""
+        contact_id = super().add_contact(user_id, first_name, last_name, phone, email)
+        self._invalidate_user(user_id)
+        return contact_id
+
+    def add_contacts(self, contacts: Iterable[tuple]) -> None:
+        """Добавляет пачку контактов и сбрасывает кэш списков их владельцев"""
+        contacts = list(contacts)
+        super().add_contacts(contacts)
+        for user_id in {contact[0] for contact in contacts}:
+            self._invalidate_user(user_id)
+
+    def edit_contact(
+        self,
+        contact_id: int,
+        first_name: str | None = None,
+        last_name: str | None = None,
+        phone: str | None = None,
+        email: str | None = None,
+    ) -> None:
+        """Редактирует контакт и сбрасывает связанные записи кэша"""
+        user_id = self._contact_owner(contact_id)
+        super().edit_contact(contact_id, first_name, last_name, phone, email)
+        self._invalidate_contact(contact_id, user_id)
+
+    def delete_contact(self, contact_id: int) -> None:
+        """Удаляет контакт и сбрасывает связанные записи кэша"""
+        user_id = self._contact_owner(contact_id)
+        super().delete_contact(contact_id)
+        self._invalidate_contact(contact_id, user_id)
+
+    def merge_contacts(
+        self, keep_id: int, duplicate_ids: Iterable[int], fields: dict[str, str]
+    ) -> None:
+        """Объединяет дубликаты и сбрасывает связанные записи кэша"""
+        duplicate_ids = list(duplicate_ids)
+        user_id = self._contact_owner(keep_id)
+        super().merge_contacts(keep_id, duplicate_ids, fields)
+        for contact_id in [keep_id, *duplicate_ids]:
+            self._invalidate_contact(contact_id, user_id)
+
+    def clear_table(self, table_name: str) -> None:
+        """Очищает таблицу и весь кэш"""
+        super().clear_table(table_name)
+        self.cache.clear()
@@ -0,0 +1,127 @@
+import argparse
+import json
+import sys
+from collections.abc import Iterable
+
+from db import ChangeLogCompactedError
+from db import DatabaseManager
+from schemas.changes import Change
+from schemas.contacts import Contact
+
+"""Инкрементальная синхронизация контактов по журналу изменений
+
+Триггеры на таблице contacts пишут каждую вставку, изменение и удаление
+в журнал contact_changes с растущим номером seq (см. миграцию 8). Копия
+контактов (ContactMirror) помнит номер последней примененной записи и при
+синхронизации читает только более поздние записи, то есть работает
+за O(изменений), а не за O(строк). Если журнал сжат дальше ее позиции,
+копия один раз загружается целиком.
+
+Из командной строки журнал можно читать в формате JSONL и сжимать:
+    python -m changes --db contacts.db --since 120
+    python -m changes --db contacts.db --compact 100"""
+
+
+class ContactMirror:
+    """
+    Копия контактов в памяти, синхронизируемая по журналу изменений
+
+    Attributes:
+        db (DatabaseManager): Менеджер базы данных
+        user_id (int | None): Владелец копируемых контактов, None - все пользователи
+        contacts (dict[int, Contact]): Контакты по идентификатору
+        seq (int | None): Номер последней примененной записи, None до первой синхронизации
+        full_loads (int): Сколько раз копия загружалась целиком
+    """
+
+    def __init__(self, db_manager: "DatabaseManager", user_id: int | None = None):
+        """
+        Инициализирует пустую копию
+
+        Args:
+            db_manager (DatabaseManager): Менеджер базы данных
+            user_id (int | None): Владелец копируемых контактов. По умолчанию все пользователи
+        """
+        self.db = db_manager
+        self.user_id = user_id
+        self.contacts: dict[int, Contact] = {}
+        self.seq: int | None = None
+        self.full_loads = 0
+
+    def sync(self) -> int:
+        """
+        Применяет изменения, появившиеся после прошлой синхронизации
+
+        Returns:
+            int: Количество примененных записей журнала, при полной загрузке - количество контактов
+        """
+        if self.seq is not None:
+            try:
+                return self._apply(self.db.iter_changes(self.seq, self.user_id))
+            except ChangeLogCompactedError:
+                pass
+        return self._load()
+
+    def _load(self) -> int:
+        """
+        Загружает контакты целиком
+
+        Позиция журнала читается до контактов: изменения, попавшие между
+        двумя чтениями, применятся повторно при следующей синхронизации,
+        что безопасно, так как записи применяются как замена по id
+        """
+        seq = self.db.get_change_seq()
+        if self.user_id is None:
+            contacts = self.db.iter_all_contacts()
+        else:
+            contacts = self.db.iter_contacts(self.user_id)
+        self.contacts = {contact.id: contact for contact in contacts}
+        self.seq = seq
+        self.full_loads += 1
+        return len(self.contacts)
+
+    def _apply(self, changes: Iterable[Change]) -> int:
+        """Применяет записи журнала и сдвигает позицию"""
+        applied = 0
+        for change in changes:
+            if change.contact is None:
+                self.contacts.pop(change.contact_id, None)
+            else:
+                self.contacts[change.contact_id] = change.contact
+            self.seq = change.seq
+            applied += 1
+        return applied
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Журнал изменений контактов")
+    parser.add_argument("--db", default="./contacts.db")
+    parser.add_argument(
+        "--since", type=int, default=0, help="последняя прочитанная позиция"
+    )
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument(
+        "--compact", type=int, metavar="HORIZON", help="сжать журнал до позиции"
+    )
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    if args.compact is not None:
+        deleted = db.compact_changes(args.compact)
+        print(f"Удалено записей журнала: {deleted}", file=sys.stderr)
+    else:
+        try:
+            for change in db.iter_changes(args.since, args.user_id):
+                record = {
+                    "seq": change.seq,
+                    "op": change.op,
+                    "contact_id": change.contact_id,
+                    "user_id": change.user_id,
+                    "contact": change.contact and change.contact.as_dict(),
+                }
+                print(json.dumps(record, ensure_ascii=False))
+        except ChangeLogCompactedError as error:
+            print(error, file=sys.stderr)
+            db.close_connection()
+            sys.exit(2)
+    db.close_connection()
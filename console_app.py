@@ -1,23 +1,226 @@
-from db import DatabaseManager
-from db import AuthManager
-from db import ContactManager
+import os
+import sqlite3
+import sys
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+from profiles import INTERACTIVE_PROFILES
 from reges import isValidEmail
 from reges import isValidPhone
 
+if TYPE_CHECKING:
+    import argparse
+
+    from cache import CachedDatabaseManager
+    from db import ContactManager
+
 """Это основная часть кода, где создается соединение с базой данных, инициализируются объекты менеджеров, и запускается пользовательский интерфейс
 Oсновные шаги:
 Инициализация соединения с базой данных
-Создание объектов DatabaseManager, AuthManager и ContactManager
+Создание объектов CachedDatabaseManager, AuthManager и ContactManager
 Представление пользователю меню для регистрации, входа и управления контактами
 Обработка ввода пользователя и выполнение соответствующих действий
 а также при необходимости очистка базы данных,которая закоментирована на данный момент"""
 
+PAGE_SIZE = 20
+DUPLICATE_PHONE_MESSAGE = "Контакт с таким номером телефона уже существует!"
+SLOW_QUERY_ENV = "CONTACTS_SLOW_QUERY_MS"
+PASSWORD_ENV = "CONTACTS_PASSWORD"
+PROFILE_ENV = "CONTACTS_DB_PROFILE"
+DEFAULT_ARGS = {
+    "db": "./contacts.db",
+    "script": None,
+    "username": None,
+    "password": None,
+    "token": None,
+    "batch_size": 1000,
+    "profile": None,
+}
 
-if __name__ == "__main__":
-    db_name = "./contacts.db"
-    db_manager = DatabaseManager(db_name)
+
+def browse_contacts(contact_manager: "ContactManager", user_id: int) -> bool:
+    """
+    Постранично выводит контакты пользователя с навигацией вперёд и назад
+
+    Args:
+        contact_manager (ContactManager): Менеджер контактов
+        user_id (int): Идентификатор пользователя
+
+    Returns:
+        bool: False, если у пользователя нет контактов, иначе True
+    """
+    page = contact_manager.view_contacts_page(user_id, PAGE_SIZE)
+    if not page:
+        print("Ваш список контактов пуст!")
+        return False
+    page_number = 1
+    while True:
+        print(f"\nСписок ваших контактов (страница {page_number}):")
+        for contact in page:
+            print(
+                f"ID: {contact.id}, Имя: {contact.first_name}, Фамилия: {contact.last_name}, Номер телефона: {contact.phone}"
+            )
+        command = input(
+            "n - следующая страница, p - предыдущая, Enter - закончить просмотр:"
+        ).lower()
+        if command == "n":
+            next_page = contact_manager.view_contacts_page(
+                user_id, PAGE_SIZE, after_id=page[-1].id
+            )
+            if next_page:
+                page = next_page
+                page_number += 1
+            else:
+                print("Это последняя страница")
+        elif command == "p":
+            prev_page = contact_manager.view_contacts_page(
+                user_id, PAGE_SIZE, before_id=page[0].id
+            )
+            if prev_page:
+                page = prev_page
+                page_number -= 1
+            else:
+                print("Это первая страница")
+        else:
+            return True
+
+
+def print_query_stats(db_manager: "CachedDatabaseManager", limit: int = 15) -> None:
+    """
+    Выводит статистику SQL-запросов, при первом вызове включает ее сбор
+
+    Args:
+        db_manager (CachedDatabaseManager): Менеджер базы данных
+        limit (int): Сколько самых долгих запросов вывести. По умолчанию 15
+    """
+    if db_manager.query_stats is None:
+        db_manager.enable_instrumentation()
+        print("Сбор статистики запросов включен")
+        return
+    snapshot = db_manager.query_stats.snapshot()
+    print("\nСтатистика запросов (по суммарному времени):")
+    for item in snapshot[:limit]:
+        print(
+            f"{item['count']:>6} раз, всего {item['total_ms']:.1f} мс, "
+            f"сред. {item['avg_ms']:.2f} мс, макс. {item['max_ms']:.2f} мс, "
+            f"строк {item['rows']}: {item['sql'][:100]}"
+        )
+    cache = db_manager.cache_stats()
+    print(
+        f"Кэш: попаданий {cache['hits']}, промахов {cache['misses']}, "
+        f"доля попаданий {cache['hit_rate']:.0%}"
+    )
+    if input("Сбросить статистику? (да/нет):").lower() == "да":
+        db_manager.query_stats.reset()
+
+
+def run_script(db_manager: "CachedDatabaseManager", args: "argparse.Namespace") -> int:
+    """
+    Выполняет команды из файла или stdin без интерактивного меню
+
+    Пользователь определяется по токену сессии (--token) или по имени и паролю
+    (--username и --password либо переменная окружения CONTACTS_PASSWORD).
+    Результаты операций печатаются в stdout в формате JSONL, итоги - в stderr
+
+    Args:
+        db_manager (CachedDatabaseManager): Менеджер базы данных
+        args (argparse.Namespace): Аргументы командной строки
+
+    Returns:
+        int: Код завершения: 0 - все операции успешны, 1 - есть ошибки, 2 - вход не выполнен
+    """
+    from batch import BatchRunner
+    from sessions import validate_token
+
+    if args.token:
+        user_id = validate_token(db_manager, args.token)
+    else:
+        password = args.password or os.environ.get(PASSWORD_ENV, "")
+        user_id = db_manager.authenticate_user(args.username or "", password)
+    if user_id is None:
+        print("Неверный токен, ник или пароль", file=sys.stderr)
+        return 2
+    runner = BatchRunner(db_manager, user_id, args.batch_size)
+    if args.script == "-":
+        report = runner.run(sys.stdin, sys.stdout)
+    else:
+        with open(args.script, encoding="utf-8") as f:
+            report = runner.run(f, sys.stdout)
+    print(report, file=sys.stderr)
+    return 1 if report.failed else 0
+
+
+def parse_args(argv: list[str]) -> "argparse.Namespace | SimpleNamespace":
+    """
+    Разбирает аргументы командной строки
+
+    Обычный интерактивный запуск идет без аргументов, и тогда argparse
+    не импортируется: вместе с shutil и locale, которые он подтягивает
+    при построении парсера, это заметная часть времени запуска
+
+    Args:
+        argv (list[str]): Аргументы без имени программы
+
+    Returns:
+        argparse.Namespace | SimpleNamespace: Разобранные аргументы
+    """
+    if not argv:
+        return SimpleNamespace(**DEFAULT_ARGS)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Консольное приложение контактов")
+    parser.add_argument("--db", default=DEFAULT_ARGS["db"])
+    parser.add_argument(
+        "--script", help="JSONL-файл с командами для пакетного режима, - для stdin"
+    )
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--token", help="токен сессии вместо ника и пароля")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_ARGS["batch_size"])
+    parser.add_argument(
+        "--profile",
+        choices=INTERACTIVE_PROFILES,
+        help=f"профиль настроек SQLite, по умолчанию из {PROFILE_ENV}",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Запускает интерактивное меню или пакетный режим
+
+    Args:
+        argv (list[str] | None): Аргументы командной строки. По умолчанию sys.argv[1:]
+
+    Returns:
+        int: Код завершения
+    """
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    db_name = args.db
+    profile = args.profile or os.environ.get(PROFILE_ENV) or None
+    if profile is not None and profile not in INTERACTIVE_PROFILES:
+        print(
+            f"Профиль {profile} недоступен в консоли, доступны: "
+            f"{', '.join(INTERACTIVE_PROFILES)}",
+            file=sys.stderr,
+        )
+        return 2
+    # Менеджеры базы импортируются здесь, а не при импорте модуля: ошибка
+    # в аргументах не платит за загрузку db и cache
+    from cache import CachedDatabaseManager
+    from db import AuthManager
+    from db import ContactManager
+
+    db_manager = CachedDatabaseManager(db_name, profile=profile)
+    if os.environ.get(SLOW_QUERY_ENV):
+        db_manager.enable_instrumentation(float(os.environ[SLOW_QUERY_ENV]))
     # db_manager.clear_table("users")
     # db_manager.clear_table("contacts")
+    if args.script:
+        code = run_script(db_manager, args)
+        db_manager.close_connection()
+        return code
     auth_manager = AuthManager(db_manager)
     contact_manager = ContactManager(db_manager)
 
@@ -50,7 +253,8 @@ if __name__ == "__main__":
                     print("4. Удалить контакт")
                     print("5. Поиск контактов")
                     print("6. Просмотр детальной информации о контакте")
-                    print("7. Выйти")
+                    print("7. Импорт контактов из файла")
+                    print("8. Выйти")
 
                     choice = input("Введите номер действия:")
 
@@ -75,10 +279,15 @@ if __name__ == "__main__":
                             while not isValidEmail(email):
                                 print("Некорректный email")
                                 email = input("Пожалуйста, введите email заново:")
-                            contact_manager.add_contact(
-                                user_id, first_name, last_name, phone, email
-                            )
-                            print("Контакт успешно добавлен!")
+                            try:
+                                added = contact_manager.add_contact(
+                                    user_id, first_name, last_name, phone, email
+                                )
+                            except sqlite3.IntegrityError:
+                                print(DUPLICATE_PHONE_MESSAGE)
+                            else:
+                                if added:
+                                    print("Контакт успешно добавлен!")
 
                             add_more = input(
                                 "Желаете ли ещё добавить контакт? (да/нет):"
@@ -86,35 +295,19 @@ if __name__ == "__main__":
                             if add_more != "да":
                                 break
                     elif choice == "2":
-                        contacts = contact_manager.view_contacts(user_id)
-                        if contacts:
-                            print("\nСписок ваших контактов:")
-                            for contact in contacts:
-                                print(
-                                    f"ID: {contact[0]}, Имя: {contact[2]}, Фамилия: {contact[3]}, Номер телефона: {contact[4]}"
-                                )
-                        else:
-                            print("Ваш список контактов пуст!")
+                        browse_contacts(contact_manager, user_id)
                     elif choice == "3":
                         print("\nРедактирование контакта:")
-                        contactss = contact_manager.view_contacts(user_id)
-                        if contactss:
-                            print("\nСписок ваших контактов:")
-                            for contact in contactss:
-                                print(
-                                    f"ID: {contact[0]}, Имя: {contact[2]}, Фамилия: {contact[3]}, Номер телефона: {contact[4]}"
-                                )
-                        else:
-                            print("Ваш список контактов пуст!")
+                        browse_contacts(contact_manager, user_id)
                         contact_id = input("Введите ID контакта для редактирования: ")
                         contact_details = db_manager.get_contact_details(contact_id)
                         if contact_details:
-                            if contact_details[1] == user_id:
+                            if contact_details.user_id == user_id:
                                 print("Текущие данные контакта:")
-                                print("Имя:", contact_details[2])
-                                print("Фамилия:", contact_details[3])
-                                print("Номер телефона:", contact_details[4])
-                                print("Email:", contact_details[5])
+                                print("Имя:", contact_details.first_name)
+                                print("Фамилия:", contact_details.last_name)
+                                print("Номер телефона:", contact_details.phone)
+                                print("Email:", contact_details.email)
                                 print(
                                     "\nВведите новые данные (оставьте пустыми, чтобы сохранить текущие):"
                                 )
@@ -132,15 +325,20 @@ if __name__ == "__main__":
                                         "Некорректный формат адреса электронной почты. Пожалуйста, введите валидный адрес."
                                     )
                                     new_email = input("Новый Email:")
-                                db_manager.edit_contact(
-                                    contact_id,
-                                    first_name=new_first_name or contact_details[2],
-                                    last_name=new_last_name or contact_details[3],
-                                    phone=new_phone or contact_details[4],
-                                    email=new_email or contact_details[5],
-                                )
-
-                                print("Контакт успешно отредактирован!")
+                                try:
+                                    db_manager.edit_contact(
+                                        contact_id,
+                                        first_name=new_first_name
+                                        or contact_details.first_name,
+                                        last_name=new_last_name
+                                        or contact_details.last_name,
+                                        phone=new_phone or contact_details.phone,
+                                        email=new_email or contact_details.email,
+                                    )
+                                except sqlite3.IntegrityError:
+                                    print(DUPLICATE_PHONE_MESSAGE)
+                                else:
+                                    print("Контакт успешно отредактирован!")
                             else:
                                 print(
                                     "Этот контакт не принадлежит вам, вы не можете его редактировать!"
@@ -152,7 +350,7 @@ if __name__ == "__main__":
                         contact_id = input("Введите ID контакта для удаления:")
                         contact_details = db_manager.get_contact_details(contact_id)
                         if contact_details:
-                            if contact_details[1] == user_id:
+                            if contact_details.user_id == user_id:
                                 confirm = input(
                                     "Вы уверены, что хотите удалить этот контакт? (да/нет):"
                                 ).lower()
@@ -169,27 +367,34 @@ if __name__ == "__main__":
                         search_query = input(
                             "Введите имя или номер телефона для поиска:"
                         )
-                        search_results = db_manager.search_contacts(
+                        found = False
+                        for contact in db_manager.iter_search_contacts(
                             user_id, search_query
-                        )
-                        if search_results:
-                            print("\nРезультаты поиска:")
-                            for contact in search_results:
-                                print(contact)
-                        else:
-                            print("Контакты не найдены!")
+                        ):
+                            if not found:
+                                print("\nРезультаты поиска:")
+                                found = True
+                            print(contact)
+                        if not found:
+                            similar = db_manager.fuzzy_search(user_id, search_query)
+                            if similar:
+                                print("\nТочных совпадений нет, возможно, вы искали:")
+                                for contact, _ in similar:
+                                    print(contact)
+                            else:
+                                print("Контакты не найдены!")
                     elif choice == "6":
                         contact_id = input(
                             "Введите ID контакта для просмотра деталей: "
                         )
                         contact_details = db_manager.get_contact_details(contact_id)
                         if contact_details:
-                            if contact_details[1] == user_id:
+                            if contact_details.user_id == user_id:
                                 print("\nДетальная информация о контакте:")
-                                print("Имя:", contact_details[2])
-                                print("Фамилия:", contact_details[3])
-                                print("Номер телефона:", contact_details[4])
-                                print("Email:", contact_details[5])
+                                print("Имя:", contact_details.first_name)
+                                print("Фамилия:", contact_details.last_name)
+                                print("Номер телефона:", contact_details.phone)
+                                print("Email:", contact_details.email)
                             else:
                                 print(
                                     "Этот контакт не принадлежит вам,вы не можете просмотреть его детальную информацию"
@@ -197,8 +402,25 @@ if __name__ == "__main__":
                         else:
                             print("Контакт с указанным ID не найден")
                     elif choice == "7":
+                        from importer import ContactImporter
+                        from importer import print_report
+
+                        path = input("Путь к CSV или JSONL файлу: ")
+                        try:
+                            report = ContactImporter(db_manager).import_file(
+                                user_id, path
+                            )
+                        except OSError:
+                            print("Не удалось открыть файл!")
+                        except sqlite3.IntegrityError:
+                            print(DUPLICATE_PHONE_MESSAGE)
+                        else:
+                            print_report(report)
+                    elif choice == "8":
                         print("Выход из меню контактов")
                         break
+                    elif choice == "0":
+                        print_query_stats(db_manager)
                     else:
                         print("Некорректный выбор! Попробуйте снова")
             else:
@@ -210,3 +432,8 @@ if __name__ == "__main__":
             print("Некорректный выбор. Попробуйте снова")
 
     db_manager.close_connection()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,248 @@
+import heapq
+import logging
+import os
+import queue
 import sqlite3
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from functools import partial
+from typing import TYPE_CHECKING
+from fuzzy import PHONETIC_PREFIX
+from fuzzy import index_rows
+from fuzzy import normalize_name
+from fuzzy import similarity
+from fuzzy import word_tokens
+from migrations import create_fts_triggers
+from migrations import drop_fts_triggers
+from migrations import migrate
+from profiles import apply_profile
+from profiles import check_profile
+from reges import normalize_phone
+from schemas.changes import Change
+from schemas.changes import change_factory
+from schemas.contacts import Contact
+from schemas.contacts import contact_factory
+from schemas.users import User
+from schemas.users import user_factory
 from utils import hash_password
+from utils import needs_rehash
+from utils import verify_password
+
+if TYPE_CHECKING:
+    from instrumentation import QueryStats
+
+logger = logging.getLogger("contacts.db")
+
+CONTACT_COLUMNS = "id, user_id, first_name, last_name, phone, email"
+FUZZY_LIMIT = 10
+LOCAL_PHONE_DIGITS = 10
+PHONE_SEPARATORS = "+-()"
+JOINED_CONTACT_COLUMNS = ", ".join(
+    f"c.{column}" for column in CONTACT_COLUMNS.split(", ")
+)
+
+
+class ChangeLogCompactedError(Exception):
+    """Запрошенная позиция журнала изменений старше его границы после сжатия"""
+
+
+def read_only_uri(db_name: str) -> str:
+    """
+    Возвращает URI для открытия базы только на чтение (sqlite3.connect(..., uri=True))
+
+    Args:
+        db_name (str): Имя файла базы данных
+
+    Returns:
+        str: URI вида file:/абсолютный/путь?mode=ro
+    """
+    path = os.path.abspath(db_name)
+    for char, escaped in (("%", "%25"), ("?", "%3f"), ("#", "%23")):
+        path = path.replace(char, escaped)
+    return f"file:{path}?mode=ro"
+
+
+def _is_phone_part(word: str) -> bool:
+    """Возвращает True, если слово состоит только из цифр и символов "+-()" номера"""
+    return all(ch.isdigit() or ch in PHONE_SEPARATORS for ch in word)
+
+
+def fts_match_query(query: str) -> str:
+    """
+    Строит выражение FTS5 MATCH из пользовательского запроса
+
+    Каждое слово запроса экранируется и ищется как префикс, слова объединяются через AND.
+    Слова, похожие на номер телефона, приводятся к E.164 через normalize_phone:
+    индекс хранит phone_norm одним словом без "+", поэтому "9123456789"
+    и "89123456789" ищутся как "79123456789".
+    Номер, набранный через пробелы ("+7 912 345 67 89"), сначала склеивается
+    в одно слово из соседних слов, состоящих только из цифр и символов "+-()".
+    Часть номера короче местного может стоять в середине слова, а FTS5 ищет
+    только префиксы, поэтому для таких запросов возвращается пустая строка
+    и search_contacts ищет через LIKE, как без FTS
+
+    Args:
+        query (str): Поисковый запрос
+
+    Returns:
+        str: Выражение для MATCH или пустая строка, если в запросе нет слов
+            или его нужно искать через LIKE
+    """
+    words: list[str] = []
+    for word in query.split():
+        if words and _is_phone_part(word) and _is_phone_part(words[-1]):
+            words[-1] += word
+        else:
+            words.append(word)
+    terms = []
+    for term in words:
+        digits = "".join(ch for ch in term if ch.isdigit())
+        if digits and "@" not in term:
+            if len(digits) < LOCAL_PHONE_DIGITS:
+                return ""
+            terms.append('"' + normalize_phone(term).lstrip("+") + '"*')
+        else:
+            terms.append('"' + term.replace('"', '""') + '"*')
+    return " ".join(terms)
+
+
+class ConnectionPool:
+    """
+    Этот класс раздает потокам собственные соединения с базой данных
+
+    Каждый поток получает своё соединение и курсор и держит их до вызова release().
+    Одновременно открыто не больше size соединений: лишние потоки ждут, пока
+    кто-нибудь вернет соединение в пул. Соединения работают в режиме WAL,
+    поэтому читатели не блокируют писателя, а конкурирующие писатели ждут
+    освобождения блокировки до busy_timeout секунд
+
+    Attributes:
+        db_name (str): Имя файла базы данных
+        size (int): Максимальное количество открытых соединений
+        busy_timeout (float): Время ожидания блокировки базы в секундах
+        read_only (bool): Открывать ли соединения только для чтения
+        profile (str | None): Профиль PRAGMA из profiles.py, None - настройки SQLite по умолчанию
+        cursor_factory: Класс курсора для новых курсоров потоков, None - обычный sqlite3.Cursor
+    """
+
+    def __init__(
+        self,
+        db_name: str,
+        size: int = 5,
+        busy_timeout: float = 5.0,
+        read_only: bool = False,
+        profile: str | None = None,
+    ):
+        """
+        Инициализирует пул соединений
+
+        Args:
+            db_name (str): Имя файла базы данных
+            size (int): Максимальное количество открытых соединений. По умолчанию 5
+            busy_timeout (float): Время ожидания блокировки базы в секундах. По умолчанию 5.0
+            read_only (bool): Открывать соединения в режиме mode=ro. По умолчанию False
+            profile (str | None): Профиль PRAGMA для новых соединений. По умолчанию None
+        """
+        if size < 1:
+            raise ValueError("Размер пула должен быть положительным")
+        check_profile(profile)
+        self.db_name = db_name
+        self.size = size
+        self.busy_timeout = busy_timeout
+        self.read_only = read_only
+        self.profile = profile
+        self.cursor_factory = None
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._local = threading.local()
+        self._opened: list[sqlite3.Connection] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Открывает новое соединение в режиме WAL
+
+        Соединение только для чтения не может сменить режим журнала,
+        поэтому база должна быть переведена в WAL заранее. Профиль
+        выставляется до перехода в WAL, чтобы page_size успел примениться
+        к новой базе
+        """
+        if self.read_only:
+            conn = sqlite3.connect(
+                read_only_uri(self.db_name),
+                timeout=self.busy_timeout,
+                check_same_thread=False,
+                uri=True,
+            )
+            if self.profile is not None:
+                apply_profile(conn, self.profile, read_only=True)
+        else:
+            conn = sqlite3.connect(
+                self.db_name, timeout=self.busy_timeout, check_same_thread=False
+            )
+            if self.profile is not None:
+                apply_profile(conn, self.profile, journal=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        return conn
+
+    def acquire(self) -> tuple[sqlite3.Connection, sqlite3.Cursor]:
+        """
+        Возвращает соединение и курсор текущего потока, при необходимости беря их из пула
+
+        Returns:
+            tuple[sqlite3.Connection, sqlite3.Cursor]: Соединение и курсор
+        """
+        held = getattr(self._local, "held", None)
+        if held is not None:
+            return held
+        self._slots.acquire()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                conn = self._connect()
+            except BaseException:
+                self._slots.release()
+                raise
+            self._opened.append(conn)
+        if self.cursor_factory is None:
+            self._local.held = (conn, conn.cursor())
+        else:
+            self._local.held = (conn, conn.cursor(self.cursor_factory))
+        return self._local.held
+
+    def release(self) -> None:
+        """Возвращает соединение текущего потока в пул, незафиксированные изменения откатываются"""
+        held = getattr(self._local, "held", None)
+        if held is None:
+            return
+        conn, cur = held
+        self._local.held = None
+        cur.close()
+        conn.rollback()
+        self._idle.put(conn)
+        self._slots.release()
+
+    def close(self) -> None:
+        """
+        Закрывает все соединения пула
+
+        Соединения, которые другие потоки не вернули через release(), тоже
+        закрываются: пулы потоков (например, ThreadPoolExecutor) не дают
+        выполнить release() в каждом своём потоке перед завершением
+        """
+        self.release()
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        opened, self._opened = self._opened, []
+        for conn in opened:
+            conn.close()
 
 
 class DatabaseManager:
@@ -8,42 +251,273 @@ class DatabaseManager:
 
     Менеджер базы данных для работы с пользователями и контактами
 
+    В пуловом режиме (pool_size) каждый поток работает через собственное соединение
+    из ConnectionPool, поэтому один менеджер можно использовать из нескольких потоков.
+    Поток, закончивший работу с базой, должен вызвать release_connection()
+
+    Соединение открывается, а миграции схемы проверяются при первом обращении
+    к базе, поэтому создание менеджера ничего не стоит, если база не понадобится
+
     Attributes:
         conn: Соединение с базой данных
         cur: Курсор для выполнения SQL-запросов
+        profile (str | None): Профиль PRAGMA из profiles.py, None - настройки SQLite по умолчанию
+        query_stats (QueryStats | None): Статистика запросов, если включен enable_instrumentation()
     """
 
-    def __init__(self, db_name: str) -> None:
+    def __init__(
+        self,
+        db_name: str,
+        search_mode: str = "like",
+        pool_size: int | None = None,
+        busy_timeout: float = 5.0,
+        read_only: bool = False,
+        profile: str | None = None,
+    ) -> None:
         """
-        Инициализирует соединение с базой данных и создает таблицы при необходимости
-        Инициализирует менеджер базы данных
+        Инициализирует менеджер базы данных, не открывая соединение
 
         Args:
             db_name (str): Имя файла базы данных
+            search_mode (str): Способ поиска контактов: "like", "fts" или "fuzzy". По умолчанию "like"
+            pool_size (int | None): Размер пула соединений для работы из нескольких потоков.
+                По умолчанию None - одно общее соединение
+            busy_timeout (float): Время ожидания блокировки базы в секундах. По умолчанию 5.0
+            read_only (bool): Открывать соединения пула только для чтения, требует pool_size.
+                Схема такой базы должна быть актуальной. По умолчанию False
+            profile (str | None): Профиль PRAGMA из profiles.py: "durable", "balanced"
+                или "bulk-load". По умолчанию None - настройки SQLite по умолчанию
+        """
+        if search_mode not in ("like", "fts", "fuzzy"):
+            raise ValueError(f"Неизвестный режим поиска: {search_mode}")
+        check_profile(profile)
+        if read_only and pool_size is None:
+            raise ValueError(
+                "Режим только для чтения доступен только с пулом соединений"
+            )
+        self._local = threading.local()
+        self.query_stats: "QueryStats | None" = None
+        self._db_name = db_name
+        self._busy_timeout = busy_timeout
+        self.profile = profile
+        self._conn: sqlite3.Connection | None = None
+        self._cur: sqlite3.Cursor | None = None
+        if pool_size is None:
+            self._pool = None
+        else:
+            self._pool = ConnectionPool(
+                db_name, pool_size, busy_timeout, read_only, profile
+            )
+        self._open_lock = threading.Lock()
+        self._fts_available: bool | None = None
+        self.search_mode = search_mode
+        self._write_behind: tuple[int, float] | None = None
+        self._pending: dict[int, dict[str, str] | None] = {}
+        self._pending_since = 0.0
+        self._pending_lock = threading.Lock()
+
+    def _open(self) -> None:
+        """
+        Открывает соединение и применяет недостающие миграции при первом обращении к базе
+
+        Если версия схемы актуальна, migrate только читает PRAGMA user_version
+        """
+        with self._open_lock:
+            if self._fts_available is not None:
+                return
+            if self._pool is None:
+                self._conn = sqlite3.connect(self._db_name, timeout=self._busy_timeout)
+                if self.profile is not None:
+                    apply_profile(self._conn, self.profile)
+                factory = self._cursor_factory()
+                self._cur = (
+                    self._conn.cursor()
+                    if factory is None
+                    else self._conn.cursor(factory)
+                )
+                conn = self._conn
+            else:
+                conn = self._pool.acquire()[0]
+            migrate(conn)
+            self._fts_available = (
+                conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='contacts_fts'"
+                ).fetchone()
+                is not None
+            )
+
+    @property
+    def fts_available(self) -> bool:
+        """Есть ли в базе полнотекстовый индекс contacts_fts"""
+        if self._fts_available is None:
+            self._open()
+        return self._fts_available
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Возвращает соединение текущего потока"""
+        if self._fts_available is None:
+            self._open()
+        if self._pool is None:
+            return self._conn
+        return self._pool.acquire()[0]
+
+    @property
+    def cur(self) -> sqlite3.Cursor:
+        """Возвращает курсор текущего потока"""
+        if self._fts_available is None:
+            self._open()
+        if self._pool is None:
+            return self._cur
+        return self._pool.acquire()[1]
+
+    def _cursor_factory(self) -> partial | None:
+        """Возвращает класс курсора с учетом включенной статистики запросов"""
+        if self.query_stats is None:
+            return None
+        from instrumentation import InstrumentedCursor
+
+        return partial(InstrumentedCursor, stats=self.query_stats)
+
+    def _new_cursor(self) -> sqlite3.Cursor:
+        """Создает отдельный курсор на соединении текущего потока"""
+        factory = self._cursor_factory()
+        if factory is None:
+            return self.conn.cursor()
+        return self.conn.cursor(factory)
+
+    def _fetch(
+        self, row_factory, sql: str, params: Iterable = (), size: int = -1
+    ) -> list:
+        """
+        Выполняет запрос на отдельном курсоре, строки собирает row_factory
+
+        Args:
+            row_factory: Фабрика строк sqlite3
+            sql (str): Текст запроса
+            params (Iterable): Параметры запроса. По умолчанию без параметров
+            size (int): Сколько строк прочитать, -1 - все. По умолчанию -1
+
+        Returns:
+            list: Объекты, построенные row_factory
+        """
+        cur = self._new_cursor()
+        cur.row_factory = row_factory
+        try:
+            cur.execute(sql, params)
+            return cur.fetchall() if size < 0 else cur.fetchmany(size)
+        finally:
+            cur.close()
+
+    def _reset_cursors(self) -> None:
+        """Пересоздает курсоры менеджера после включения или выключения статистики"""
+        if self._pool is not None:
+            self._pool.cursor_factory = self._cursor_factory()
+            return
+        if self._cur is None:
+            return
+        self._cur.close()
+        self._cur = self._new_cursor()
+
+    def enable_instrumentation(
+        self, slow_query_ms: float | None = 100.0
+    ) -> "QueryStats":
+        """
+        Включает сбор статистики SQL-запросов менеджера
+
+        Для каждого запроса считаются количество выполнений, суммарное, среднее
+        и максимальное время и количество строк. Запросы дольше slow_query_ms
+        записываются в журнал "contacts.db" вместе с EXPLAIN QUERY PLAN.
+        В пуловом режиме потоки, уже держащие соединение, начинают учитываться
+        после release_connection()
+
+        Args:
+            slow_query_ms (float | None): Порог медленного запроса в миллисекундах,
+                None - не журналировать. По умолчанию 100
+
+        Returns:
+            QueryStats: Статистика, доступная через snapshot() и reset()
+        """
+        from instrumentation import QueryStats
+
+        self.query_stats = QueryStats(slow_query_ms)
+        self._reset_cursors()
+        return self.query_stats
+
+    def disable_instrumentation(self) -> None:
+        """Выключает сбор статистики SQL-запросов"""
+        self.query_stats = None
+        self._reset_cursors()
+
+    @property
+    def _tx_depth(self) -> int:
+        """Глубина вложенности блоков transaction() в текущем потоке"""
+        return getattr(self._local, "tx_depth", 0)
+
+    @_tx_depth.setter
+    def _tx_depth(self, value: int) -> None:
+        self._local.tx_depth = value
+
+    def release_connection(self) -> None:
+        """Возвращает соединение текущего потока в пул. Без пула ничего не делает"""
+        if self._pool is not None and self._tx_depth == 0:
+            self._pool.release()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Объединяет несколько операций записи в одну транзакцию
+
+        Внутри блока методы менеджера не вызывают commit самостоятельно,
+        фиксация выполняется один раз при выходе из самого внешнего блока.
+        При исключении все изменения блока откатываются. Блокировка на запись
+        берется сразу (BEGIN IMMEDIATE), чтобы параллельные писатели ждали
+        в busy_timeout, а не получали ошибку посреди транзакции
+        """
+        if self._tx_depth == 0 and not self.conn.in_transaction:
+            self.conn.execute("BEGIN IMMEDIATE")
+        self._tx_depth += 1
+        try:
+            yield
+        except BaseException:
+            self._tx_depth -= 1
+            if self._tx_depth == 0:
+                self.conn.rollback()
+            raise
+        self._tx_depth -= 1
+        if self._tx_depth == 0:
+            self.conn.commit()
+
+    @contextmanager
+    def bulk_load(self) -> Iterator[None]:
         """
-        self.conn = sqlite3.connect(db_name)
-        self.cur = self.conn.cursor()
-        self.create_tables()
+        Транзакция для массовой загрузки контактов
+
+        Триггеры contacts_fts на время блока удаляются, а в конце индекс
+        перестраивается целиком. Это быстрее построчного обновления индекса,
+        когда загружается объем, сравнимый с уже имеющимися контактами.
+        Все изменения блока, включая удаление триггеров, атомарны
+        """
+        self._flush_pending()
+        with self.transaction():
+            if not self.fts_available:
+                yield
+                return
+            drop_fts_triggers(self.conn)
+            yield
+            self.conn.execute(
+                "INSERT INTO contacts_fts (contacts_fts) VALUES ('rebuild')"
+            )
+            create_fts_triggers(self.conn)
+
+    def _commit(self) -> None:
+        """Фиксирует изменения, если не открыт блок transaction()"""
+        if self._tx_depth == 0:
+            self.conn.commit()
 
     def create_tables(self) -> None:
-        """Создает таблицы в базе данных, если они не существуют"""
-        self.cur.execute(
-            """CREATE TABLE IF NOT EXISTS users (
-                            id INTEGER PRIMARY KEY,
-                            username TEXT UNIQUE,
-                            password TEXT)"""
-        )
-        self.cur.execute(
-            """CREATE TABLE IF NOT EXISTS contacts (
-                            id INTEGER PRIMARY KEY,
-                            user_id INTEGER,
-                            first_name TEXT,
-                            last_name TEXT,
-                            phone TEXT,
-                            email TEXT,
-                            FOREIGN KEY (user_id) REFERENCES users(id))"""
-        )
-        self.conn.commit()
+        """Создает таблицы в базе данных и применяет недостающие миграции схемы"""
+        migrate(self.conn)
 
     def add_user(self, username: str, password: str) -> None:
         """
@@ -53,12 +527,67 @@ class DatabaseManager:
             username (str): Имя пользователя
             password (str): Пароль пользователя
         """
-        hashed_password = hash_password(password)
+        self.add_user_hash(username, hash_password(password))
+
+    def add_user_hash(self, username: str, password_hash: str) -> None:
+        """
+        Добавляет пользователя с заранее посчитанным хэшем пароля
+
+        Позволяет выполнить дорогое хэширование вне потока, работающего с базой
+
+        Args:
+            username (str): Имя пользователя
+            password_hash (str): Результат utils.hash_password
+        """
         self.cur.execute(
             "INSERT INTO users (username, password) VALUES (?, ?)",
-            (username, hashed_password),
+            (username, password_hash),
+        )
+        self._commit()
+
+    def get_user_credentials(self, username: str) -> tuple[int, str] | None:
+        """
+        Получает идентификатор и хэш пароля пользователя по имени
+
+        Args:
+            username (str): Имя пользователя
+
+        Returns:
+            tuple[int, str] | None: Идентификатор и хэш пароля или None, если пользователь не найден
+        """
+        self.cur.execute("SELECT id, password FROM users WHERE username=?", (username,))
+        return self.cur.fetchone()
+
+    def get_user(self, username: str) -> User | None:
+        """
+        Получает пользователя по имени
+
+        Args:
+            username (str): Имя пользователя
+
+        Returns:
+            User | None: Пользователь или None, если он не найден
+        """
+        users = self._fetch(
+            user_factory,
+            "SELECT id, username, password FROM users WHERE username=?",
+            (username,),
+            size=1,
         )
-        self.conn.commit()
+        return users[0] if users else None
+
+    def update_password_hash(self, user_id: int, password_hash: str) -> None:
+        """
+        Заменяет хэш пароля пользователя
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            password_hash (str): Новый хэш пароля
+        """
+        self.cur.execute(
+            "UPDATE users SET password=? WHERE id=?", (password_hash, user_id)
+        )
+        self._commit()
 
     def authenticate_user(self, username: str, password: str) -> int | None:
         """
@@ -66,6 +595,10 @@ class DatabaseManager:
 
         Аутентифицирует пользователя
 
+        Пользователь ищется только по имени, пароль сверяется с хэшем за постоянное время.
+        Хэши старого формата (SHA-512 без соли) или с устаревшими параметрами
+        при успешном входе прозрачно пересчитываются
+
         Args:
             username (str): Имя пользователя
             password (str): Пароль пользователя
@@ -73,34 +606,164 @@ class DatabaseManager:
         Returns:
             int | None: Идентификатор аутентифицированного пользователя или None, если пользователь не найден
         """
-        hashed_password = hash_password(password)
+        credentials = self.get_user_credentials(username)
+        if credentials is None:
+            return None
+        user_id, password_hash = credentials
+        if not verify_password(password, password_hash):
+            return None
+        if needs_rehash(password_hash):
+            self.update_password_hash(user_id, hash_password(password))
+        return user_id
+
+    def add_session(self, token_hash: str, user_id: int, expires_at: float) -> None:
+        """
+        Сохраняет сессию пользователя
+
+        Args:
+            token_hash (str): SHA-256 токена сессии
+            user_id (int): Идентификатор пользователя
+            expires_at (float): Время истечения сессии, секунды с начала эпохи
+        """
         self.cur.execute(
-            "SELECT * FROM users WHERE username=? AND password=?",
-            (username, hashed_password),
+            "INSERT INTO sessions (token_hash, user_id, expires_at) VALUES (?, ?, ?)",
+            (token_hash, user_id, expires_at),
         )
-        user = self.cur.fetchone()
-        if user:
-            return user[0]
-        else:
-            return None
+        self._commit()
+
+    def get_active_sessions(self, now: float) -> list[tuple[str, int, float]]:
+        """
+        Получает все неистекшие сессии
+
+        Args:
+            now (float): Текущее время, секунды с начала эпохи
+
+        Returns:
+            list[tuple[str, int, float]]: Кортежи (token_hash, user_id, expires_at) по возрастанию expires_at
+        """
+        return self._fetch(
+            None,
+            "SELECT token_hash, user_id, expires_at FROM sessions WHERE expires_at > ? ORDER BY expires_at",
+            (now,),
+        )
+
+    def get_session_user(self, token_hash: str, now: float) -> int | None:
+        """
+        Получает владельца неистекшей сессии по первичному ключу token_hash
+
+        Args:
+            token_hash (str): SHA-256 токена сессии
+            now (float): Текущее время, секунды с начала эпохи
+
+        Returns:
+            int | None: Идентификатор пользователя или None, если сессии нет или она истекла
+        """
+        rows = self._fetch(
+            None,
+            "SELECT user_id FROM sessions WHERE token_hash=? AND expires_at > ?",
+            (token_hash, now),
+            size=1,
+        )
+        return rows[0][0] if rows else None
 
-    def check_duplicate_phone(self, phone: str) -> bool:
+    def delete_session(self, token_hash: str) -> None:
+        """
+        Удаляет сессию
+
+        Args:
+            token_hash (str): SHA-256 токена сессии
+        """
+        self.cur.execute("DELETE FROM sessions WHERE token_hash=?", (token_hash,))
+        self._commit()
+
+    def delete_expired_sessions(self, now: float) -> int:
+        """
+        Удаляет истекшие сессии
+
+        Args:
+            now (float): Текущее время, секунды с начала эпохи
+
+        Returns:
+            int: Количество удаленных сессий
+        """
+        self.cur.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+        deleted = self.cur.rowcount
+        self._commit()
+        return deleted
+
+    def get_user_shards(self) -> dict[int, str]:
+        """
+        Получает размещение пользователей по шардам из таблицы "user_shards"
+
+        Returns:
+            dict[int, str]: Имя шарда для каждого размещенного пользователя
+        """
+        return dict(self._fetch(None, "SELECT user_id, shard FROM user_shards", ()))
+
+    def set_user_shard(self, user_id: int, shard: str) -> None:
+        """
+        Сохраняет шард, в котором хранятся контакты пользователя
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            shard (str): Имя шарда
+        """
+        self.cur.execute(
+            "INSERT OR REPLACE INTO user_shards (user_id, shard) VALUES (?, ?)",
+            (user_id, shard),
+        )
+        self._commit()
+
+    def check_duplicate_phone(self, phone: str, user_id: int | None = None) -> bool:
         """
         Проверяет, существует ли контакт с указанным номером телефона в базе данных
 
+        Номера сравниваются в нормализованном виде, поэтому "8 912 345-67-89"
+        и "+79123456789" считаются одним номером
+
         Args:
             phone (str): Номер телефона для проверки
+            user_id (int | None): Искать только среди контактов этого пользователя. По умолчанию None
 
         Returns:
             bool: True, если контакт с таким номером телефона существует, иначе False
         """
-        self.cur.execute("SELECT COUNT(*) FROM contacts WHERE phone=?", (phone,))
-        count = self.cur.fetchone()[0]
-        return count > 0
+        self._flush_pending()
+        if user_id is None:
+            self.cur.execute(
+                "SELECT 1 FROM contacts WHERE phone_norm=? LIMIT 1",
+                (normalize_phone(phone),),
+            )
+        else:
+            self.cur.execute(
+                "SELECT 1 FROM contacts WHERE user_id=? AND phone_norm=? LIMIT 1",
+                (user_id, normalize_phone(phone)),
+            )
+        return self.cur.fetchone() is not None
+
+    def get_phones(self, user_id: int) -> set[str]:
+        """
+        Загружает нормализованные номера телефонов пользователя одним запросом
+
+        Используется при массовом импорте вместо проверки каждого номера
+        отдельным запросом check_duplicate_phone
+
+        Args:
+            user_id (int): Идентификатор пользователя
+
+        Returns:
+            set[str]: Множество нормализованных номеров телефонов
+        """
+        self._flush_pending()
+        self.cur.execute(
+            "SELECT phone_norm FROM contacts WHERE user_id=? AND phone_norm IS NOT NULL",
+            (user_id,),
+        )
+        return {row[0] for row in self.cur}
 
     def add_contact(
         self, user_id: int, first_name: str, last_name: str, phone: str, email: str
-    ) -> None:
+    ) -> int:
         """
         Добавляет контакт в базу данных  в таблицу "contacts"
 
@@ -110,12 +773,92 @@ class DatabaseManager:
             last_name (str): Фамилия контакта.
             phone (str): Номер телефона контакта.
             email (str): Email контакта.
+
+        Returns:
+            int: Идентификатор добавленного контакта
         """
+        self._flush_pending()
         self.cur.execute(
-            "INSERT INTO contacts (user_id, first_name, last_name, phone, email) VALUES (?, ?, ?, ?, ?)",
-            (user_id, first_name, last_name, phone, email),
+            "INSERT INTO contacts (user_id, first_name, last_name, phone, phone_norm, email) VALUES (?, ?, ?, ?, ?, ?)",
+            (user_id, first_name, last_name, phone, normalize_phone(phone), email),
         )
-        self.conn.commit()
+        contact_id = self.cur.lastrowid
+        self._index_fuzzy([(contact_id, user_id, first_name, last_name)])
+        self._commit()
+        return contact_id
+
+    def add_contacts(self, contacts: Iterable[tuple]) -> None:
+        """
+        Добавляет пачку контактов одним вызовом executemany
+
+        Args:
+            contacts (Iterable[tuple]): Кортежи (user_id, first_name, last_name, phone, email)
+        """
+        self._flush_pending()
+        with self.transaction():
+            self.cur.execute("SELECT COALESCE(MAX(id), 0) FROM contacts")
+            last_id = self.cur.fetchone()[0]
+            self.cur.executemany(
+                "INSERT INTO contacts (user_id, first_name, last_name, phone, phone_norm, email) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        user_id,
+                        first_name,
+                        last_name,
+                        phone,
+                        normalize_phone(phone),
+                        email,
+                    )
+                    for user_id, first_name, last_name, phone, email in contacts
+                ),
+            )
+            self._index_fuzzy(
+                self._fetch(
+                    None,
+                    "SELECT id, user_id, first_name, last_name FROM contacts WHERE id>?",
+                    (last_id,),
+                )
+            )
+
+    def _index_fuzzy(self, contacts: Iterable[tuple]) -> None:
+        """
+        Добавляет токены нечеткого поиска для контактов
+
+        Args:
+            contacts (Iterable[tuple]): Кортежи (id, user_id, first_name, last_name)
+        """
+        self.cur.executemany(
+            "INSERT OR IGNORE INTO contacts_fuzzy (user_id, token, contact_id) VALUES (?, ?, ?)",
+            index_rows(contacts),
+        )
+
+    def _reindex_fuzzy(self, contact_ids: list[int]) -> None:
+        """Пересчитывает токены нечеткого поиска контактов после изменения имени"""
+        for start in range(0, len(contact_ids), 500):
+            chunk = contact_ids[start : start + 500]
+            self._index_fuzzy(
+                self._fetch(
+                    None,
+                    f"SELECT id, user_id, first_name, last_name FROM contacts WHERE id IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+            )
+
+    def rebuild_fuzzy_index(self) -> None:
+        """
+        Перестраивает индекс нечеткого поиска contacts_fuzzy целиком
+
+        Нужен, если контакты добавлялись или переименовывались в обход DatabaseManager
+        """
+        with self.transaction():
+            self.cur.execute("DELETE FROM contacts_fuzzy")
+            cur = self._new_cursor()
+            try:
+                cur.execute("SELECT id, user_id, first_name, last_name FROM contacts")
+                while rows := cur.fetchmany(10000):
+                    self._index_fuzzy(rows)
+            finally:
+                cur.close()
 
     def edit_contact(
         self,
@@ -128,6 +871,8 @@ class DatabaseManager:
         """
         Редактирует контакт в базе данных, в таблице "contacts"
 
+        В режиме enable_write_behind() изменение только ставится в очередь
+
         Args:
             contact_id (int | None): Идентификатор контакта
             first_name (str | None): Новое имя контакта. По умолчанию None
@@ -135,59 +880,340 @@ class DatabaseManager:
             phone (str | None): Новый номер телефона контакта. По умолчанию None
             email (str | None): Новый email контакта. По умолчанию None
         """
-        update_query = "UPDATE contacts SET "
-        update_params = []
-        if first_name:
-            update_query += "first_name=?, "
-            update_params.append(first_name)
-        if last_name:
-            update_query += "last_name=?, "
-            update_params.append(last_name)
-        if phone:
-            update_query += "phone=?, "
-            update_params.append(phone)
-        if email:
-            update_query += "email=?, "
-            update_params.append(email)
-        update_query = update_query.rstrip(", ") + " WHERE id=?"
-        update_params.append(contact_id)
-
-        self.cur.execute(update_query, update_params)
-        self.conn.commit()
+        fields = {
+            name: value
+            for name, value in (
+                ("first_name", first_name),
+                ("last_name", last_name),
+                ("phone", phone),
+                ("email", email),
+            )
+            if value
+        }
+        if self._write_behind is not None:
+            self._queue_write(contact_id, fields)
+            return
+        self._update_contacts({contact_id: fields})
+        self._commit()
 
     def delete_contact(self, contact_id: int) -> None:
         """
         Удаляет контакт из базы данных : из таблицы "contacts"
 
+        В режиме enable_write_behind() удаление только ставится в очередь
+
         Args:
             contact_id (int): Идентификатор контакта.
         """
+        if self._write_behind is not None:
+            self._queue_write(contact_id, None)
+            return
         self.cur.execute("DELETE FROM contacts WHERE id=?", (contact_id,))
-        self.conn.commit()
+        self._commit()
+
+    def merge_contacts(
+        self, keep_id: int, duplicate_ids: Iterable[int], fields: dict[str, str]
+    ) -> None:
+        """
+        Объединяет дубликаты в один контакт одной транзакцией
+
+        Дубликаты удаляются раньше обновления, чтобы номер телефона
+        оставшегося контакта не конфликтовал с ними в уникальном индексе
 
-    def search_contacts(self, user_id: int, query: str) -> list[tuple]:
+        Args:
+            keep_id (int): Идентификатор остающегося контакта
+            duplicate_ids (Iterable[int]): Идентификаторы удаляемых дубликатов
+            fields (dict[str, str]): Новые значения полей остающегося контакта
+        """
+        self._flush_pending()
+        with self.transaction():
+            self.cur.executemany(
+                "DELETE FROM contacts WHERE id=?",
+                [(contact_id,) for contact_id in duplicate_ids],
+            )
+            self._update_contacts({keep_id: fields})
+
+    def _update_contacts(self, edits: dict[int, dict[str, str]]) -> None:
+        """
+        Применяет изменения к контактам, группируя одинаковые наборы полей в один executemany
+
+        Args:
+            edits (dict[int, dict[str, str]]): Новые значения полей по идентификатору контакта
+        """
+        groups: dict[tuple[str, ...], list[list]] = {}
+        for contact_id, fields in edits.items():
+            if not fields:
+                continue
+            names = tuple(fields)
+            params = [fields[name] for name in names]
+            if "phone" in fields:
+                params.append(normalize_phone(fields["phone"]))
+            params.append(contact_id)
+            groups.setdefault(names, []).append(params)
+        for names, rows in groups.items():
+            assignments = [f"{name}=?" for name in names]
+            if "phone" in names:
+                assignments.append("phone_norm=?")
+            self.cur.executemany(
+                f"UPDATE contacts SET {', '.join(assignments)} WHERE id=?", rows
+            )
+        renamed = [
+            contact_id
+            for contact_id, fields in edits.items()
+            if "first_name" in fields or "last_name" in fields
+        ]
+        if renamed:
+            self._reindex_fuzzy(renamed)
+
+    def enable_write_behind(
+        self, max_pending: int = 100, max_delay: float = 1.0
+    ) -> None:
+        """
+        Включает отложенную запись изменений и удалений контактов
+
+        edit_contact и delete_contact перестают сразу писать в базу и только ставят
+        операцию в очередь. Несколько изменений одного контакта объединяются в одно,
+        удаление отменяет накопленные изменения. Очередь записывается в базу одной
+        транзакцией, когда в ней набирается max_pending контактов, когда с момента
+        первой операции прошло max_delay секунд (проверяется при следующем обращении
+        к менеджеру), при вызове flush() и перед любым чтением или добавлением,
+        поэтому менеджер всегда видит собственные изменения.
+
+        Гарантии при сбое: очередь хранится только в памяти, и операции, не попавшие
+        в базу до падения процесса, теряются. Каждый flush() атомарен - после сбоя
+        в базе оказываются либо все операции пачки, либо ни одной. Операции,
+        которые база отклоняет, не задерживают остальные: flush() записывает
+        их по одной и убирает отклоненные из очереди
+
+        Args:
+            max_pending (int): Сколько контактов может ждать записи. По умолчанию 100
+            max_delay (float): Сколько секунд операция может ждать записи. По умолчанию 1.0
+        """
+        self.flush()
+        self._write_behind = (max_pending, max_delay)
+
+    def disable_write_behind(self) -> None:
+        """Записывает накопленные операции и возвращает немедленную запись"""
+        self.flush()
+        self._write_behind = None
+
+    def _queue_write(self, contact_id: int, fields: dict[str, str] | None) -> None:
+        """Ставит изменение (fields) или удаление (None) контакта в очередь записи"""
+        max_pending, max_delay = self._write_behind
+        with self._pending_lock:
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            if fields is None:
+                self._pending[contact_id] = None
+            elif self._pending.get(contact_id, {}) is not None:
+                self._pending.setdefault(contact_id, {}).update(fields)
+            due = (
+                len(self._pending) >= max_pending
+                or time.monotonic() - self._pending_since >= max_delay
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> dict[int, sqlite3.IntegrityError]:
+        """
+        Записывает накопленные изменения и удаления контактов одной транзакцией
+
+        Если пачка нарушает ограничение базы (например, два контакта пользователя
+        получают один номер телефона), операции повторяются по одной, каждая своей
+        транзакцией: корректные записываются, а отклоненные убираются из очереди
+        и записываются в журнал. При другой ошибке незаписанные операции
+        возвращаются в очередь
+
+        Returns:
+            dict[int, sqlite3.IntegrityError]: Ошибки отклоненных операций
+                по идентификатору контакта, пустой словарь, если записано все
+        """
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return {}
+        rejected = {}
+        try:
+            try:
+                self._write_pending(pending)
+                return rejected
+            except sqlite3.IntegrityError:
+                pass
+            for contact_id in list(pending):
+                try:
+                    self._write_pending({contact_id: pending[contact_id]})
+                except sqlite3.IntegrityError as error:
+                    rejected[contact_id] = error
+                    logger.warning(
+                        "Отложенная операция с контактом %s отклонена: %s",
+                        contact_id,
+                        error,
+                    )
+                del pending[contact_id]
+        except BaseException:
+            with self._pending_lock:
+                for contact_id, edit in self._pending.items():
+                    if edit is None or pending.get(contact_id, {}) is None:
+                        pending[contact_id] = None
+                    else:
+                        pending.setdefault(contact_id, {}).update(edit)
+                self._pending = pending
+            raise
+        return rejected
+
+    def _write_pending(self, pending: dict[int, dict[str, str] | None]) -> None:
+        """Записывает отложенные изменения и удаления контактов одной транзакцией"""
+        with self.transaction():
+            self.cur.executemany(
+                "DELETE FROM contacts WHERE id=?",
+                [(contact_id,) for contact_id, edit in pending.items() if edit is None],
+            )
+            self._update_contacts(
+                {
+                    contact_id: edit
+                    for contact_id, edit in pending.items()
+                    if edit is not None
+                }
+            )
+
+    def _flush_pending(self) -> None:
+        """Записывает очередь отложенных операций, если она не пуста"""
+        if self._pending:
+            self.flush()
+
+    def search_contacts(
+        self, user_id: int, query: str, limit: int | None = None
+    ) -> list[Contact]:
         """
         Выполняет поиск контактов в базе данных по запросу В.
 
+        В режиме "fts" используется полнотекстовый индекс contacts_fts: каждое слово
+        запроса ищется как префикс, результаты упорядочены по релевантности.
+        В режиме "fuzzy" запрос с буквами ищется нечетко по имени и фамилии
+        через fuzzy_search. Если FTS5 недоступен или запрос пуст, используется поиск через LIKE
+
         Args:
             user_id (int): Идентификатор пользователя.
             query (str): Поисковый запрос.
+            limit (int | None): Максимальное количество результатов. По умолчанию без ограничения
 
         Returns:
-            list[tuple]: Список кортежей с результатами поиска.
+            list[Contact]: Список найденных контактов.
         """
-        search_query = "SELECT * FROM contacts WHERE user_id=? AND (first_name LIKE ? OR last_name LIKE ? OR phone LIKE ? OR email LIKE ?)"
-        search_params = (
+        self._flush_pending()
+        if self.search_mode == "fuzzy" and any(ch.isalpha() for ch in query):
+            return [
+                contact
+                for contact, _ in self.fuzzy_search(
+                    user_id, query, limit or FUZZY_LIMIT
+                )
+            ]
+        match = fts_match_query(query)
+        if self.search_mode == "fts" and self.fts_available and match:
+            return self._search_contacts_fts(user_id, match, limit)
+        search_query = f"SELECT {CONTACT_COLUMNS} FROM contacts WHERE user_id=? AND (first_name LIKE ? OR last_name LIKE ? OR phone LIKE ? OR email LIKE ?)"
+        search_params = [
             user_id,
             f"%{query}%",
             f"%{query}%",
             f"%{query}%",
             f"%{query}%",
+        ]
+        if limit is not None:
+            search_query += " LIMIT ?"
+            search_params.append(limit)
+        return self._fetch(contact_factory, search_query, search_params)
+
+    def _search_contacts_fts(
+        self, user_id: int, match: str, limit: int | None
+    ) -> list[Contact]:
+        """Ищет контакты пользователя по индексу contacts_fts, лучшие совпадения первыми"""
+        return self._fetch(
+            contact_factory,
+            f"""SELECT {JOINED_CONTACT_COLUMNS} FROM contacts_fts
+                JOIN contacts c ON c.id = contacts_fts.rowid
+                WHERE contacts_fts MATCH ? AND c.user_id = ?
+                ORDER BY contacts_fts.rank
+                LIMIT ?""",
+            (match, user_id, -1 if limit is None else limit),
         )
-        self.cur.execute(search_query, search_params)
-        return self.cur.fetchall()
 
-    def get_contact_details(self, contact_id: int) -> tuple | None:
+    def fuzzy_search(
+        self,
+        user_id: int,
+        query: str,
+        limit: int = FUZZY_LIMIT,
+        min_score: float = 0.6,
+        candidates: int = 200,
+        time_budget_ms: float | None = 50.0,
+        max_postings: int = 2000,
+    ) -> list[tuple[Contact, float]]:
+        """
+        Нечетко ищет контакты пользователя по имени и фамилии
+
+        Кандидаты выбираются по индексу contacts_fuzzy: чем больше общих триграмм
+        и фонетических ключей с запросом, тем выше кандидат. Для каждого токена
+        читается не больше max_postings строк индекса, поэтому частые триграммы
+        вроде "ov " не заставляют перебирать всех контактов. Для лучших кандидатов
+        считается сходство fuzzy.similarity, поэтому "Ivanof" находит "Иванов".
+        По истечении time_budget_ms поиск возвращает лучшее из уже найденного
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            query (str): Поисковый запрос
+            limit (int): Максимальное количество результатов. По умолчанию 10
+            min_score (float): Минимальное сходство от 0 до 1. По умолчанию 0.6
+            candidates (int): Сколько кандидатов оценивать. По умолчанию 200
+            time_budget_ms (float | None): Бюджет времени в миллисекундах,
+                None - без ограничения. По умолчанию 50
+            max_postings (int): Сколько строк индекса читать на один токен. По умолчанию 2000
+
+        Returns:
+            list[tuple[Contact, float]]: Контакты и их сходство, лучшие первыми
+        """
+        self._flush_pending()
+        words = normalize_name(query)
+        if not words:
+            return []
+        deadline = None
+        if time_budget_ms is not None:
+            deadline = time.perf_counter() + time_budget_ms / 1000
+        tokens = sorted(
+            set().union(*(word_tokens(word) for word in words)),
+            key=lambda token: not token.startswith(PHONETIC_PREFIX),
+        )
+        hits: Counter = Counter()
+        for token in tokens:
+            if deadline is not None and hits and time.perf_counter() > deadline:
+                break
+            self.cur.execute(
+                "SELECT contact_id FROM contacts_fuzzy WHERE user_id=? AND token=? LIMIT ?",
+                (user_id, token, max_postings),
+            )
+            hits.update(row[0] for row in self.cur.fetchall())
+        ids = [contact_id for contact_id, _ in hits.most_common(candidates)]
+        rank = {contact_id: position for position, contact_id in enumerate(ids)}
+        contacts = sorted(
+            self._fetch(
+                contact_factory,
+                f"SELECT {CONTACT_COLUMNS} FROM contacts WHERE id IN ({', '.join('?' * len(ids))})",
+                ids,
+            ),
+            key=lambda contact: rank[contact.id],
+        )
+        scored = []
+        for position, contact in enumerate(contacts):
+            if deadline is not None and position and time.perf_counter() > deadline:
+                break
+            score = similarity(
+                words,
+                normalize_name(contact.first_name) + normalize_name(contact.last_name),
+            )
+            if score >= min_score:
+                scored.append((contact, score))
+        return heapq.nlargest(limit, scored, key=lambda item: item[1])
+
+    def get_contact_details(self, contact_id: int) -> Contact | None:
         """
         Получает детальную информацию о контакте из базы данных, из таблицы "contacts"
 
@@ -195,12 +1221,18 @@ class DatabaseManager:
             contact_id (int): Идентификатор контакта
 
         Returns:
-            tuple | None: Кортеж с информацией о контакте или None, если контакт не найден
+            Contact | None: Контакт или None, если контакт не найден
         """
-        self.cur.execute("SELECT * FROM contacts WHERE id=?", (contact_id,))
-        return self.cur.fetchone()
+        self._flush_pending()
+        contacts = self._fetch(
+            contact_factory,
+            f"SELECT {CONTACT_COLUMNS} FROM contacts WHERE id=?",
+            (contact_id,),
+            size=1,
+        )
+        return contacts[0] if contacts else None
 
-    def get_contacts(self, user_id: int) -> list[tuple]:
+    def get_contacts(self, user_id: int) -> list[Contact]:
         """
         Получает список контактов пользователя из базы данных : из таблицы "contacts"
 
@@ -208,10 +1240,267 @@ class DatabaseManager:
             user_id (int): Идентификатор пользователя
 
         Returns:
-            list[tuple]: Список кортежей с контактами пользователя
+            list[Contact]: Список контактов пользователя
+        """
+        self._flush_pending()
+        return self._fetch(
+            contact_factory,
+            f"SELECT {CONTACT_COLUMNS} FROM contacts WHERE user_id=?",
+            (user_id,),
+        )
+
+    def get_contacts_page(
+        self,
+        user_id: int,
+        page_size: int = 50,
+        after_id: int | None = None,
+        before_id: int | None = None,
+    ) -> list[Contact]:
+        """
+        Получает одну страницу контактов пользователя, упорядоченных по id
+
+        Страницы выбираются по ключу (keyset), а не через OFFSET, поэтому стоимость
+        запроса не растет с номером страницы
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            page_size (int): Количество контактов на странице. По умолчанию 50
+            after_id (int | None): Вернуть контакты с id больше указанного. По умолчанию None
+            before_id (int | None): Вернуть контакты с id меньше указанного. По умолчанию None
+
+        Returns:
+            list[Contact]: Список контактов в порядке возрастания id
+        """
+        self._flush_pending()
+        if before_id is not None:
+            return self._fetch(
+                contact_factory,
+                f"SELECT {CONTACT_COLUMNS} FROM contacts WHERE user_id=? AND id<? ORDER BY id DESC LIMIT ?",
+                (user_id, before_id, page_size),
+            )[::-1]
+        return self._fetch(
+            contact_factory,
+            f"SELECT {CONTACT_COLUMNS} FROM contacts WHERE user_id=? AND id>? ORDER BY id LIMIT ?",
+            (user_id, -1 if after_id is None else after_id, page_size),
+        )
+
+    def iter_contacts(self, user_id: int, page_size: int = 500) -> Iterator[Contact]:
+        """
+        Постранично перебирает все контакты пользователя
+
+        В памяти одновременно находится не больше одной страницы
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            page_size (int): Количество контактов, читаемых за один запрос. По умолчанию 500
+
+        Returns:
+            Iterator[Contact]: Контакты в порядке возрастания id
+        """
+        after_id = None
+        while page := self.get_contacts_page(user_id, page_size, after_id):
+            yield from page
+            after_id = page[-1].id
+
+    def iter_search_contacts(
+        self, user_id: int, query: str, page_size: int = 500
+    ) -> Iterator[Contact]:
+        """
+        Потоково выполняет поиск контактов, читая результаты порциями через fetchmany
+
+        Использует собственный курсор, поэтому другие запросы менеджера
+        во время перебора не сбрасывают результаты поиска
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            query (str): Поисковый запрос
+            page_size (int): Количество строк, читаемых за один раз. По умолчанию 500
+
+        Returns:
+            Iterator[Contact]: Найденные контакты
+        """
+        self._flush_pending()
+        if self.search_mode == "fuzzy" and any(ch.isalpha() for ch in query):
+            yield from self.search_contacts(user_id, query)
+            return
+        cur = self._new_cursor()
+        cur.row_factory = contact_factory
+        match = fts_match_query(query)
+        if self.search_mode == "fts" and self.fts_available and match:
+            cur.execute(
+                f"""SELECT {JOINED_CONTACT_COLUMNS} FROM contacts_fts
+                    JOIN contacts c ON c.id = contacts_fts.rowid
+                    WHERE contacts_fts MATCH ? AND c.user_id = ?
+                    ORDER BY contacts_fts.rank""",
+                (match, user_id),
+            )
+        else:
+            pattern = f"%{query}%"
+            cur.execute(
+                f"SELECT {CONTACT_COLUMNS} FROM contacts WHERE user_id=? AND (first_name LIKE ? OR last_name LIKE ? OR phone LIKE ? OR email LIKE ?) ORDER BY id",
+                (user_id, pattern, pattern, pattern, pattern),
+            )
+        try:
+            while rows := cur.fetchmany(page_size):
+                yield from rows
+        finally:
+            cur.close()
+
+    def iter_all_contacts(self, chunk_size: int = 10000) -> Iterator[Contact]:
+        """
+        Потоково перебирает контакты всех пользователей, упорядоченные по user_id и id
+
+        Args:
+            chunk_size (int): Количество строк, читаемых за один раз. По умолчанию 10000
+
+        Returns:
+            Iterator[Contact]: Контакты, сгруппированные по владельцу
+        """
+        self._flush_pending()
+        cur = self._new_cursor()
+        cur.row_factory = contact_factory
+        cur.execute(f"SELECT {CONTACT_COLUMNS} FROM contacts ORDER BY user_id, id")
+        try:
+            while rows := cur.fetchmany(chunk_size):
+                yield from rows
+        finally:
+            cur.close()
+
+    def iter_contact_chunks(
+        self, user_id: int | None = None, chunk_size: int = 10000
+    ) -> Iterator[list[tuple]]:
+        """
+        Потоково читает контакты пользователя или всей базы кусками через fetchmany
+
+        Использует собственный курсор, поэтому в памяти одновременно находится
+        не больше одного куска, а другие запросы менеджера не прерывают чтение
+
+        Args:
+            user_id (int | None): Идентификатор пользователя. По умолчанию None - все контакты
+            chunk_size (int): Количество строк в куске. По умолчанию 10000
+
+        Returns:
+            Iterator[list[tuple]]: Списки кортежей (user_id, first_name, last_name, phone, email)
+                в порядке возрастания id
+        """
+        self._flush_pending()
+        cur = self._new_cursor()
+        columns = "user_id, first_name, last_name, phone, email"
+        if user_id is None:
+            cur.execute(f"SELECT {columns} FROM contacts ORDER BY id")
+        else:
+            cur.execute(
+                f"SELECT {columns} FROM contacts WHERE user_id=? ORDER BY id",
+                (user_id,),
+            )
+        try:
+            while rows := cur.fetchmany(chunk_size):
+                yield rows
+        finally:
+            cur.close()
+
+    def get_change_seq(self) -> int:
+        """
+        Возвращает номер последней записи журнала изменений contact_changes
+
+        Returns:
+            int: Номер последней записи или 0, если изменений еще не было
         """
-        self.cur.execute("SELECT * FROM contacts WHERE user_id=?", (user_id,))
-        return self.cur.fetchall()
+        self._flush_pending()
+        self.cur.execute("SELECT seq FROM sqlite_sequence WHERE name='contact_changes'")
+        row = self.cur.fetchone()
+        return 0 if row is None else row[0]
+
+    def get_change_horizon(self) -> int:
+        """
+        Возвращает границу журнала: записи с номером не больше нее удалены сжатием
+
+        Returns:
+            int: Наименьшая позиция, с которой журнал можно читать без пропусков
+        """
+        self.cur.execute("SELECT horizon FROM change_log_state")
+        return self.cur.fetchone()[0]
+
+    def iter_changes(
+        self, since_seq: int, user_id: int | None = None, chunk_size: int = 1000
+    ) -> Iterator[Change]:
+        """
+        Потоково читает изменения контактов после позиции since_seq
+
+        Для вставок и изменений возвращается текущая строка контакта, поэтому
+        читателю достаточно применять их как вставку или замену по id.
+        Id удаленного контакта может достаться контакту другого пользователя,
+        поэтому строка берется, только если владелец совпадает с записью журнала.
+        Запрос выполняется на отдельном курсоре одним снимком базы
+
+        Args:
+            since_seq (int): Номер последней уже примененной записи, 0 - с начала журнала
+            user_id (int | None): Только изменения контактов этого пользователя. По умолчанию все
+            chunk_size (int): Количество строк, читаемых за один раз. По умолчанию 1000
+
+        Returns:
+            Iterator[Change]: Изменения по возрастанию seq
+
+        Raises:
+            ChangeLogCompactedError: Если since_seq меньше границы журнала и нужна полная перезагрузка
+        """
+        self._flush_pending()
+        horizon = self.get_change_horizon()
+        if since_seq < horizon:
+            raise ChangeLogCompactedError(
+                f"Журнал сжат до позиции {horizon}, запрошена {since_seq}"
+            )
+        query = f"""SELECT ch.seq, ch.op, ch.contact_id, ch.user_id, {JOINED_CONTACT_COLUMNS}
+                    FROM contact_changes ch LEFT JOIN contacts c
+                        ON c.id = ch.contact_id AND c.user_id = ch.user_id
+                    WHERE ch.seq > ?"""
+        params: tuple = (since_seq,)
+        if user_id is not None:
+            query += " AND ch.user_id = ?"
+            params = (since_seq, user_id)
+        cur = self._new_cursor()
+        cur.row_factory = change_factory
+        cur.execute(query + " ORDER BY ch.seq", params)
+        try:
+            while rows := cur.fetchmany(chunk_size):
+                yield from rows
+        finally:
+            cur.close()
+
+    def compact_changes(self, horizon: int | None = None) -> int:
+        """
+        Сжимает журнал изменений
+
+        Записи, за которыми для того же контакта того же пользователя есть более
+        поздняя запись, удаляются всегда: читатель получит текущую строку контакта
+        из последней. Последнее удаление остается, даже если id контакта
+        потом достался другому пользователю.
+        Если передан horizon, удаляются и все записи с номером не больше него,
+        а читатели с более старой позицией получат ChangeLogCompactedError
+
+        Args:
+            horizon (int | None): Позиция, которую уже прочитали все читатели. По умолчанию None
+
+        Returns:
+            int: Количество удаленных записей
+        """
+        self._flush_pending()
+        with self.transaction():
+            deleted = 0
+            if horizon is not None and horizon > self.get_change_horizon():
+                self.cur.execute(
+                    "DELETE FROM contact_changes WHERE seq <= ?", (horizon,)
+                )
+                deleted += self.cur.rowcount
+                self.cur.execute("UPDATE change_log_state SET horizon = ?", (horizon,))
+            self.cur.execute(
+                """DELETE FROM contact_changes WHERE seq < (
+                       SELECT MAX(later.seq) FROM contact_changes later
+                       WHERE later.contact_id = contact_changes.contact_id
+                         AND later.user_id = contact_changes.user_id)"""
+            )
+            deleted += self.cur.rowcount
+        return deleted
 
     def clear_table(self, table_name: str) -> None:
         """
@@ -220,12 +1509,20 @@ class DatabaseManager:
         Args:
             table_name (str): Имя таблицы
         """
+        self._flush_pending()
         self.cur.execute(f"DELETE FROM {table_name}")
-        self.conn.commit()
+        self._commit()
 
     def close_connection(self) -> None:
-        """Закрывает соединение с базой данных"""
-        self.conn.close()
+        """Записывает отложенные операции и закрывает соединение с базой данных"""
+        try:
+            self.flush()
+        finally:
+            if self._pool is None:
+                if self._conn is not None:
+                    self._conn.close()
+            else:
+                self._pool.close()
 
 
 class AuthManager:
@@ -301,7 +1598,7 @@ class ContactManager:
 
     def add_contact(
         self, user_id: int, first_name: str, last_name: str, phone: str, email: str
-    ) -> None:
+    ) -> bool:
         """
         Добавляет контакт пользователя, предварительно проверяя уникальность номера телефона
 
@@ -311,12 +1608,16 @@ class ContactManager:
             last_name (str): Фамилия контакта
             phone (str): Номер телефона контакта
             email (str): Email контакта
+
+        Returns:
+            bool: True, если контакт добавлен, False, если номер уже есть у пользователя
         """
-        if self.db.check_duplicate_phone(phone):
+        if self.db.check_duplicate_phone(phone, user_id):
             print("Контакт с таким номером телефона уже существует!")
-            return
+            return False
 
         self.db.add_contact(user_id, first_name, last_name, phone, email)
+        return True
 
     def edit_contact(
         self,
@@ -369,14 +1670,14 @@ class ContactManager:
         contact = self.db.get_contact_details(contact_id)
         if contact:
             print("Детальная информация о контакте:")
-            print(f"Имя: {contact['first_name']}")
-            print(f"Фамилия: {contact['last_name']}")
-            print(f"Номер телефона: {contact['phone']}")
-            print(f"Email: {contact['email']}")
+            print(f"Имя: {contact.first_name}")
+            print(f"Фамилия: {contact.last_name}")
+            print(f"Номер телефона: {contact.phone}")
+            print(f"Email: {contact.email}")
         else:
             print("Контакт не найден!")
 
-    def view_contacts(self, user_id: int) -> list[tuple]:
+    def view_contacts(self, user_id: int) -> list[Contact]:
         """
         Получение списка контактов пользователя
 
@@ -384,13 +1685,47 @@ class ContactManager:
             user_id (int): Идентификатор пользователя
 
         Returns:
-            list[tuple]: Список контактов пользователя
+            list[Contact]: Список контактов пользователя
         """
         contacts = self.db.get_contacts(user_id)
         # for contact in contacts:
         #     print(f"ID: {contact[0]}, Имя: {contact[1]}, Фамилия: {contact[2]}, Номер телефона: {contact[3]}")
         return contacts
 
+    def view_contacts_page(
+        self,
+        user_id: int,
+        page_size: int = 20,
+        after_id: int | None = None,
+        before_id: int | None = None,
+    ) -> list[Contact]:
+        """
+        Получение одной страницы контактов пользователя
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            page_size (int): Количество контактов на странице. По умолчанию 20
+            after_id (int | None): Страница после контакта с этим id. По умолчанию None
+            before_id (int | None): Страница перед контактом с этим id. По умолчанию None
+
+        Returns:
+            list[Contact]: Контакты страницы в порядке возрастания id
+        """
+        return self.db.get_contacts_page(user_id, page_size, after_id, before_id)
+
+    def iter_contacts(self, user_id: int, page_size: int = 500) -> Iterator[Contact]:
+        """
+        Постраничный перебор всех контактов пользователя
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            page_size (int): Количество контактов, читаемых за один запрос. По умолчанию 500
+
+        Returns:
+            Iterator[Contact]: Контакты пользователя
+        """
+        return self.db.iter_contacts(user_id, page_size)
+
     # def view_contacts(self, user_id: int) -> None:
     #     """
     #     Просмотр контактов пользователя
@@ -0,0 +1,283 @@
+import argparse
+import time
+from collections.abc import Iterable, Iterator
+from itertools import groupby
+from itertools import islice
+
+from db import DatabaseManager
+from fuzzy import normalize_name
+from fuzzy import similarity
+from reges import normalize_email
+from reges import normalize_phone
+from schemas.contacts import Contact
+
+"""Поиск и объединение дубликатов контактов
+
+Контакты каждого пользователя раскладываются по блокам с одинаковым
+нормализованным ключом: номером телефона в формате E.164 и адресом почты
+в нижнем регистре. Сравниваются только контакты внутри одного блока, поэтому
+работа линейна по числу контактов, а не квадратична. Одинаковый номер телефона
+означает дубликат сразу, одинаковая почта - только вместе с похожим именем
+(например, у членов семьи может быть общий адрес). Связанные пары собираются
+в группы, в каждой группе остается самый полный контакт, а его пустые поля
+заполняются из дубликатов"""
+
+FIELDS = ("first_name", "last_name", "phone", "email")
+
+
+class MergeGroup:
+    """
+    Группа дубликатов одного пользователя
+
+    Attributes:
+        user_id (int): Идентификатор пользователя
+        keep (Contact): Контакт, который останется
+        duplicates (list[Contact]): Контакты, которые будут удалены
+        fields (dict[str, str]): Итоговые значения полей остающегося контакта
+    """
+
+    def __init__(self, contacts: list[Contact]) -> None:
+        """
+        Выбирает остающийся контакт и сводит поля группы
+
+        Args:
+            contacts (list[Contact]): Контакты группы, не меньше двух
+        """
+        ordered = sorted(
+            contacts,
+            key=lambda contact: (
+                -sum(bool(getattr(contact, field)) for field in FIELDS),
+                contact.id,
+            ),
+        )
+        self.user_id = ordered[0].user_id
+        self.keep = ordered[0]
+        self.duplicates = ordered[1:]
+        self.fields = {}
+        for field in FIELDS:
+            value = next(
+                (
+                    getattr(contact, field)
+                    for contact in ordered
+                    if getattr(contact, field)
+                ),
+                None,
+            )
+            if value:
+                self.fields[field] = value
+
+    def __repr__(self) -> str:
+        """Возвращает строковое представление группы"""
+        return (
+            f"MergeGroup(user_id: {self.user_id}, keep: {self.keep.id}, "
+            f"duplicates: {[contact.id for contact in self.duplicates]})"
+        )
+
+
+class DedupReport:
+    """
+    Итоги поиска и объединения дубликатов
+
+    Attributes:
+        scanned (int): Количество просмотренных контактов
+        groups (int): Количество найденных групп дубликатов
+        duplicates (int): Количество контактов, подлежащих удалению
+        merged (int): Количество удаленных при объединении контактов
+        elapsed (float): Время работы в секундах
+    """
+
+    def __init__(self) -> None:
+        """Инициализирует пустой отчёт"""
+        self.scanned: int = 0
+        self.groups: int = 0
+        self.duplicates: int = 0
+        self.merged: int = 0
+        self.elapsed: float = 0.0
+
+    def __repr__(self) -> str:
+        """Возвращает строковое представление отчёта"""
+        return (
+            f"DedupReport(scanned: {self.scanned}, groups: {self.groups}, "
+            f"duplicates: {self.duplicates}, merged: {self.merged}, "
+            f"elapsed: {self.elapsed:.2f}s)"
+        )
+
+
+def find_groups(
+    contacts: Iterable[Contact], name_threshold: float = 0.8
+) -> list[MergeGroup]:
+    """
+    Находит группы дубликатов среди контактов одного пользователя
+
+    Args:
+        contacts (Iterable[Contact]): Контакты пользователя
+        name_threshold (float): Минимальное сходство имен для общей почты. По умолчанию 0.8
+
+    Returns:
+        list[MergeGroup]: Группы из двух и более контактов
+    """
+    contacts = list(contacts)
+    parent = list(range(len(contacts)))
+
+    def root(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    by_phone: dict[str, int] = {}
+    by_email: dict[str, list[int]] = {}
+    names: list[list[str] | None] = [None] * len(contacts)
+    for i, contact in enumerate(contacts):
+        phone = normalize_phone(contact.phone)
+        if phone is not None:
+            j = by_phone.setdefault(phone, i)
+            if j != i:
+                parent[root(i)] = root(j)
+        email = normalize_email(contact.email)
+        if email is None:
+            continue
+        block = by_email.setdefault(email, [])
+        if block:
+            names[i] = normalize_name(contact.first_name) + normalize_name(
+                contact.last_name
+            )
+            for j in block:
+                if root(i) == root(j):
+                    continue
+                if names[j] is None:
+                    names[j] = normalize_name(contacts[j].first_name) + normalize_name(
+                        contacts[j].last_name
+                    )
+                if similarity(names[i], names[j]) >= name_threshold:
+                    parent[root(i)] = root(j)
+        block.append(i)
+
+    members: dict[int, list[Contact]] = {}
+    for i, contact in enumerate(contacts):
+        members.setdefault(root(i), []).append(contact)
+    return [MergeGroup(group) for group in members.values() if len(group) > 1]
+
+
+class Deduplicator:
+    """
+    Этот класс ищет дубликаты контактов и объединяет их
+
+    Attributes:
+        db (DatabaseManager): Менеджер базы данных для выполнения запросов
+        name_threshold (float): Минимальное сходство имен для контактов с общей почтой
+        batch_size (int): Количество групп, объединяемых в одной транзакции
+    """
+
+    def __init__(
+        self,
+        db_manager: "DatabaseManager",
+        name_threshold: float = 0.8,
+        batch_size: int = 1000,
+    ):
+        """
+        Инициализирует поиск дубликатов
+
+        Args:
+            db_manager (DatabaseManager): Менеджер базы данных для выполнения запросов
+            name_threshold (float): Минимальное сходство имен для общей почты. По умолчанию 0.8
+            batch_size (int): Количество групп в одной транзакции. По умолчанию 1000
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size должен быть положительным")
+        self.db = db_manager
+        self.name_threshold = name_threshold
+        self.batch_size = batch_size
+
+    def find(
+        self, user_id: int | None = None, report: DedupReport | None = None
+    ) -> Iterator[MergeGroup]:
+        """
+        Потоково находит группы дубликатов, пользователь за пользователем
+
+        Args:
+            user_id (int | None): Искать только у этого пользователя. По умолчанию None - у всех
+            report (DedupReport | None): Отчёт, в котором считаются просмотренные контакты
+
+        Returns:
+            Iterator[MergeGroup]: Группы дубликатов
+        """
+        if user_id is None:
+            contacts = self.db.iter_all_contacts()
+        else:
+            contacts = self.db.iter_contacts(user_id)
+        for _, user_contacts in groupby(contacts, key=lambda contact: contact.user_id):
+            user_contacts = list(user_contacts)
+            if report is not None:
+                report.scanned += len(user_contacts)
+            yield from find_groups(user_contacts, self.name_threshold)
+
+    def apply(self, groups: Iterable[MergeGroup]) -> int:
+        """
+        Объединяет группы дубликатов, по batch_size групп в одной транзакции
+
+        Если объединение завершилось ошибкой, текущая пачка откатывается целиком
+
+        Args:
+            groups (Iterable[MergeGroup]): Группы дубликатов
+
+        Returns:
+            int: Количество удаленных дубликатов
+        """
+        merged = 0
+        groups = iter(groups)
+        while batch := list(islice(groups, self.batch_size)):
+            with self.db.transaction():
+                for group in batch:
+                    self.db.merge_contacts(
+                        group.keep.id,
+                        [contact.id for contact in group.duplicates],
+                        group.fields,
+                    )
+            merged += sum(len(group.duplicates) for group in batch)
+        return merged
+
+    def run(self, user_id: int | None = None, apply: bool = False) -> DedupReport:
+        """
+        Находит дубликаты и при необходимости объединяет их
+
+        Группы сначала собираются целиком, поэтому объединение не мешает
+        потоковому чтению контактов
+
+        Args:
+            user_id (int | None): Обработать только этого пользователя. По умолчанию None - всех
+            apply (bool): Объединить найденные группы. По умолчанию False - только отчёт
+
+        Returns:
+            DedupReport: Итоги работы
+        """
+        report = DedupReport()
+        started = time.perf_counter()
+        groups = list(self.find(user_id, report))
+        report.groups = len(groups)
+        report.duplicates = sum(len(group.duplicates) for group in groups)
+        if apply:
+            report.merged = self.apply(groups)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Поиск и объединение дубликатов")
+    parser.add_argument("--db", default="./contacts.db")
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--apply", action="store_true", help="Объединить дубликаты")
+    parser.add_argument("--show", type=int, default=20, help="Сколько групп вывести")
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(args.db)
+    deduplicator = Deduplicator(db_manager)
+    if args.apply:
+        print(deduplicator.run(args.user_id, apply=True))
+    else:
+        for group in islice(deduplicator.find(args.user_id), args.show):
+            print(group)
+            for contact in [group.keep, *group.duplicates]:
+                print(f"  {contact}")
+        print(deduplicator.run(args.user_id))
+    db_manager.close_connection()
@@ -0,0 +1,167 @@
+import re
+from collections.abc import Iterable
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+"""Нечеткий поиск контактов по имени и фамилии
+
+Имя и фамилия приводятся к нижнему регистру и латинице (транслитерация кириллицы),
+после чего каждое слово раскладывается на триграммы и получает фонетический ключ,
+в котором сведены похожие по звучанию написания: "Иванов", "Ivanof" и "Iwanow"
+дают один ключ "ivanaf". Токены хранятся в таблице contacts_fuzzy по пользователю,
+поэтому поиск выбирает кандидатов по индексу, а точное сходство считает только для них"""
+
+TRANSLIT = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "",
+    "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+}  # fmt: skip
+PHONETIC_RULES = [
+    ("shch", "sh"), ("sch", "sh"), ("dzh", "j"), ("zh", "sh"), ("kh", "h"),
+    ("ch", "4"),
+    ("ph", "f"), ("ck", "k"), ("ts", "5"), ("tz", "5"), ("w", "v"), ("q", "k"),
+    ("x", "ks"), ("j", "i"), ("y", "i"), ("z", "s"), ("c", "k"), ("o", "a"),
+    ("e", "i"),
+]  # fmt: skip
+DEVOICED_ENDINGS = {"v": "f", "b": "p", "d": "t", "g": "k"}
+PHONETIC_PREFIX = "~"
+
+_TRANSLIT_TABLE = str.maketrans(TRANSLIT)
+_WORD_REGEX = re.compile(r"[a-z0-9]+")
+_DOUBLE_REGEX = re.compile(r"(.)\1+")
+
+
+def normalize_name(text: str | None) -> list[str]:
+    """
+    Приводит текст к списку слов в нижнем регистре латиницей
+
+    Args:
+        text (str | None): Имя, фамилия или поисковый запрос
+
+    Returns:
+        list[str]: Слова после транслитерации
+    """
+    if not text:
+        return []
+    return _WORD_REGEX.findall(text.lower().translate(_TRANSLIT_TABLE))
+
+
+def phonetic_key(word: str) -> str:
+    """
+    Возвращает фонетический ключ нормализованного слова
+
+    Args:
+        word (str): Слово из normalize_name
+
+    Returns:
+        str: Ключ, одинаковый для похожих по звучанию написаний
+    """
+    for pattern, replacement in PHONETIC_RULES:
+        word = word.replace(pattern, replacement)
+    word = _DOUBLE_REGEX.sub(r"\1", word)
+    if word and word[-1] in DEVOICED_ENDINGS:
+        word = word[:-1] + DEVOICED_ENDINGS[word[-1]]
+    return word
+
+
+def trigrams(word: str) -> set[str]:
+    """
+    Раскладывает слово на триграммы, дополнив его пробелами с обеих сторон
+
+    Args:
+        word (str): Слово из normalize_name
+
+    Returns:
+        set[str]: Триграммы слова
+    """
+    padded = f" {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def word_tokens(word: str) -> set[str]:
+    """Возвращает триграммы и фонетический ключ одного слова"""
+    return trigrams(word) | {PHONETIC_PREFIX + phonetic_key(word)}
+
+
+def name_tokens(first_name: str | None, last_name: str | None) -> set[str]:
+    """
+    Возвращает токены индекса для имени и фамилии контакта
+
+    Args:
+        first_name (str | None): Имя
+        last_name (str | None): Фамилия
+
+    Returns:
+        set[str]: Триграммы и фонетические ключи всех слов
+    """
+    tokens = set()
+    for word in normalize_name(first_name) + normalize_name(last_name):
+        tokens |= word_tokens(word)
+    return tokens
+
+
+def index_rows(contacts: Iterable[tuple]) -> list[tuple[int, str, int]]:
+    """
+    Строит строки таблицы contacts_fuzzy
+
+    Args:
+        contacts (Iterable[tuple]): Кортежи (id, user_id, first_name, last_name)
+
+    Returns:
+        list[tuple[int, str, int]]: Кортежи (user_id, token, contact_id)
+    """
+    return [
+        (user_id, token, contact_id)
+        for contact_id, user_id, first_name, last_name in contacts
+        for token in name_tokens(first_name, last_name)
+    ]
+
+
+@lru_cache(maxsize=65536)
+def word_similarity(query_word: str, word: str) -> float:
+    """
+    Возвращает сходство двух нормализованных слов от 0 до 1
+
+    Совпадение фонетических ключей считается почти полным сходством, иначе
+    берется лучшее из коэффициента Дайса по триграммам и доли совпадающих
+    символов SequenceMatcher, которая мягче к опечаткам в коротких словах.
+    Имена часто повторяются, поэтому результаты кэшируются
+
+    Args:
+        query_word (str): Слово запроса
+        word (str): Слово из имени контакта
+
+    Returns:
+        float: Сходство
+    """
+    if query_word == word:
+        return 1.0
+    if phonetic_key(query_word) == phonetic_key(word):
+        return 0.9
+    query_grams, grams = trigrams(query_word), trigrams(word)
+    dice = 2 * len(query_grams & grams) / (len(query_grams) + len(grams))
+    return max(dice, SequenceMatcher(None, query_word, word).ratio())
+
+
+def similarity(query_words: list[str], name_words: list[str]) -> float:
+    """
+    Возвращает сходство запроса с именем контакта от 0 до 1
+
+    Для каждого слова запроса берется лучшее совпадение среди слов имени,
+    результат усредняется по словам запроса
+
+    Args:
+        query_words (list[str]): Слова запроса из normalize_name
+        name_words (list[str]): Слова имени и фамилии из normalize_name
+
+    Returns:
+        float: Сходство
+    """
+    if not query_words or not name_words:
+        return 0.0
+    return sum(
+        max(word_similarity(query_word, word) for word in name_words)
+        for query_word in query_words
+    ) / len(query_words)
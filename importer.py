@@ -0,0 +1,233 @@
+import argparse
+import csv
+import getpass
+import json
+import time
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+from db import AuthManager
+from db import DatabaseManager
+from profiles import PROFILES
+from reges import validate_emails
+from reges import validate_phones
+
+"""Массовый импорт контактов из CSV/JSONL
+
+Файл читается потоково, кусками по batch_size строк. Каждый кусок проверяется
+пакетными валидаторами из reges.py, дубликаты номеров (в формате E.164) отсекаются
+по множеству, загруженному из базы один раз, а прошедшие проверку строки
+записываются через executemany в одной транзакции на кусок"""
+
+FIELDS = ("first_name", "last_name", "phone", "email")
+
+
+class ImportReport:
+    """
+    Итоги импорта
+
+    Attributes:
+        total (int): Количество прочитанных строк
+        imported (int): Количество добавленных контактов
+        rejected (list[tuple[int, str]]): Номера отклонённых строк и причины
+        elapsed (float): Время импорта в секундах
+    """
+
+    def __init__(self) -> None:
+        """Инициализирует пустой отчёт"""
+        self.total: int = 0
+        self.imported: int = 0
+        self.rejected: list[tuple[int, str]] = []
+        self.elapsed: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        """Возвращает скорость обработки в строках в секунду"""
+        if self.elapsed == 0:
+            return 0.0
+        return self.total / self.elapsed
+
+    def __repr__(self) -> str:
+        """Возвращает строковое представление отчёта"""
+        return (
+            f"ImportReport(total: {self.total}, imported: {self.imported}, "
+            f"rejected: {len(self.rejected)}, rows/sec: {self.rows_per_sec:.0f})"
+        )
+
+
+def read_csv(path: str) -> Iterator[tuple[int, dict]]:
+    """
+    Потоково читает CSV-файл с заголовком first_name,last_name,phone,email
+
+    Args:
+        path (str): Путь к файлу
+
+    Returns:
+        Iterator[tuple[int, dict]]: Номер строки и словарь с полями контакта
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        for line_no, row in enumerate(csv.DictReader(f), start=2):
+            yield line_no, row
+
+
+def read_jsonl(path: str) -> Iterator[tuple[int, dict]]:
+    """
+    Потоково читает JSONL-файл, по одному объекту контакта в строке
+
+    Args:
+        path (str): Путь к файлу
+
+    Returns:
+        Iterator[tuple[int, dict]]: Номер строки и словарь с полями контакта
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = None
+            yield line_no, row if isinstance(row, dict) else {}
+
+
+def read_file(path: str) -> Iterator[tuple[int, dict]]:
+    """
+    Выбирает читатель по расширению файла
+
+    Args:
+        path (str): Путь к файлу .csv, .jsonl или .json
+
+    Returns:
+        Iterator[tuple[int, dict]]: Номер строки и словарь с полями контакта
+    """
+    if path.lower().endswith((".jsonl", ".json")):
+        return read_jsonl(path)
+    return read_csv(path)
+
+
+class ContactImporter:
+    """
+    Этот класс выполняет массовый импорт контактов пользователя
+
+    Attributes:
+        db (DatabaseManager): Менеджер базы данных для выполнения запросов
+        batch_size (int): Количество строк в одной транзакции
+    """
+
+    def __init__(self, db_manager: "DatabaseManager", batch_size: int = 1000):
+        """
+        Инициализирует импортёр
+
+        Args:
+            db_manager (DatabaseManager): Менеджер базы данных для выполнения запросов
+            batch_size (int): Количество строк в одной транзакции. По умолчанию 1000
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size должен быть положительным")
+        self.db = db_manager
+        self.batch_size = batch_size
+
+    def import_file(self, user_id: int, path: str) -> ImportReport:
+        """
+        Импортирует контакты из CSV или JSONL файла
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            path (str): Путь к файлу
+
+        Returns:
+            ImportReport: Итоги импорта
+        """
+        return self.import_rows(user_id, read_file(path))
+
+    def import_rows(
+        self, user_id: int, rows: Iterable[tuple[int, dict]]
+    ) -> ImportReport:
+        """
+        Импортирует контакты из потока строк
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            rows (Iterable[tuple[int, dict]]): Номер строки и словарь с полями контакта
+
+        Returns:
+            ImportReport: Итоги импорта
+        """
+        report = ImportReport()
+        started = time.perf_counter()
+        known_phones = self.db.get_phones(user_id)
+        rows = iter(rows)
+        while chunk := list(islice(rows, self.batch_size)):
+            report.total += len(chunk)
+            batch = []
+            records = [
+                [str(row.get(field) or "").strip() for field in FIELDS]
+                for _, row in chunk
+            ]
+            phones = validate_phones([record[2] for record in records])
+            emails = validate_emails([record[3] for record in records])
+            for (line_no, _), record, phone, email in zip(
+                chunk, records, phones, emails
+            ):
+                first_name, last_name, _, _ = record
+                if not phone.valid:
+                    report.rejected.append((line_no, phone.reason))
+                elif not email.valid:
+                    report.rejected.append((line_no, email.reason))
+                elif phone.normalized is not None and phone.normalized in known_phones:
+                    report.rejected.append((line_no, "номер телефона уже существует"))
+                else:
+                    if phone.normalized is not None:
+                        known_phones.add(phone.normalized)
+                    batch.append(
+                        (user_id, first_name, last_name, phone.value, email.value)
+                    )
+            if batch:
+                self.db.add_contacts(batch)
+                report.imported += len(batch)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+
+def print_report(report: ImportReport, max_rejected: int = 20) -> None:
+    """
+    Печатает отчёт об импорте
+
+    Args:
+        report (ImportReport): Итоги импорта
+        max_rejected (int): Сколько отклонённых строк вывести. По умолчанию 20
+    """
+    print(f"Прочитано строк: {report.total}")
+    print(f"Добавлено контактов: {report.imported}")
+    print(f"Отклонено строк: {len(report.rejected)}")
+    print(f"Скорость: {report.rows_per_sec:.0f} строк/сек")
+    for line_no, reason in report.rejected[:max_rejected]:
+        print(f"  строка {line_no}: {reason}")
+    if len(report.rejected) > max_rejected:
+        print(f"  ... и ещё {len(report.rejected) - max_rejected}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Массовый импорт контактов")
+    parser.add_argument("path", help="CSV или JSONL файл с контактами")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", help="по умолчанию запрашивается без эха")
+    parser.add_argument("--db", default="./contacts.db")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--profile",
+        choices=tuple(PROFILES),
+        help="профиль настроек SQLite, bulk-load - только для загрузки в новый файл или копию",
+    )
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(args.db, profile=args.profile)
+    password = args.password
+    if password is None:
+        password = getpass.getpass("Пароль: ")
+    user_id = AuthManager(db_manager).login(args.username, password)
+    if user_id:
+        importer = ContactImporter(db_manager, batch_size=args.batch_size)
+        print_report(importer.import_file(user_id, args.path))
+    db_manager.close_connection()
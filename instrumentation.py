@@ -0,0 +1,218 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+from itertools import chain
+from typing import Any
+
+"""Сбор статистики SQL-запросов DatabaseManager
+
+InstrumentedCursor замеряет каждый execute/executemany вместе с последующей
+выборкой строк и передает результат в QueryStats. Запросы дольше заданного
+порога записываются в журнал вместе с их EXPLAIN QUERY PLAN"""
+
+logger = logging.getLogger("contacts.db")
+
+_WHITESPACE_REGEX = re.compile(r"\s+")
+
+
+class QueryStats:
+    """
+    Этот класс накапливает статистику по SQL-запросам
+
+    Запросы группируются по тексту с нормализованными пробелами, параметры
+    в группировке не участвуют
+
+    Attributes:
+        slow_query_ms (float | None): Порог медленного запроса в миллисекундах, None - не журналировать
+    """
+
+    def __init__(self, slow_query_ms: float | None = 100.0) -> None:
+        """
+        Инициализирует пустую статистику
+
+        Args:
+            slow_query_ms (float | None): Порог медленного запроса в миллисекундах. По умолчанию 100
+        """
+        self.slow_query_ms = slow_query_ms
+        self._stats: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, elapsed: float, rows: int) -> None:
+        """
+        Учитывает одно выполнение запроса
+
+        Args:
+            sql (str): Текст запроса
+            elapsed (float): Время выполнения вместе с выборкой, в секундах
+            rows (int): Количество полученных или измененных строк
+        """
+        key = _WHITESPACE_REGEX.sub(" ", sql).strip()
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                self._stats[key] = [1, elapsed, elapsed, rows]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] = max(entry[2], elapsed)
+                entry[3] += rows
+
+    def is_slow(self, elapsed: float) -> bool:
+        """Возвращает True, если запрос с таким временем нужно записать в журнал"""
+        return self.slow_query_ms is not None and elapsed * 1000 >= self.slow_query_ms
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """
+        Возвращает статистику, начиная с запросов с наибольшим суммарным временем
+
+        Returns:
+            list[dict[str, Any]]: sql, count, total_ms, avg_ms, max_ms и rows для каждого запроса
+        """
+        with self._lock:
+            items = [(sql, list(entry)) for sql, entry in self._stats.items()]
+        snapshot = [
+            {
+                "sql": sql,
+                "count": count,
+                "total_ms": total * 1000,
+                "avg_ms": total / count * 1000,
+                "max_ms": longest * 1000,
+                "rows": rows,
+            }
+            for sql, (count, total, longest, rows) in items
+        ]
+        snapshot.sort(key=lambda item: item["total_ms"], reverse=True)
+        return snapshot
+
+    def reset(self) -> None:
+        """Очищает накопленную статистику"""
+        with self._lock:
+            self._stats.clear()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Курсор, передающий время и количество строк каждого запроса в QueryStats
+
+    Для запросов, возвращающих строки, время выборки прибавляется ко времени
+    execute, а запрос учитывается, когда строки закончились, при следующем
+    execute или при закрытии курсора
+    """
+
+    def __init__(self, connection: sqlite3.Connection, stats: QueryStats) -> None:
+        """
+        Инициализирует курсор
+
+        Args:
+            connection (sqlite3.Connection): Соединение с базой данных
+            stats (QueryStats): Статистика, в которую записываются запросы
+        """
+        super().__init__(connection)
+        self.stats = stats
+        self._sql: str | None = None
+        self._params: Any = ()
+        self._elapsed = 0.0
+        self._rows = 0
+
+    def _begin(self, sql: str, params: Any) -> None:
+        """Завершает учет предыдущего запроса и начинает новый"""
+        self._finish()
+        self._sql = sql
+        self._params = params
+        self._elapsed = 0.0
+        self._rows = 0
+
+    def _finish(self) -> None:
+        """Передает накопленные данные о запросе в статистику"""
+        if self._sql is None:
+            return
+        sql, params, elapsed = self._sql, self._params, self._elapsed
+        self._sql = None
+        self.stats.record(sql, elapsed, self._rows)
+        if self.stats.is_slow(elapsed):
+            logger.warning(
+                "Медленный запрос: %.1f мс, строк: %d\n%s\nПлан: %s",
+                elapsed * 1000,
+                self._rows,
+                sql,
+                self._query_plan(sql, params),
+            )
+
+    def _query_plan(self, sql: str, params: Any) -> str:
+        """Возвращает EXPLAIN QUERY PLAN запроса одной строкой"""
+        try:
+            plan = self.connection.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return "; ".join(row[3] for row in plan.fetchall()) or "-"
+        except sqlite3.Error as error:
+            return f"недоступен ({error})"
+
+    def _timed(self, func: Any, *args: Any) -> Any:
+        """Вызывает метод курсора, прибавляя время к текущему запросу"""
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self._elapsed += time.perf_counter() - started
+
+    def execute(self, sql: str, parameters: Any = ()) -> "InstrumentedCursor":
+        """Выполняет запрос с замером времени"""
+        self._begin(sql, parameters)
+        self._timed(super().execute, sql, parameters)
+        if self.description is None:
+            self._rows = max(self.rowcount, 0)
+            self._finish()
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> "InstrumentedCursor":
+        """Выполняет пакетный запрос с замером времени, план строится по первому набору параметров"""
+        seq_of_parameters = iter(seq_of_parameters)
+        first = next(seq_of_parameters, None)
+        self._begin(sql, () if first is None else first)
+        if first is not None:
+            seq_of_parameters = chain((first,), seq_of_parameters)
+        self._timed(super().executemany, sql, seq_of_parameters)
+        self._rows = max(self.rowcount, 0)
+        self._finish()
+        return self
+
+    def fetchone(self) -> Any:
+        """Возвращает следующую строку"""
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        else:
+            self._rows += 1
+        return row
+
+    def fetchmany(self, size: int | None = None) -> list:
+        """Возвращает следующие size строк"""
+        size = self.arraysize if size is None else size
+        rows = self._timed(super().fetchmany, size)
+        self._rows += len(rows)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self) -> list:
+        """Возвращает все оставшиеся строки"""
+        rows = self._timed(super().fetchall)
+        self._rows += len(rows)
+        self._finish()
+        return rows
+
+    def __next__(self) -> Any:
+        """Возвращает следующую строку при итерации по курсору"""
+        try:
+            row = self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+        self._rows += 1
+        return row
+
+    def close(self) -> None:
+        """Учитывает незавершенный запрос и закрывает курсор"""
+        self._finish()
+        super().close()
@@ -0,0 +1,360 @@
+import sqlite3
+from collections.abc import Callable
+
+from fuzzy import index_rows
+from reges import normalize_phone
+
+"""Версионированные миграции схемы базы данных
+
+Текущая версия схемы хранится в PRAGMA user_version. Каждая миграция выполняется
+в отдельной транзакции вместе с обновлением user_version, поэтому существующий
+файл contacts.db обновляется на месте и никогда не остаётся в промежуточном состоянии"""
+
+
+def _create_base_tables(conn: sqlite3.Connection) -> None:
+    """Создает таблицы users и contacts, если они не существуют"""
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS users (
+                        id INTEGER PRIMARY KEY,
+                        username TEXT UNIQUE,
+                        password TEXT)"""
+    )
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS contacts (
+                        id INTEGER PRIMARY KEY,
+                        user_id INTEGER,
+                        first_name TEXT,
+                        last_name TEXT,
+                        phone TEXT,
+                        email TEXT,
+                        FOREIGN KEY (user_id) REFERENCES users(id))"""
+    )
+
+
+def _fill_phone_norm(conn: sqlite3.Connection) -> None:
+    """
+    Заполняет phone_norm по текущим правилам нормализации
+
+    Для повторяющихся в пределах пользователя номеров значение получает только
+    самый ранний контакт, у остальных phone_norm остаётся NULL
+    """
+    conn.create_function("normalize_phone", 1, normalize_phone, deterministic=True)
+    conn.execute("UPDATE contacts SET phone_norm = normalize_phone(phone)")
+    conn.execute(
+        """UPDATE contacts SET phone_norm = NULL
+           WHERE phone_norm IS NOT NULL AND id NOT IN (
+               SELECT MIN(id) FROM contacts
+               WHERE phone_norm IS NOT NULL
+               GROUP BY user_id, phone_norm)"""
+    )
+
+
+def _add_contact_indexes(conn: sqlite3.Connection) -> None:
+    """
+    Добавляет нормализованный номер телефона и индексы для горячих запросов
+
+    Уже существующие дубликаты номера в пределах одного пользователя не удаляются,
+    а остаются без phone_norm, чтобы уникальный индекс можно было создать
+    на заполненной базе
+    """
+    conn.execute("ALTER TABLE contacts ADD COLUMN phone_norm TEXT")
+    _fill_phone_norm(conn)
+    conn.execute("CREATE INDEX idx_contacts_user_id ON contacts (user_id)")
+    conn.execute("CREATE INDEX idx_contacts_phone ON contacts (phone_norm)")
+    conn.execute(
+        "CREATE INDEX idx_contacts_user_name ON contacts (user_id, last_name, first_name)"
+    )
+    conn.execute(
+        "CREATE UNIQUE INDEX ux_contacts_user_phone ON contacts (user_id, phone_norm)"
+    )
+
+
+def fts5_available(conn: sqlite3.Connection) -> bool:
+    """
+    Проверяет, собран ли SQLite с модулем полнотекстового поиска FTS5
+
+    Args:
+        conn (sqlite3.Connection): Соединение с базой данных
+
+    Returns:
+        bool: True, если FTS5 доступен, иначе False
+    """
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+    except sqlite3.OperationalError:
+        return False
+    conn.execute("DROP TABLE temp.fts5_probe")
+    return True
+
+
+FTS_TRIGGERS = {
+    "contacts_fts_insert": """CREATE TRIGGER contacts_fts_insert AFTER INSERT ON contacts BEGIN
+               INSERT INTO contacts_fts (rowid, first_name, last_name, phone_norm, email)
+               VALUES (new.id, new.first_name, new.last_name, new.phone_norm, new.email);
+           END""",
+    "contacts_fts_delete": """CREATE TRIGGER contacts_fts_delete AFTER DELETE ON contacts BEGIN
+               INSERT INTO contacts_fts (contacts_fts, rowid, first_name, last_name, phone_norm, email)
+               VALUES ('delete', old.id, old.first_name, old.last_name, old.phone_norm, old.email);
+           END""",
+    "contacts_fts_update": """CREATE TRIGGER contacts_fts_update AFTER UPDATE ON contacts BEGIN
+               INSERT INTO contacts_fts (contacts_fts, rowid, first_name, last_name, phone_norm, email)
+               VALUES ('delete', old.id, old.first_name, old.last_name, old.phone_norm, old.email);
+               INSERT INTO contacts_fts (rowid, first_name, last_name, phone_norm, email)
+               VALUES (new.id, new.first_name, new.last_name, new.phone_norm, new.email);
+           END""",
+}
+
+
+def create_fts_triggers(conn: sqlite3.Connection) -> None:
+    """
+    Создает триггеры, синхронизирующие contacts_fts с таблицей contacts
+
+    Args:
+        conn (sqlite3.Connection): Соединение с базой данных
+    """
+    for sql in FTS_TRIGGERS.values():
+        conn.execute(sql)
+
+
+def drop_fts_triggers(conn: sqlite3.Connection) -> None:
+    """
+    Удаляет триггеры contacts_fts, например на время массовой загрузки
+
+    Args:
+        conn (sqlite3.Connection): Соединение с базой данных
+    """
+    for name in FTS_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def _add_contacts_fts(conn: sqlite3.Connection) -> None:
+    """
+    Создает полнотекстовый индекс contacts_fts поверх таблицы contacts
+
+    Индекс хранит только токены (external content), а синхронизируется триггерами
+    на вставку, изменение и удаление. Если SQLite собран без FTS5, миграция ничего
+    не создает и поиск работает через LIKE
+    """
+    if not fts5_available(conn):
+        return
+    conn.execute(
+        """CREATE VIRTUAL TABLE contacts_fts USING fts5(
+                        first_name, last_name, phone_norm, email,
+                        content='contacts', content_rowid='id')"""
+    )
+    create_fts_triggers(conn)
+    conn.execute("INSERT INTO contacts_fts (contacts_fts) VALUES ('rebuild')")
+
+
+def _renormalize_phones(conn: sqlite3.Connection) -> None:
+    """
+    Пересчитывает phone_norm в формате E.164
+
+    Уникальный индекс на время пересчета удаляется, иначе промежуточные
+    значения могли бы временно совпасть
+    """
+    conn.execute("DROP INDEX ux_contacts_user_phone")
+    _fill_phone_norm(conn)
+    conn.execute(
+        "CREATE UNIQUE INDEX ux_contacts_user_phone ON contacts (user_id, phone_norm)"
+    )
+
+
+def _add_contacts_fuzzy(conn: sqlite3.Connection) -> None:
+    """
+    Создает индекс нечеткого поиска contacts_fuzzy и заполняет его
+
+    Строки индекса (триграммы и фонетические ключи имени) вычисляются в Python
+    и добавляются DatabaseManager при каждой записи контакта. Удаление контакта
+    и изменение имени очищают его строки триггерами, так что изменения в обход
+    менеджера не оставляют в индексе устаревших токенов
+    """
+    conn.execute(
+        """CREATE TABLE contacts_fuzzy (
+                        user_id INTEGER NOT NULL,
+                        token TEXT NOT NULL,
+                        contact_id INTEGER NOT NULL,
+                        PRIMARY KEY (user_id, token, contact_id)) WITHOUT ROWID"""
+    )
+    conn.execute(
+        "CREATE INDEX idx_contacts_fuzzy_contact ON contacts_fuzzy (contact_id)"
+    )
+    conn.execute(
+        """CREATE TRIGGER contacts_fuzzy_delete AFTER DELETE ON contacts BEGIN
+               DELETE FROM contacts_fuzzy WHERE contact_id = old.id;
+           END"""
+    )
+    conn.execute(
+        """CREATE TRIGGER contacts_fuzzy_update
+           AFTER UPDATE OF user_id, first_name, last_name ON contacts BEGIN
+               DELETE FROM contacts_fuzzy WHERE contact_id = old.id;
+           END"""
+    )
+    rows = conn.execute("SELECT id, user_id, first_name, last_name FROM contacts")
+    conn.executemany(
+        "INSERT INTO contacts_fuzzy (user_id, token, contact_id) VALUES (?, ?, ?)",
+        index_rows(rows),
+    )
+
+
+def _add_sessions(conn: sqlite3.Connection) -> None:
+    """
+    Создает таблицу sessions для токенов входа
+
+    Хранится только SHA-256 токена, поэтому утечка файла базы не дает
+    готовых токенов. Индекс по expires_at нужен для удаления истекших сессий
+    """
+    conn.execute(
+        """CREATE TABLE sessions (
+                        token_hash TEXT PRIMARY KEY,
+                        user_id INTEGER NOT NULL,
+                        expires_at REAL NOT NULL)"""
+    )
+    conn.execute("CREATE INDEX idx_sessions_expires ON sessions (expires_at)")
+
+
+def _add_user_shards(conn: sqlite3.Connection) -> None:
+    """
+    Создает таблицу user_shards с размещением пользователей по шардам
+
+    Используется только в базе-каталоге шардированного хранилища (shards.py),
+    в обычной базе таблица остается пустой
+    """
+    conn.execute(
+        """CREATE TABLE user_shards (
+                        user_id INTEGER PRIMARY KEY,
+                        shard TEXT NOT NULL)"""
+    )
+
+
+def _add_contact_changes(conn: sqlite3.Connection) -> None:
+    """
+    Создает журнал изменений contact_changes, заполняемый триггерами
+
+    Каждая вставка, изменение и удаление контакта добавляет запись с номером seq.
+    AUTOINCREMENT гарантирует, что номера только растут и не переиспользуются
+    после сжатия журнала. Значения полей не копируются: при чтении журнала
+    текущая строка контакта берется из contacts. Если в базе уже есть контакты,
+    их вставки в журнале нет, поэтому граница журнала change_log_state.horizon
+    ставится в 1, и читатель с нулевой позиции должен загрузить контакты целиком
+    """
+    conn.execute(
+        """CREATE TABLE contact_changes (
+                        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                        contact_id INTEGER NOT NULL,
+                        user_id INTEGER NOT NULL,
+                        op TEXT NOT NULL)"""
+    )
+    conn.execute(
+        "CREATE INDEX idx_contact_changes_user ON contact_changes (user_id, seq)"
+    )
+    conn.execute(
+        "CREATE INDEX idx_contact_changes_contact ON contact_changes (contact_id, seq)"
+    )
+    conn.execute(
+        """CREATE TABLE change_log_state (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        horizon INTEGER NOT NULL)"""
+    )
+    has_contacts = conn.execute("SELECT 1 FROM contacts LIMIT 1").fetchone()
+    horizon = 1 if has_contacts else 0
+    conn.execute("INSERT INTO change_log_state (id, horizon) VALUES (1, ?)", (horizon,))
+    conn.execute(
+        "INSERT INTO sqlite_sequence (name, seq) VALUES ('contact_changes', ?)",
+        (horizon,),
+    )
+    conn.execute(
+        """CREATE TRIGGER contact_changes_insert AFTER INSERT ON contacts BEGIN
+               INSERT INTO contact_changes (contact_id, user_id, op)
+               VALUES (new.id, new.user_id, 'insert');
+           END"""
+    )
+    conn.execute(
+        """CREATE TRIGGER contact_changes_update
+           AFTER UPDATE OF user_id, first_name, last_name, phone, email ON contacts BEGIN
+               INSERT INTO contact_changes (contact_id, user_id, op)
+               VALUES (new.id, new.user_id, 'update');
+           END"""
+    )
+    conn.execute(
+        """CREATE TRIGGER contact_changes_delete AFTER DELETE ON contacts BEGIN
+               INSERT INTO contact_changes (contact_id, user_id, op)
+               VALUES (old.id, old.user_id, 'delete');
+           END"""
+    )
+
+
+def _add_contact_id_counters(conn: sqlite3.Connection) -> None:
+    """
+    Создает таблицу contact_id_counters с последним выданным id контакта пользователя
+
+    Используется в шардах (shards.py), где id контакта выдается в диапазоне
+    владельца: счетчик только растет, поэтому id удаленного контакта не выдается
+    повторно. Счетчики заполняются по уже существующим контактам
+    """
+    conn.execute(
+        """CREATE TABLE contact_id_counters (
+                        user_id INTEGER PRIMARY KEY,
+                        last_id INTEGER NOT NULL)"""
+    )
+    conn.execute(
+        """INSERT INTO contact_id_counters (user_id, last_id)
+           SELECT user_id, MAX(id) FROM contacts GROUP BY user_id"""
+    )
+
+
+MIGRATIONS: list[tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "таблицы users и contacts", _create_base_tables),
+    (2, "нормализованный телефон и индексы contacts", _add_contact_indexes),
+    (3, "полнотекстовый индекс contacts_fts", _add_contacts_fts),
+    (4, "phone_norm в формате E.164", _renormalize_phones),
+    (5, "индекс нечеткого поиска contacts_fuzzy", _add_contacts_fuzzy),
+    (6, "таблица сессий sessions", _add_sessions),
+    (7, "размещение пользователей по шардам user_shards", _add_user_shards),
+    (8, "журнал изменений контактов contact_changes", _add_contact_changes),
+    (9, "счетчики id контактов contact_id_counters", _add_contact_id_counters),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    """
+    Возвращает текущую версию схемы базы данных
+
+    Args:
+        conn (sqlite3.Connection): Соединение с базой данных
+
+    Returns:
+        int: Значение PRAGMA user_version
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Применяет все миграции новее текущей версии схемы
+
+    Args:
+        conn (sqlite3.Connection): Соединение с базой данных
+
+    Returns:
+        int: Версия схемы после применения миграций
+    """
+    version = get_version(conn)
+    if version >= SCHEMA_VERSION:
+        return version
+    for target, _description, apply in MIGRATIONS:
+        if target <= version:
+            continue
+        conn.commit()
+        conn.execute("BEGIN")
+        try:
+            apply(conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        version = target
+    return version
@@ -0,0 +1,108 @@
+import sqlite3
+
+"""Именованные профили настроек SQLite
+
+Профиль - набор PRAGMA, которые выставляются на каждом новом соединении
+до применения миграций:
+
+durable - WAL и synchronous=FULL: каждая зафиксированная транзакция
+    переживает отключение питания, кэш и прочее по умолчанию SQLite
+balanced - WAL и synchronous=NORMAL: при сбое питания можно потерять
+    последние транзакции, но не целостность базы; кэш 64 МБ, чтение через
+    mmap до 256 МБ, временные таблицы и сортировки в памяти
+bulk-load - для массовой загрузки и перестройки индексов: synchronous=OFF,
+    журнал отката в памяти, кэш 256 МБ, mmap до 1 ГБ, страница 8 КБ. Сбой
+    посреди загрузки может повредить базу, поэтому грузить стоит в новый
+    файл или в копию. Профиль выбирается только в importer.py и при
+    восстановлении снимка (snapshot.py), интерактивной консоли он недоступен
+
+page_size меняется только у новой, еще пустой базы. Соединения пула
+ConnectionPool всегда работают в WAL, поэтому journal_mode профиля
+к ним не применяется, а соединения только для чтения получают лишь
+настройки чтения: cache_size, mmap_size и temp_store"""
+
+PROFILES: dict[str, dict[str, str | int]] = {
+    "durable": {
+        "page_size": 4096,
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+    "balanced": {
+        "page_size": 4096,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64 * 1024,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    "bulk-load": {
+        "page_size": 8192,
+        "journal_mode": "MEMORY",
+        "synchronous": "OFF",
+        "cache_size": -256 * 1024,
+        "mmap_size": 1024 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+READ_PRAGMAS = ("cache_size", "mmap_size", "temp_store")
+INTERACTIVE_PROFILES = ("durable", "balanced")
+
+
+def check_profile(name: str | None) -> None:
+    """
+    Проверяет имя профиля
+
+    Args:
+        name (str | None): Имя профиля, None - настройки SQLite по умолчанию
+    """
+    if name is not None and name not in PROFILES:
+        raise ValueError(
+            f"Неизвестный профиль SQLite: {name}, доступны: {', '.join(PROFILES)}"
+        )
+
+
+def apply_profile(
+    conn: sqlite3.Connection,
+    name: str,
+    journal: bool = True,
+    read_only: bool = False,
+) -> None:
+    """
+    Выставляет PRAGMA профиля на соединении
+
+    Args:
+        conn (sqlite3.Connection): Соединение с базой данных
+        name (str): Имя профиля
+        journal (bool): Менять ли journal_mode. По умолчанию True
+        read_only (bool): Соединение только для чтения: выставляются лишь
+            настройки чтения. По умолчанию False
+    """
+    check_profile(name)
+    for pragma, value in PROFILES[name].items():
+        if read_only and pragma not in READ_PRAGMAS:
+            continue
+        if pragma == "journal_mode" and not journal:
+            continue
+        if pragma == "page_size" and conn.execute("PRAGMA page_count").fetchone()[0]:
+            continue
+        conn.execute(f"PRAGMA {pragma}={value}")
+
+
+def current_pragmas(conn: sqlite3.Connection) -> dict[str, str | int]:
+    """
+    Возвращает текущие значения PRAGMA, которыми управляют профили
+
+    Args:
+        conn (sqlite3.Connection): Соединение с базой данных
+
+    Returns:
+        dict[str, str | int]: Значения по именам PRAGMA
+    """
+    return {
+        pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+        for pragma in PROFILES["durable"]
+    }
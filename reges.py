@@ -1,4 +1,57 @@
 import re
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import NamedTuple
+
+PATTERNS = {
+    "EMAIL_REGEX": r"([A-Za-z0-9]+[._-])*[A-Za-z0-9]+@[A-Za-z0-9-]+(\.[A-Za-z]{2,})+",
+    "PHONE_REGEX": r"((8|\+7)[\- ]?)?(\(?\d{3,4}\)?[\- ]?)?[\d\- ]{5,10}",
+    "PHONE_CHARS_REGEX": r"[\d\-+() ]*",
+    "NON_DIGITS_REGEX": r"\D",
+}
+
+DEFAULT_COUNTRY_CODE = "7"
+
+
+@lru_cache(maxsize=None)
+def _regex(name: str) -> re.Pattern:
+    """
+    Компилирует регулярное выражение из PATTERNS при первом обращении
+
+    Импорт модуля не компилирует выражения, поэтому запуск консольного
+    приложения не платит за валидаторы, которые в сессии не понадобятся
+
+    Parametrs:
+                name(str) Имя выражения, например "EMAIL_REGEX"
+
+    Returns:
+            re.Pattern: Скомпилированное выражение
+    """
+    return re.compile(PATTERNS[name])
+
+
+def __getattr__(name: str) -> re.Pattern:
+    """Возвращает EMAIL_REGEX и другие выражения из PATTERNS как атрибуты модуля"""
+    if name in PATTERNS:
+        return _regex(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class ValidationResult(NamedTuple):
+    """
+    Результат проверки одного значения
+
+    Attributes:
+        value (str): Проверяемое значение
+        valid (bool): True, если значение допустимо
+        reason (str | None): Причина отказа или None для допустимого значения
+        normalized (str | None): Нормализованное значение (E.164 для телефонов)
+    """
+
+    value: str
+    valid: bool
+    reason: str | None
+    normalized: str | None
 
 
 def isValidEmail(email: str) -> bool:
@@ -13,10 +66,7 @@ def isValidEmail(email: str) -> bool:
     Returns:
             Возвращает True,если адрес электронной почты допустимый,иначе False
     """
-    regex = re.compile(
-        r"([A-Za-z0-9]+[.-_])*[A-Za-z0-9]+@[A-Za-z0-9-]+(\.[A-Z|a-z]{2,})+"
-    )
-    return bool(re.fullmatch(regex, email))
+    return _regex("EMAIL_REGEX").fullmatch(email) is not None
 
 
 def isValidPhone(phone: str) -> bool:
@@ -29,9 +79,102 @@ def isValidPhone(phone: str) -> bool:
     Returns:
             bool:True, если номер телефона имеет корректный формат, иначе False
     """
-    regex = re.compile(r"^((8|\+7)[\- ]?)?(\(?\d{3,4}\)?[\- ]?)?[\d\- ]{5,10}$")
+    return _regex("PHONE_REGEX").fullmatch(phone) is not None
 
-    return bool(re.fullmatch(regex, phone))
 
+def normalize_phone(phone: str, country_code: str = DEFAULT_COUNTRY_CODE) -> str | None:
+    """
+    Приводит номер телефона к формату E.164 для поиска дубликатов
+
+    "8 (912) 345-67-89", "+7 912 345 67 89" и "9123456789" дают "+79123456789".
+    Короткие местные номера без кода города перевести в E.164 нельзя,
+    для них возвращаются только цифры
+
+    Parametrs:
+                phone(str) Номер телефона
+                country_code(str) Код страны для номеров без него. По умолчанию "7"
 
+    Returns:
+            str | None: Нормализованный номер или None, если в номере нет цифр
+    """
+    digits = _regex("NON_DIGITS_REGEX").sub("", phone or "")
+    if not digits:
+        return None
+    if phone.lstrip().startswith("+"):
+        return "+" + digits
+    if len(digits) == 11 and digits[0] in "78":
+        return f"+{country_code}{digits[1:]}"
+    if len(digits) == 10:
+        return f"+{country_code}{digits}"
+    return digits
 
+
+def normalize_email(email: str | None) -> str | None:
+    """
+    Приводит адрес электронной почты к виду для поиска дубликатов
+
+    Parametrs:
+                email(str | None) Адрес электронной почты
+
+    Returns:
+            str | None: Адрес без пробелов в нижнем регистре или None, если адрес пуст
+    """
+    email = (email or "").strip().lower()
+    return email or None
+
+
+def validate_phones(phones: Iterable[str]) -> list[ValidationResult]:
+    """
+    Проверяет пачку номеров телефонов
+
+    Методы регулярных выражений связываются с локальными именами
+    один раз на пачку, а не на каждое значение
+
+    Parametrs:
+                phones(Iterable[str]) Номера телефонов
+
+    Returns:
+            list[ValidationResult]: Результат для каждого номера в исходном порядке
+    """
+    fullmatch = _regex("PHONE_REGEX").fullmatch
+    chars_fullmatch = _regex("PHONE_CHARS_REGEX").fullmatch
+    normalize = normalize_phone
+    results = []
+    append = results.append
+    for phone in phones:
+        if fullmatch(phone):
+            append(ValidationResult(phone, True, None, normalize(phone)))
+        elif not phone:
+            append(ValidationResult(phone, False, "пустой номер телефона", None))
+        elif not chars_fullmatch(phone):
+            append(
+                ValidationResult(phone, False, "недопустимые символы в номере", None)
+            )
+        else:
+            append(ValidationResult(phone, False, "неверный формат номера", None))
+    return results
+
+
+def validate_emails(emails: Iterable[str]) -> list[ValidationResult]:
+    """
+    Проверяет пачку адресов электронной почты
+
+    Parametrs:
+                emails(Iterable[str]) Адреса электронной почты
+
+    Returns:
+            list[ValidationResult]: Результат для каждого адреса в исходном порядке
+    """
+    fullmatch = _regex("EMAIL_REGEX").fullmatch
+    results = []
+    append = results.append
+    for email in emails:
+        if fullmatch(email):
+            append(ValidationResult(email, True, None, email.lower()))
+        elif not email:
+            append(ValidationResult(email, False, "пустой email", None))
+        elif "@" not in email:
+            append(ValidationResult(email, False, "в email нет символа @", None))
+        else:
+            append(ValidationResult(email, False, "неверный формат email", None))
+    return results
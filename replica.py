@@ -0,0 +1,430 @@
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+from db import DatabaseManager
+from db import read_only_uri
+from schemas.contacts import Contact
+
+"""Режим чтения с реплики: чтения контактов не конкурируют с записью в основную базу
+
+Реплика - отдельный файл SQLite рядом с основной базой (<база>.replica).
+Первый раз она создается целиком через sqlite3 backup API, дальше догоняет
+основную базу по журналу изменений contact_changes (см. changes.py): за одну
+синхронизацию в одном снимке основной базы читаются новые записи журнала
+и текущие строки затронутых контактов, а в реплике эти контакты удаляются
+и вставляются заново одной транзакцией. Поэтому реплика всегда совпадает
+с основной базой на некоторой позиции журнала, а читатели видят состояние
+до синхронизации или после нее, но не промежуточное.
+
+Чтения контактов выполняются через пул соединений только для чтения к реплике,
+остальные операции - с основной базой. Отставание ограничено: фоновый поток
+синхронизирует реплику каждые sync_interval секунд, а чтение, заставшее реплику
+старше max_staleness секунд, сначала синхронизирует ее само"""
+
+REPLICA_SUFFIX = ".replica"
+DEFAULT_MAX_STALENESS = 1.0
+DEFAULT_SYNC_INTERVAL = 0.2
+SYNC_CHUNK_SIZE = 500
+
+CONTACT_ROW_COLUMNS = "id, user_id, first_name, last_name, phone, phone_norm, email"
+
+
+class ReadReplica:
+    """
+    Этот класс поддерживает файл-реплику основной базы и пул читателей к нему
+
+    Основная база читается через собственное соединение только для чтения
+    (mode=ro), поэтому реплика не меняет режим журнала основной базы и не
+    применяет к ней миграции, а синхронизировать ее можно из любого потока,
+    не трогая соединения приложения. Соединение защищено блокировкой синхронизации
+
+    Attributes:
+        path (str): Имя файла реплики
+        reader (DatabaseManager): Менеджер реплики с пулом соединений только для чтения
+        seq (int): Позиция журнала основной базы, на которой находится реплика
+        synced_at (float): Время (time.time()), на которое реплика совпадала с основной базой
+        snapshots (int): Сколько раз реплика копировалась целиком
+    """
+
+    def __init__(
+        self,
+        primary_name: str,
+        path: str,
+        pool_size: int = 4,
+        search_mode: str = "like",
+        busy_timeout: float = 5.0,
+    ) -> None:
+        """
+        Открывает реплику, создавая ее копированием основной базы, если файла еще нет
+
+        Основная база уже должна быть создана и приведена к последней версии схемы
+
+        Args:
+            primary_name (str): Имя файла основной базы
+            path (str): Имя файла реплики
+            pool_size (int): Количество соединений читателей. По умолчанию 4
+            search_mode (str): Способ поиска контактов на реплике. По умолчанию "like"
+            busy_timeout (float): Время ожидания блокировки базы в секундах. По умолчанию 5.0
+        """
+        self.path = path
+        self.snapshots = 0
+        self._source = sqlite3.connect(
+            read_only_uri(primary_name),
+            timeout=busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+            uri=True,
+        )
+        self._sync_lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        state = self._read_state()
+        if state is None:
+            self._snapshot()
+        else:
+            self.seq, self.synced_at = state
+        self._writer = DatabaseManager(path, pool_size=1, busy_timeout=busy_timeout)
+        self.reader = DatabaseManager(
+            path,
+            search_mode=search_mode,
+            pool_size=pool_size,
+            busy_timeout=busy_timeout,
+            read_only=True,
+        )
+
+    def _read_state(self) -> tuple[int, float] | None:
+        """Возвращает позицию и время реплики из ее файла или None, если реплики нет"""
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute("SELECT seq, synced_at FROM replica_state").fetchone()
+        except sqlite3.OperationalError:
+            return None
+        finally:
+            conn.close()
+
+    def _snapshot(self) -> None:
+        """
+        Копирует основную базу в реплику целиком через backup API
+
+        Позиция журнала читается до копирования: изменения, попавшие в копию
+        после этой позиции, будут применены повторно, что безопасно.
+        Триггеры журнала в реплике удаляются - она сама журнал не ведет
+        """
+        synced_at = time.time()
+        seq = self._change_seq()
+        dest = sqlite3.connect(self.path)
+        try:
+            self._source.backup(dest)
+            triggers = dest.execute(
+                "SELECT name FROM sqlite_master WHERE type='trigger' AND name LIKE 'contact_changes_%'"
+            ).fetchall()
+            for (name,) in triggers:
+                dest.execute(f"DROP TRIGGER {name}")
+            dest.execute("DELETE FROM contact_changes")
+            dest.execute(
+                """CREATE TABLE IF NOT EXISTS replica_state (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        seq INTEGER NOT NULL,
+                        synced_at REAL NOT NULL)"""
+            )
+            dest.execute(
+                "INSERT OR REPLACE INTO replica_state (id, seq, synced_at) VALUES (1, ?, ?)",
+                (seq, synced_at),
+            )
+            dest.commit()
+            dest.execute("PRAGMA journal_mode=WAL")
+        finally:
+            dest.close()
+        self.seq = seq
+        self.synced_at = synced_at
+        self.snapshots += 1
+
+    def sync(self) -> int:
+        """
+        Догоняет основную базу по журналу изменений
+
+        Журнал и строки контактов читаются в одной транзакции чтения, то есть
+        из одного снимка основной базы. Если журнал сжат дальше позиции реплики,
+        реплика копируется целиком
+
+        Returns:
+            int: Количество примененных записей журнала
+        """
+        with self._sync_lock:
+            synced_at = time.time()
+            conn = self._source
+            conn.execute("BEGIN")
+            try:
+                (horizon,) = conn.execute(
+                    "SELECT horizon FROM change_log_state"
+                ).fetchone()
+                if self.seq < horizon:
+                    conn.rollback()
+                    self._snapshot()
+                    return 0
+                seq = self._change_seq()
+                contact_ids = set()
+                applied = 0
+                for (contact_id,) in conn.execute(
+                    "SELECT contact_id FROM contact_changes WHERE seq > ? ORDER BY seq",
+                    (self.seq,),
+                ):
+                    contact_ids.add(contact_id)
+                    applied += 1
+                rows = self._read_rows(list(contact_ids))
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+            if contact_ids:
+                self._apply(contact_ids, rows, seq, synced_at)
+            self.seq = seq
+            self.synced_at = synced_at
+            return applied
+
+    def _change_seq(self) -> int:
+        """Возвращает номер последней записи журнала основной базы, вызывается под _sync_lock"""
+        row = self._source.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name='contact_changes'"
+        ).fetchone()
+        return 0 if row is None else row[0]
+
+    def _read_rows(self, contact_ids: list[int]) -> list[tuple]:
+        """
+        Читает текущие строки контактов основной базы, удаленных среди них не будет
+
+        Строка берется по id: если id удаленного контакта уже достался контакту
+        другого пользователя, в реплику попадает именно он, как и в основной базе
+        """
+        rows = []
+        for start in range(0, len(contact_ids), SYNC_CHUNK_SIZE):
+            chunk = contact_ids[start : start + SYNC_CHUNK_SIZE]
+            rows += self._source.execute(
+                f"SELECT {CONTACT_ROW_COLUMNS} FROM contacts WHERE id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+        return rows
+
+    def _apply(
+        self, contact_ids: set[int], rows: list[tuple], seq: int, synced_at: float
+    ) -> None:
+        """
+        Заменяет затронутые контакты реплики их строками из основной базы
+
+        Сначала удаляются все затронутые контакты, затем вставляются их новые
+        версии: так обмен телефонами между контактами не нарушает уникальность
+        (user_id, phone_norm) посреди транзакции. Индексы FTS и нечеткого поиска
+        реплики обновляются триггерами и _index_fuzzy, как в основной базе
+        """
+        writer = self._writer
+        try:
+            with writer.transaction():
+                writer.cur.executemany(
+                    "DELETE FROM contacts WHERE id=?", ((i,) for i in contact_ids)
+                )
+                writer.cur.executemany(
+                    f"INSERT INTO contacts ({CONTACT_ROW_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                writer._index_fuzzy(row[:4] for row in rows)
+                writer.cur.execute(
+                    "UPDATE replica_state SET seq=?, synced_at=?", (seq, synced_at)
+                )
+        finally:
+            writer.release_connection()
+
+    def refresh(self, max_staleness: float) -> None:
+        """
+        Синхронизирует реплику, если она отстала больше чем на max_staleness секунд
+
+        Потоки, одновременно заставшие реплику устаревшей, синхронизируют ее один раз
+
+        Args:
+            max_staleness (float): Допустимое отставание в секундах
+        """
+        if self.staleness() <= max_staleness:
+            return
+        with self._sync_lock:
+            if self.staleness() > max_staleness:
+                self.sync()
+
+    def staleness(self) -> float:
+        """Возвращает, сколько секунд назад реплика последний раз совпадала с основной базой"""
+        return time.time() - self.synced_at
+
+    def lag(self) -> dict[str, float]:
+        """
+        Возвращает отставание реплики от основной базы
+
+        Returns:
+            dict[str, float]: changes - сколько записей журнала еще не применено,
+                seconds - сколько секунд назад реплика совпадала с основной базой
+        """
+        with self._sync_lock:
+            primary_seq = self._change_seq()
+            return {
+                "changes": primary_seq - self.seq,
+                "seconds": self.staleness(),
+            }
+
+    def start(self, interval: float = DEFAULT_SYNC_INTERVAL) -> None:
+        """
+        Запускает фоновую синхронизацию реплики
+
+        Args:
+            interval (float): Пауза между синхронизациями в секундах. По умолчанию 0.2
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="replica-sync", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, interval: float) -> None:
+        """Синхронизирует реплику, пока не вызван stop()"""
+        while not self._stop.wait(interval):
+            try:
+                self.sync()
+            except sqlite3.OperationalError:
+                # база занята дольше busy_timeout - попробуем в следующий раз
+                continue
+
+    def stop(self) -> None:
+        """Останавливает фоновую синхронизацию"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def close(self) -> None:
+        """Останавливает синхронизацию и закрывает все соединения реплики"""
+        self.stop()
+        self.reader.close_connection()
+        self._writer.close_connection()
+        self._source.close()
+
+
+class ReplicatedDatabaseManager(DatabaseManager):
+    """
+    Этот класс направляет чтения контактов на реплику, а остальное - в основную базу
+
+    Чтения могут отставать от записей не больше чем на max_staleness секунд,
+    в том числе собственные записи менеджера. Проверки перед записью
+    (check_duplicate_phone, get_phones), пользователи и сессии всегда читаются
+    из основной базы
+
+    Attributes:
+        replica (ReadReplica): Реплика с пулом читателей
+        max_staleness (float): Допустимое отставание реплики в секундах
+    """
+
+    def __init__(
+        self,
+        db_name: str,
+        replica_path: str | None = None,
+        replica_pool_size: int = 4,
+        max_staleness: float = DEFAULT_MAX_STALENESS,
+        sync_interval: float | None = DEFAULT_SYNC_INTERVAL,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Инициализирует менеджер и открывает реплику
+
+        Args:
+            db_name (str): Имя файла основной базы
+            replica_path (str | None): Имя файла реплики. По умолчанию <db_name>.replica
+            replica_pool_size (int): Количество соединений читателей реплики. По умолчанию 4
+            max_staleness (float): Допустимое отставание реплики в секундах, 0 - синхронизировать
+                перед каждым чтением. По умолчанию 1.0
+            sync_interval (float | None): Пауза фоновой синхронизации в секундах,
+                None - без фонового потока. По умолчанию 0.2
+            **kwargs: Остальные параметры DatabaseManager
+        """
+        super().__init__(db_name, **kwargs)
+        # Реплика читает основную базу только на чтение, поэтому база
+        # создается и мигрирует здесь, до открытия реплики
+        self._open()
+        self.replica = ReadReplica(
+            db_name,
+            replica_path or db_name + REPLICA_SUFFIX,
+            replica_pool_size,
+            self.search_mode,
+            kwargs.get("busy_timeout", 5.0),
+        )
+        self.max_staleness = max_staleness
+        if sync_interval is not None:
+            self.replica.start(sync_interval)
+
+    def _reader(self) -> DatabaseManager:
+        """Возвращает менеджер реплики, синхронизируя ее, если она отстала больше допустимого"""
+        self._flush_pending()
+        self.replica.refresh(self.max_staleness)
+        return self.replica.reader
+
+    def replica_lag(self) -> dict[str, float]:
+        """
+        Возвращает отставание реплики от основной базы
+
+        Returns:
+            dict[str, float]: changes - непримененные записи журнала, seconds - возраст реплики
+        """
+        return self.replica.lag()
+
+    def search_contacts(
+        self, user_id: int, query: str, limit: int | None = None
+    ) -> list[Contact]:
+        """Ищет контакты пользователя на реплике"""
+        return self._reader().search_contacts(user_id, query, limit)
+
+    def fuzzy_search(
+        self, user_id: int, query: str, **kwargs: Any
+    ) -> list[tuple[Contact, float]]:
+        """Нечетко ищет контакты пользователя на реплике"""
+        return self._reader().fuzzy_search(user_id, query, **kwargs)
+
+    def get_contact_details(self, contact_id: int) -> Contact | None:
+        """Возвращает контакт с реплики"""
+        return self._reader().get_contact_details(contact_id)
+
+    def get_contacts(self, user_id: int) -> list[Contact]:
+        """Возвращает все контакты пользователя с реплики"""
+        return self._reader().get_contacts(user_id)
+
+    def get_contacts_page(
+        self,
+        user_id: int,
+        page_size: int = 50,
+        after_id: int | None = None,
+        before_id: int | None = None,
+    ) -> list[Contact]:
+        """Возвращает страницу контактов пользователя с реплики"""
+        return self._reader().get_contacts_page(user_id, page_size, after_id, before_id)
+
+    def iter_contacts(self, user_id: int, page_size: int = 500) -> Iterator[Contact]:
+        """Постранично перебирает контакты пользователя на реплике"""
+        return self._reader().iter_contacts(user_id, page_size)
+
+    def iter_search_contacts(
+        self, user_id: int, query: str, page_size: int = 500
+    ) -> Iterator[Contact]:
+        """Потоково ищет контакты пользователя на реплике"""
+        return self._reader().iter_search_contacts(user_id, query, page_size)
+
+    def iter_all_contacts(self, chunk_size: int = 10000) -> Iterator[Contact]:
+        """Потоково перебирает контакты всех пользователей на реплике"""
+        return self._reader().iter_all_contacts(chunk_size)
+
+    def release_connection(self) -> None:
+        """Возвращает в пулы соединения текущего потока с основной базой и репликой"""
+        super().release_connection()
+        self.replica.reader.release_connection()
+
+    def close_connection(self) -> None:
+        """Останавливает синхронизацию и закрывает соединения с репликой и основной базой"""
+        self.replica.close()
+        super().close_connection()
@@ -0,0 +1,474 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+from abc import ABC
+from abc import abstractmethod
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+
+from db import read_only_uri
+from reges import isValidEmail
+from reges import normalize_email
+from schemas.contacts import Contact
+
+"""Параллельный просмотр контактов с произвольными условиями
+
+search_contacts умеет только LIKE по четырем полям. Для дорогих проверок -
+регулярных выражений, префикса нормализованного номера, правил по домену
+почты - таблица contacts делится на диапазоны rowid, и каждый диапазон
+проверяется в отдельном процессе пула. Процесс открывает собственное
+соединение только для чтения и возвращает подходящие строки, а результаты
+диапазонов склеиваются по порядку, поэтому контакты идут по возрастанию id.
+
+Условия задаются объектами-спецификациями (FieldRegex, PhonePrefix,
+EmailDomain и их комбинации AllOf, AnyOf, Not), а не функциями: их можно
+передать в другой процесс через pickle.
+
+Диапазоны читаются разными транзакциями, поэтому при параллельной записи
+результат не является снимком базы на один момент.
+
+Пример запуска:
+    python -m scan --db contacts.db --user-id 1 --regex last_name=ов$ --workers 4"""
+
+ROW_COLUMNS = "id, user_id, first_name, last_name, phone, phone_norm, email"
+ROW_FIELDS = {name: i for i, name in enumerate(ROW_COLUMNS.split(", "))}
+DEFAULT_CHUNK_SIZE = 50_000
+BATCH_SIZE = 5000
+
+_worker_conn: sqlite3.Connection | None = None
+
+
+class Predicate(ABC):
+    """
+    Условие отбора строк контактов
+
+    Строка - кортеж (id, user_id, first_name, last_name, phone, phone_norm, email).
+    Наследники реализуют matches(), а filter() проверяет сразу пачку строк
+    """
+
+    @abstractmethod
+    def matches(self, row: tuple) -> bool:
+        """Возвращает True, если строка подходит под условие"""
+
+    def filter(self, rows: list[tuple]) -> list[tuple]:
+        """
+        Отбирает подходящие строки из пачки
+
+        Args:
+            rows (list[tuple]): Строки контактов
+
+        Returns:
+            list[tuple]: Подходящие строки в исходном порядке
+        """
+        matches = self.matches
+        return [row for row in rows if matches(row)]
+
+
+class FieldRegex(Predicate):
+    """
+    Поле контакта содержит совпадение с регулярным выражением (re.search)
+
+    Attributes:
+        field (str): Имя поля: first_name, last_name, phone, phone_norm или email
+        pattern (re.Pattern): Регулярное выражение
+    """
+
+    def __init__(self, field: str, pattern: str, flags: int = re.IGNORECASE):
+        """
+        Инициализирует условие
+
+        Args:
+            field (str): Имя поля
+            pattern (str): Регулярное выражение
+            flags (int): Флаги re. По умолчанию re.IGNORECASE
+        """
+        if field not in ROW_FIELDS:
+            raise ValueError(f"Неизвестное поле контакта: {field}")
+        self.field = field
+        self.pattern = re.compile(pattern, flags)
+
+    def matches(self, row: tuple) -> bool:
+        """Ищет выражение в значении поля, пустое поле не подходит"""
+        value = row[ROW_FIELDS[self.field]]
+        return value is not None and self.pattern.search(str(value)) is not None
+
+    def filter(self, rows: list[tuple]) -> list[tuple]:
+        """Отбирает строки пачки, связывая поиск и номер поля один раз"""
+        search = self.pattern.search
+        index = ROW_FIELDS[self.field]
+        return [
+            row
+            for row in rows
+            if row[index] is not None and search(str(row[index])) is not None
+        ]
+
+
+class PhonePrefix(Predicate):
+    """
+    Нормализованный номер (phone_norm) начинается с префикса
+
+    Префикс приводится к тому же виду, что и номера: "8912", "+7 912"
+    и "7912" дают "+7912", поэтому номер в любой записи найдется одинаково.
+    Префикс должен начинаться с кода страны или с 8
+
+    Attributes:
+        prefix (str): Нормализованный префикс
+    """
+
+    def __init__(self, prefix: str):
+        """
+        Инициализирует условие
+
+        Args:
+            prefix (str): Начало номера телефона в любой записи
+        """
+        digits = re.sub(r"\D", "", prefix)
+        if not digits:
+            raise ValueError("В префиксе номера нет цифр")
+        if not prefix.lstrip().startswith("+") and digits[0] in "78":
+            digits = "7" + digits[1:]
+        self.prefix = "+" + digits
+
+    def matches(self, row: tuple) -> bool:
+        """Проверяет начало phone_norm"""
+        phone_norm = row[5]
+        return phone_norm is not None and phone_norm.startswith(self.prefix)
+
+
+class EmailDomain(Predicate):
+    """
+    Корректный адрес почты в одном из доменов
+
+    Адрес проверяется валидатором из reges.py, домен сравнивается без учета
+    регистра. С subdomains=True подходят и поддомены: mail.example.com
+    для домена example.com
+
+    Attributes:
+        domains (frozenset[str]): Домены в нижнем регистре
+        subdomains (bool): Учитывать ли поддомены
+    """
+
+    def __init__(self, *domains: str, subdomains: bool = True):
+        """
+        Инициализирует условие
+
+        Args:
+            *domains (str): Домены почты
+            subdomains (bool): Учитывать ли поддомены. По умолчанию True
+        """
+        if not domains:
+            raise ValueError("Не указан ни один домен")
+        self.domains = frozenset(domain.lower().lstrip("@") for domain in domains)
+        self.subdomains = subdomains
+
+    def matches(self, row: tuple) -> bool:
+        """Проверяет формат адреса и его домен"""
+        email = normalize_email(row[6])
+        if email is None or not isValidEmail(email):
+            return False
+        domain = email.rpartition("@")[2]
+        if domain in self.domains:
+            return True
+        if self.subdomains:
+            parts = domain.split(".")
+            return any(
+                ".".join(parts[i:]) in self.domains for i in range(1, len(parts))
+            )
+        return False
+
+
+class AllOf(Predicate):
+    """Все условия выполняются, проверка останавливается на первом невыполненном"""
+
+    def __init__(self, *predicates: Predicate):
+        """Инициализирует условие из вложенных условий"""
+        self.predicates = predicates
+
+    def matches(self, row: tuple) -> bool:
+        """Проверяет все вложенные условия"""
+        return all(predicate.matches(row) for predicate in self.predicates)
+
+    def filter(self, rows: list[tuple]) -> list[tuple]:
+        """Отбирает строки пачки, сужая ее каждым условием по очереди"""
+        for predicate in self.predicates:
+            rows = predicate.filter(rows)
+        return rows
+
+
+class AnyOf(Predicate):
+    """Выполняется хотя бы одно условие"""
+
+    def __init__(self, *predicates: Predicate):
+        """Инициализирует условие из вложенных условий"""
+        self.predicates = predicates
+
+    def matches(self, row: tuple) -> bool:
+        """Проверяет вложенные условия до первого выполненного"""
+        return any(predicate.matches(row) for predicate in self.predicates)
+
+
+class Not(Predicate):
+    """Условие не выполняется"""
+
+    def __init__(self, predicate: Predicate):
+        """Инициализирует отрицание условия"""
+        self.predicate = predicate
+
+    def matches(self, row: tuple) -> bool:
+        """Инвертирует вложенное условие"""
+        return not self.predicate.matches(row)
+
+
+def _scan_range(
+    conn: sqlite3.Connection,
+    predicate: Predicate,
+    low: int,
+    high: int,
+    user_id: int | None,
+) -> list[tuple]:
+    """
+    Проверяет контакты с id от low до high включительно
+
+    Args:
+        conn (sqlite3.Connection): Соединение с базой
+        predicate (Predicate): Условие отбора
+        low (int): Начало диапазона id
+        high (int): Конец диапазона id
+        user_id (int | None): Только контакты этого пользователя, None - все
+
+    Returns:
+        list[tuple]: Подходящие строки по возрастанию id
+    """
+    if user_id is None:
+        cur = conn.execute(
+            f"SELECT {ROW_COLUMNS} FROM contacts WHERE id BETWEEN ? AND ? ORDER BY id",
+            (low, high),
+        )
+    else:
+        cur = conn.execute(
+            f"SELECT {ROW_COLUMNS} FROM contacts WHERE user_id=? AND id BETWEEN ? AND ? ORDER BY id",
+            (user_id, low, high),
+        )
+    found = []
+    try:
+        while rows := cur.fetchmany(BATCH_SIZE):
+            found += predicate.filter(rows)
+    finally:
+        cur.close()
+    return found
+
+
+def _init_worker(db_name: str) -> None:
+    """Открывает соединение только для чтения в процессе пула"""
+    global _worker_conn
+    _worker_conn = sqlite3.connect(read_only_uri(db_name), uri=True)
+
+
+def _worker_scan(
+    predicate: Predicate, low: int, high: int, user_id: int | None
+) -> list[tuple]:
+    """Проверяет диапазон в процессе пула через его соединение"""
+    return _scan_range(_worker_conn, predicate, low, high, user_id)
+
+
+class ParallelScanner:
+    """
+    Этот класс проверяет контакты произвольным условием в нескольких процессах
+
+    Пул процессов создается при первом просмотре и переиспользуется
+    до вызова close()
+
+    Attributes:
+        db_name (str): Имя файла базы данных
+        workers (int): Количество процессов, 1 - проверка в текущем процессе
+        chunk_size (int): Сколько контактов попадает в один диапазон
+    """
+
+    def __init__(
+        self,
+        db_name: str,
+        workers: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """
+        Инициализирует просмотрщик, не запуская процессы
+
+        Args:
+            db_name (str): Имя файла базы данных
+            workers (int | None): Количество процессов. По умолчанию os.cpu_count()
+            chunk_size (int): Сколько контактов попадает в один диапазон. По умолчанию 50000
+        """
+        if chunk_size < 1:
+            raise ValueError("Размер диапазона должен быть положительным")
+        self.db_name = db_name
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._conn = sqlite3.connect(read_only_uri(db_name), uri=True)
+        self._executor: ProcessPoolExecutor | None = None
+
+    def partitions(self, user_id: int | None = None) -> list[tuple[int, int]]:
+        """
+        Делит контакты на диапазоны id примерно по chunk_size строк
+
+        Для всей таблицы диапазоны равной ширины строятся по MIN(id) и MAX(id).
+        Для одного пользователя границы берутся из индекса idx_contacts_user_id,
+        где его контакты уже упорядочены по id, так что все диапазоны
+        содержат ровно chunk_size его контактов, кроме последнего
+
+        Args:
+            user_id (int | None): Только контакты этого пользователя. По умолчанию все
+
+        Returns:
+            list[tuple[int, int]]: Диапазоны (low, high) включительно по возрастанию
+        """
+        if user_id is None:
+            low, high = self._conn.execute(
+                "SELECT MIN(id), MAX(id) FROM contacts"
+            ).fetchone()
+            if low is None:
+                return []
+            return [
+                (start, min(start + self.chunk_size - 1, high))
+                for start in range(low, high + 1, self.chunk_size)
+            ]
+        cur = self._conn.execute(
+            "SELECT id FROM contacts WHERE user_id=? ORDER BY id", (user_id,)
+        )
+        ranges = []
+        try:
+            while ids := cur.fetchmany(self.chunk_size):
+                ranges.append((ids[0][0], ids[-1][0]))
+        finally:
+            cur.close()
+        return ranges
+
+    def iter_scan(
+        self, predicate: Predicate, user_id: int | None = None
+    ) -> Iterator[Contact]:
+        """
+        Потоково возвращает подходящие контакты по возрастанию id
+
+        В работе одновременно не больше 2 * workers диапазонов, поэтому
+        остановка перебора на первых результатах не проверяет всю таблицу
+
+        Args:
+            predicate (Predicate): Условие отбора
+            user_id (int | None): Только контакты этого пользователя. По умолчанию все
+
+        Returns:
+            Iterator[Contact]: Подходящие контакты
+        """
+        ranges = self.partitions(user_id)
+        if self.workers == 1:
+            for low, high in ranges:
+                for row in _scan_range(self._conn, predicate, low, high, user_id):
+                    yield _contact(row)
+            return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self.workers, initializer=_init_worker, initargs=(self.db_name,)
+            )
+        pending: deque[Future] = deque()
+        ranges_iter = iter(ranges)
+        try:
+            while True:
+                for low, high in ranges_iter:
+                    pending.append(
+                        self._executor.submit(
+                            _worker_scan, predicate, low, high, user_id
+                        )
+                    )
+                    if len(pending) >= 2 * self.workers:
+                        break
+                if not pending:
+                    return
+                for row in pending.popleft().result():
+                    yield _contact(row)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def scan(
+        self, predicate: Predicate, user_id: int | None = None, limit: int | None = None
+    ) -> list[Contact]:
+        """
+        Возвращает подходящие контакты по возрастанию id
+
+        Args:
+            predicate (Predicate): Условие отбора
+            user_id (int | None): Только контакты этого пользователя. По умолчанию все
+            limit (int | None): Максимальное количество результатов. По умолчанию без ограничения
+
+        Returns:
+            list[Contact]: Подходящие контакты
+        """
+        found: list[Contact] = []
+        if limit is not None and limit <= 0:
+            return found
+        results = self.iter_scan(predicate, user_id)
+        try:
+            for contact in results:
+                found.append(contact)
+                if len(found) == limit:
+                    break
+        finally:
+            results.close()
+        return found
+
+    def close(self) -> None:
+        """Останавливает процессы пула и закрывает соединение"""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        self._conn.close()
+
+
+def _contact(row: tuple) -> Contact:
+    """Строит Contact из строки просмотра, пропуская phone_norm"""
+    return Contact(*row[:5], row[6])
+
+
+def parse_predicate(args: argparse.Namespace) -> Predicate:
+    """
+    Собирает условие из аргументов командной строки, все условия должны выполняться
+
+    Args:
+        args (argparse.Namespace): Аргументы командной строки
+
+    Returns:
+        Predicate: Условие отбора
+    """
+    predicates: list[Predicate] = []
+    for spec in args.regex:
+        field, _, pattern = spec.partition("=")
+        predicates.append(FieldRegex(field, pattern))
+    if args.phone_prefix:
+        predicates.append(PhonePrefix(args.phone_prefix))
+    if args.email_domain:
+        predicates.append(EmailDomain(*args.email_domain))
+    if not predicates:
+        raise ValueError("Не задано ни одного условия")
+    return predicates[0] if len(predicates) == 1 else AllOf(*predicates)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Параллельный просмотр контактов")
+    parser.add_argument("--db", default="./contacts.db")
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--regex", action="append", default=[], metavar="FIELD=PATTERN")
+    parser.add_argument("--phone-prefix")
+    parser.add_argument("--email-domain", nargs="+")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--limit", type=int)
+    args = parser.parse_args()
+
+    scanner = ParallelScanner(args.db, args.workers)
+    try:
+        for contact in scanner.scan(parse_predicate(args), args.user_id, args.limit):
+            print(json.dumps(contact.as_dict(), ensure_ascii=False))
+    finally:
+        scanner.close()
@@ -0,0 +1,60 @@
+import sqlite3
+
+from schemas.contacts import Contact
+
+
+class Change:
+    """
+    Запись журнала изменений контактов
+
+    Attributes:
+        seq (int): Номер записи, номера только растут
+        op (str): Операция: "insert", "update" или "delete"
+        contact_id (int): Идентификатор измененного контакта
+        user_id (int): Идентификатор владельца контакта
+        contact (Contact | None): Текущая строка контакта, None для удаления
+            и для контакта, удаленного после этой записи
+    """
+
+    __slots__ = ("seq", "op", "contact_id", "user_id", "contact")
+
+    def __init__(
+        self,
+        seq: int,
+        op: str,
+        contact_id: int,
+        user_id: int,
+        contact: Contact | None,
+    ) -> None:
+        """Инициализирует запись журнала"""
+        self.seq = seq
+        self.op = op
+        self.contact_id = contact_id
+        self.user_id = user_id
+        self.contact = contact
+
+    def __repr__(self) -> str:
+        """Возвращает строковое представление записи журнала"""
+        return (
+            f"Change(seq: {self.seq}, op: {self.op}, "
+            f"contact_id: {self.contact_id}, user_id: {self.user_id})"
+        )
+
+
+def change_factory(cursor: sqlite3.Cursor, row: tuple) -> Change:
+    """
+    Фабрика строк sqlite3 для журнала, соединенного с contacts через LEFT JOIN
+
+    Ожидает столбцы seq, op, contact_id, user_id и затем id, user_id, first_name,
+    last_name, phone, email контакта
+
+    Args:
+        cursor (sqlite3.Cursor): Курсор, выполнивший запрос
+        row (tuple): Строка результата
+
+    Returns:
+        Change: Запись журнала
+    """
+    seq, op, contact_id, user_id = row[:4]
+    contact = None if op == "delete" or row[4] is None else Contact(*row[4:])
+    return Change(seq, op, contact_id, user_id, contact)
@@ -0,0 +1,80 @@
+import sqlite3
+
+
+class Contact:
+    """
+    Контакт пользователя
+
+    Атрибуты хранятся в __slots__, поэтому у объекта нет собственного __dict__
+    и большие выборки занимают меньше памяти
+
+    Attributes:
+        id (int): Идентификатор контакта
+        user_id (int): Идентификатор владельца
+        first_name (str): Имя
+        last_name (str): Фамилия
+        phone (str): Номер телефона в том виде, в котором его ввели
+        email (str): Адрес электронной почты
+    """
+
+    __slots__ = ("id", "user_id", "first_name", "last_name", "phone", "email")
+
+    def __init__(
+        self,
+        contact_id: int,
+        user_id: int,
+        first_name: str,
+        last_name: str,
+        phone: str,
+        email: str,
+    ) -> None:
+        """Инициализирует объект контакта"""
+        self.id = contact_id
+        self.user_id = user_id
+        self.first_name = first_name
+        self.last_name = last_name
+        self.phone = phone
+        self.email = email
+
+    def __repr__(self) -> str:
+        """Возвращает строковое представление объекта контакта"""
+        return (
+            f"Contact(id: {self.id}, user_id: {self.user_id}, "
+            f"name: {self.first_name} {self.last_name}, "
+            f"phone: {self.phone}, email: {self.email})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Сравнивает контакты по всем полям"""
+        if not isinstance(other, Contact):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    def as_tuple(self) -> tuple:
+        """Возвращает поля контакта в порядке столбцов таблицы contacts"""
+        return (
+            self.id,
+            self.user_id,
+            self.first_name,
+            self.last_name,
+            self.phone,
+            self.email,
+        )
+
+    def as_dict(self) -> dict:
+        """Возвращает поля контакта в виде словаря, например для JSON"""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+def contact_factory(cursor: sqlite3.Cursor, row: tuple) -> Contact:
+    """
+    Фабрика строк sqlite3 для запросов SELECT id, user_id, first_name, last_name, phone, email
+
+    Args:
+        cursor (sqlite3.Cursor): Курсор, выполнивший запрос
+        row (tuple): Строка результата
+
+    Returns:
+        Contact: Объект контакта
+    """
+    return Contact(*row)
@@ -1,35 +1,74 @@
-from uuid import UUID
+import sqlite3
+
 from utils import hash_password
 
 
 class User:
-    def __init__(self, user_id: UUID, phone: str, username: str, password: str):
-        """Инициализирует объект пользователя"""
-        self.__user_id: UUID = user_id
-        self.__phone: str = phone
-        self.__username: str = username
-        self.__password: str = hash_password(password)
+    """
+    Пользователь системы
+
+    Атрибуты хранятся в __slots__, поэтому у объекта нет собственного __dict__
+
+    Attributes:
+        user_id (int): Идентификатор пользователя
+        phone (str | None): Номер телефона пользователя
+        username (str): Имя пользователя
+        password_hash (str): Хэш пароля в формате utils.hash_password
+    """
+
+    __slots__ = ("user_id", "phone", "username", "password_hash")
+
+    def __init__(self, user_id: int, phone: str | None, username: str, password: str):
+        """Инициализирует объект пользователя, хэшируя пароль"""
+        self.user_id = user_id
+        self.phone = phone
+        self.username = username
+        self.password_hash = hash_password(password)
+
+    @classmethod
+    def from_row(
+        cls, user_id: int, username: str, password_hash: str, phone: str | None = None
+    ) -> "User":
+        """
+        Создает пользователя из строки таблицы users с уже посчитанным хэшем пароля
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            username (str): Имя пользователя
+            password_hash (str): Хэш пароля в формате utils.hash_password
+            phone (str | None): Номер телефона. По умолчанию None
+
+        Returns:
+            User: Объект пользователя
+        """
+        user = cls.__new__(cls)
+        user.user_id = user_id
+        user.phone = phone
+        user.username = username
+        user.password_hash = password_hash
+        return user
 
     def __repr__(self) -> str:
         """Возвращает строковое представление объекта пользователя"""
-        return f"User(id: {self.__user_id}, username: {self.__username}, phone: {self.__phone})"
-
-    @property
-    def username(self) -> str:
-        """Возвращает имя пользователя"""
-        return self.__username
+        return (
+            f"User(id: {self.user_id}, username: {self.username}, phone: {self.phone})"
+        )
 
     @property
     def password(self) -> str:
         """Возвращает хэшированный пароль пользователя"""
-        return self.__password
+        return self.password_hash
 
-    @property
-    def user_id(self) -> UUID:
-        """Возвращает идентификатор пользователя"""
-        return self.__user_id
 
-    @property
-    def phone(self) -> str:
-        """Возвращает номер телефона пользователя"""
-        return self.__phone
+def user_factory(cursor: sqlite3.Cursor, row: tuple) -> User:
+    """
+    Фабрика строк sqlite3 для запросов SELECT id, username, password
+
+    Args:
+        cursor (sqlite3.Cursor): Курсор, выполнивший запрос
+        row (tuple): Строка результата
+
+    Returns:
+        User: Объект пользователя
+    """
+    return User.from_row(*row)
@@ -0,0 +1,227 @@
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from db import DatabaseManager
+
+"""Сессии пользователей с непрозрачными токенами
+
+После входа пользователь получает случайный токен, и дальнейшие операции
+проверяются по нему без повторного хэширования пароля (scrypt) и без
+обращения к таблице users. Активные сессии хранятся в памяти в словаре
+по SHA-256 токена, поэтому проверка - это один поиск в словаре. Таблица
+sessions нужна, чтобы сессии переживали перезапуск: при создании менеджера
+неистекшие сессии загружаются из нее в память.
+
+Все сессии живут одинаковое время ttl, поэтому порядок добавления в словарь
+совпадает с порядком истечения, и истекшие сессии удаляются из его начала"""
+
+SESSION_TTL = 12 * 60 * 60
+TOKEN_BYTES = 32
+
+
+def hash_token(token: str) -> str:
+    """
+    Возвращает SHA-256 токена, под которым сессия хранится в памяти и в базе
+
+    Токен случайный и длинный, поэтому соль и медленная функция ему не нужны
+
+    Args:
+        token (str): Токен сессии
+
+    Returns:
+        str: Шестнадцатеричный SHA-256
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def validate_token(
+    db_manager: "DatabaseManager", token: str, clock: Callable[[], float] = time.time
+) -> int | None:
+    """
+    Проверяет токен одним запросом к таблице sessions по SHA-256 токена
+
+    В отличие от SessionManager не загружает остальные сессии, поэтому
+    подходит для однократной проверки, например при запуске сценария
+
+    Args:
+        db_manager (DatabaseManager): Менеджер базы данных
+        token (str): Токен сессии
+        clock (Callable[[], float]): Источник текущего времени. По умолчанию time.time
+
+    Returns:
+        int | None: Идентификатор пользователя или None, если токен неизвестен или истек
+    """
+    return db_manager.get_session_user(hash_token(token), clock())
+
+
+class SessionManager:
+    """
+    Этот класс выдает, проверяет и отзывает токены сессий
+
+    Методы можно вызывать из разных потоков, словарь сессий защищен блокировкой.
+    Сессии, созданные другим процессом после запуска менеджера, ему не видны
+
+    Attributes:
+        db (DatabaseManager): Менеджер базы данных для хранения сессий
+        ttl (float): Время жизни сессии в секундах
+        clock (Callable[[], float]): Источник текущего времени
+    """
+
+    def __init__(
+        self,
+        db_manager: "DatabaseManager",
+        ttl: float = SESSION_TTL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Инициализирует менеджер и загружает неистекшие сессии из базы
+
+        Args:
+            db_manager (DatabaseManager): Менеджер базы данных
+            ttl (float): Время жизни сессии в секундах. По умолчанию 12 часов
+            clock (Callable[[], float]): Источник текущего времени. По умолчанию time.time
+        """
+        if ttl <= 0:
+            raise ValueError("ttl должен быть положительным")
+        self.db = db_manager
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._sessions: OrderedDict[str, tuple[int, float]] = OrderedDict(
+            (token_hash, (user_id, expires_at))
+            for token_hash, user_id, expires_at in self.db.get_active_sessions(clock())
+        )
+
+    def __len__(self) -> int:
+        """Возвращает количество сессий в памяти, включая еще не удаленные истекшие"""
+        return len(self._sessions)
+
+    def create(self, user_id: int) -> str:
+        """
+        Создает сессию пользователя
+
+        Args:
+            user_id (int): Идентификатор пользователя, уже прошедшего проверку пароля
+
+        Returns:
+            str: Токен сессии
+        """
+        token, session = self.store(user_id)
+        self.remember(*session)
+        return token
+
+    def store(self, user_id: int) -> tuple[str, tuple[str, int, float]]:
+        """
+        Записывает новую сессию в базу, не меняя словарь в памяти
+
+        Нужен, когда запись идет внутри чужой транзакции, которую могут откатить
+        и повторить, например в пачке потока-писателя: после фиксации вызывающий
+        передает вторую часть результата в remember()
+
+        Args:
+            user_id (int): Идентификатор пользователя, уже прошедшего проверку пароля
+
+        Returns:
+            tuple[str, tuple[str, int, float]]: Токен и сессия (SHA-256 токена, user_id, expires_at)
+        """
+        token = secrets.token_urlsafe(TOKEN_BYTES)
+        token_hash = hash_token(token)
+        expires_at = self.clock() + self.ttl
+        self.db.add_session(token_hash, user_id, expires_at)
+        return token, (token_hash, user_id, expires_at)
+
+    def remember(self, token_hash: str, user_id: int, expires_at: float) -> None:
+        """
+        Добавляет в память сессию, уже сохраненную store()
+
+        Args:
+            token_hash (str): SHA-256 токена
+            user_id (int): Идентификатор пользователя
+            expires_at (float): Время истечения сессии
+        """
+        with self._lock:
+            self._sessions[token_hash] = (user_id, expires_at)
+
+    def validate(self, token: str) -> int | None:
+        """
+        Проверяет токен
+
+        Args:
+            token (str): Токен сессии
+
+        Returns:
+            int | None: Идентификатор пользователя или None, если токен неизвестен или истек
+        """
+        session = self._sessions.get(hash_token(token))
+        if session is None:
+            return None
+        user_id, expires_at = session
+        if expires_at <= self.clock():
+            return None
+        return user_id
+
+    def revoke(self, token: str) -> bool:
+        """
+        Отзывает сессию
+
+        Args:
+            token (str): Токен сессии
+
+        Returns:
+            bool: True, если сессия была в памяти
+        """
+        return self.forget(self.delete(token))
+
+    def delete(self, token: str) -> str:
+        """
+        Удаляет сессию из базы, не меняя словарь в памяти
+
+        Строка удаляется всегда, даже если в памяти сессии нет, поэтому повтор
+        после отката транзакции тоже ее удалит. После фиксации вызывающий
+        передает результат в forget()
+
+        Args:
+            token (str): Токен сессии
+
+        Returns:
+            str: SHA-256 токена
+        """
+        token_hash = hash_token(token)
+        self.db.delete_session(token_hash)
+        return token_hash
+
+    def forget(self, token_hash: str) -> bool:
+        """
+        Удаляет из памяти сессию, уже удаленную из базы delete()
+
+        Args:
+            token_hash (str): SHA-256 токена
+
+        Returns:
+            bool: True, если сессия была в памяти
+        """
+        with self._lock:
+            return self._sessions.pop(token_hash, None) is not None
+
+    def purge_expired(self) -> int:
+        """
+        Удаляет истекшие сессии из памяти и из базы
+
+        Returns:
+            int: Количество сессий, удаленных из памяти
+        """
+        now = self.clock()
+        purged = 0
+        with self._lock:
+            while self._sessions:
+                token_hash, (_, expires_at) = next(iter(self._sessions.items()))
+                if expires_at > now:
+                    break
+                del self._sessions[token_hash]
+                purged += 1
+        self.db.delete_expired_sessions(now)
+        return purged
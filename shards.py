@@ -0,0 +1,775 @@
+import bisect
+import hashlib
+import os
+import threading
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Any
+
+from db import DatabaseManager
+from reges import normalize_phone
+from schemas.contacts import Contact
+from schemas.users import User
+
+"""Шардированное хранилище: пользователи распределены по нескольким файлам SQLite
+
+Пользователи, сессии и размещение пользователей по шардам (таблица user_shards)
+хранятся в небольшой базе-каталоге directory.db. Контакты пользователя целиком
+лежат в одном из файлов shard_<n>.db, который выбирается консистентным хэшированием
+user_id. Каждый шард - отдельный файл со своей блокировкой на запись и своим
+пулом соединений, поэтому потоки, работающие с пользователями разных шардов,
+читают и пишут параллельно.
+
+Идентификатор контакта содержит идентификатор владельца в старших битах
+(user_id << 32 | номер), поэтому операции по id контакта находят шард без
+обращения к каталогу, а при переносе пользователя в другой шард id не меняются.
+
+При изменении количества шардов rebalance() переносит только пользователей,
+у которых сменился шард по кольцу, - в среднем 1/N часть. Перенос идет
+по одному пользователю, операции остальных пользователей при этом не ждут"""
+
+DIRECTORY_FILE = "directory.db"
+DEFAULT_SHARD_COUNT = 4
+RING_REPLICAS = 64
+CONTACT_ID_BITS = 32
+MAX_USER_ID = 2**31 - 1
+
+CONTACT_ROW_COLUMNS = "id, user_id, first_name, last_name, phone, phone_norm, email"
+
+
+def shard_names(count: int) -> list[str]:
+    """
+    Возвращает имена шардов для заданного их количества
+
+    Args:
+        count (int): Количество шардов
+
+    Returns:
+        list[str]: Имена shard_0 ... shard_<count-1>
+    """
+    return [f"shard_{i}" for i in range(count)]
+
+
+def contact_owner(contact_id: int) -> int:
+    """
+    Возвращает идентификатор владельца контакта по идентификатору контакта
+
+    Args:
+        contact_id (int): Идентификатор контакта в шардированном хранилище
+
+    Returns:
+        int: Идентификатор пользователя
+    """
+    return contact_id >> CONTACT_ID_BITS
+
+
+def _check_user_id(user_id: int) -> None:
+    """Проверяет, что id пользователя помещается в старшие биты id контакта"""
+    if not 0 <= user_id <= MAX_USER_ID:
+        raise ValueError(f"user_id вне диапазона шардированного хранилища: {user_id}")
+
+
+def _ring_hash(key: str) -> int:
+    """Возвращает 64-битный хэш ключа для размещения на кольце"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest())
+
+
+class HashRing:
+    """
+    Консистентное хэширование пользователей по шардам
+
+    Каждый шард занимает на кольце replicas точек, пользователь относится
+    к первой точке по часовой стрелке от хэша своего id. При добавлении
+    или удалении шарда меняют шард только пользователи соседних с ним участков
+
+    Attributes:
+        shards (list[str]): Имена шардов
+        replicas (int): Количество точек одного шарда на кольце
+    """
+
+    def __init__(self, shards: Iterable[str], replicas: int = RING_REPLICAS) -> None:
+        """
+        Инициализирует кольцо
+
+        Args:
+            shards (Iterable[str]): Имена шардов
+            replicas (int): Количество точек одного шарда на кольце. По умолчанию 64
+        """
+        self.shards = list(shards)
+        if not self.shards:
+            raise ValueError("Нужен хотя бы один шард")
+        self.replicas = replicas
+        points = sorted(
+            (_ring_hash(f"{shard}#{replica}"), shard)
+            for shard in self.shards
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard_for(self, user_id: int) -> str:
+        """
+        Возвращает шард пользователя
+
+        Args:
+            user_id (int): Идентификатор пользователя
+
+        Returns:
+            str: Имя шарда
+        """
+        position = bisect.bisect(self._hashes, _ring_hash(str(user_id)))
+        return self._owners[position % len(self._owners)]
+
+
+class UserGate:
+    """
+    Не дает переносить пользователя в другой шард во время операций с ним
+
+    Операции над одним пользователем идут параллельно друг с другом,
+    перенос ждет их завершения, а новые операции ждут окончания переноса
+    """
+
+    def __init__(self) -> None:
+        """Инициализирует пустые счетчики операций"""
+        self._cond = threading.Condition()
+        self._active: Counter = Counter()
+        self._moving: set[int] = set()
+
+    @contextmanager
+    def use(self, user_id: int) -> Iterator[None]:
+        """Блок операции над пользователем"""
+        with self._cond:
+            while user_id in self._moving:
+                self._cond.wait()
+            self._active[user_id] += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active[user_id] -= 1
+                if not self._active[user_id]:
+                    del self._active[user_id]
+                    self._cond.notify_all()
+
+    @contextmanager
+    def move(self, user_id: int) -> Iterator[None]:
+        """Блок переноса пользователя, исключающий операции над ним"""
+        with self._cond:
+            while user_id in self._moving:
+                self._cond.wait()
+            self._moving.add(user_id)
+            while self._active[user_id]:
+                self._cond.wait()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._moving.discard(user_id)
+                self._cond.notify_all()
+
+
+class ShardDatabaseManager(DatabaseManager):
+    """
+    Этот класс отвечает за базу одного шарда
+
+    Отличается от DatabaseManager выдачей идентификаторов контактов:
+    следующий id берется в диапазоне владельца по счетчику contact_id_counters,
+    а не по всей таблице
+    """
+
+    def _reserve_contact_ids(self, user_id: int, count: int = 1) -> int:
+        """
+        Резервирует count идентификаторов контактов пользователя и возвращает первый
+
+        Счетчик contact_id_counters только растет, поэтому id удаленного контакта
+        не выдается повторно. Вызывается внутри transaction()
+        """
+        _check_user_id(user_id)
+        self.cur.execute(
+            """INSERT INTO contact_id_counters (user_id, last_id) VALUES (?, ?)
+               ON CONFLICT (user_id) DO UPDATE SET last_id = last_id + ?""",
+            (user_id, (user_id << CONTACT_ID_BITS) + count, count),
+        )
+        self.cur.execute(
+            "SELECT last_id FROM contact_id_counters WHERE user_id=?", (user_id,)
+        )
+        return self.cur.fetchone()[0] - count + 1
+
+    def add_contact(
+        self, user_id: int, first_name: str, last_name: str, phone: str, email: str
+    ) -> int:
+        """
+        Добавляет контакт с идентификатором из диапазона владельца
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            first_name (str): Имя контакта
+            last_name (str): Фамилия контакта
+            phone (str): Номер телефона контакта
+            email (str): Email контакта
+
+        Returns:
+            int: Идентификатор добавленного контакта
+        """
+        self._flush_pending()
+        with self.transaction():
+            contact_id = self._reserve_contact_ids(user_id)
+            self.cur.execute(
+                f"INSERT INTO contacts ({CONTACT_ROW_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    contact_id,
+                    user_id,
+                    first_name,
+                    last_name,
+                    phone,
+                    normalize_phone(phone),
+                    email,
+                ),
+            )
+            self._index_fuzzy([(contact_id, user_id, first_name, last_name)])
+        return contact_id
+
+    def add_contacts(self, contacts: Iterable[tuple]) -> None:
+        """
+        Добавляет пачку контактов одним вызовом executemany
+
+        Args:
+            contacts (Iterable[tuple]): Кортежи (user_id, first_name, last_name, phone, email)
+        """
+        by_user: dict[int, list[tuple]] = {}
+        for contact in contacts:
+            by_user.setdefault(contact[0], []).append(contact)
+        self._flush_pending()
+        with self.transaction():
+            rows = []
+            for user_id, user_contacts in by_user.items():
+                next_id = self._reserve_contact_ids(user_id, len(user_contacts))
+                for contact_id, (_, first_name, last_name, phone, email) in enumerate(
+                    user_contacts, start=next_id
+                ):
+                    rows.append(
+                        (
+                            contact_id,
+                            user_id,
+                            first_name,
+                            last_name,
+                            phone,
+                            normalize_phone(phone),
+                            email,
+                        )
+                    )
+            self.cur.executemany(
+                f"INSERT INTO contacts ({CONTACT_ROW_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._index_fuzzy(row[:4] for row in rows)
+
+    def last_contact_id(self, user_id: int) -> int | None:
+        """
+        Возвращает последний выданный пользователю id контакта
+
+        Args:
+            user_id (int): Идентификатор пользователя
+
+        Returns:
+            int | None: Значение счетчика или None, если контакты пользователю не выдавались
+        """
+        rows = self._fetch(
+            None, "SELECT last_id FROM contact_id_counters WHERE user_id=?", (user_id,)
+        )
+        return rows[0][0] if rows else None
+
+    def export_user_contacts(self, user_id: int) -> list[tuple]:
+        """
+        Читает строки контактов пользователя для переноса в другой шард
+
+        Args:
+            user_id (int): Идентификатор пользователя
+
+        Returns:
+            list[tuple]: Строки с колонками CONTACT_ROW_COLUMNS
+        """
+        self._flush_pending()
+        return self._fetch(
+            None,
+            f"SELECT {CONTACT_ROW_COLUMNS} FROM contacts WHERE user_id=? ORDER BY id",
+            (user_id,),
+        )
+
+    def import_user_contacts(
+        self, user_id: int, rows: list[tuple], last_id: int | None = None
+    ) -> None:
+        """
+        Заменяет контакты пользователя строками из другого шарда
+
+        Остатки прерванного ранее переноса удаляются в той же транзакции,
+        поэтому повторный перенос безопасен. Счетчик id поднимается не ниже
+        last_id и id перенесенных контактов, чтобы id, удаленные в исходном
+        шарде, не выдавались снова
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            rows (list[tuple]): Строки из export_user_contacts
+            last_id (int | None): Счетчик из last_contact_id исходного шарда. По умолчанию None
+        """
+        last_id = max([row[0] for row in rows] + [last_id or 0])
+        with self.transaction():
+            if last_id:
+                self.cur.execute(
+                    """INSERT INTO contact_id_counters (user_id, last_id) VALUES (?, ?)
+                       ON CONFLICT (user_id) DO UPDATE
+                       SET last_id = MAX(last_id, excluded.last_id)""",
+                    (user_id, last_id),
+                )
+            self.cur.execute("DELETE FROM contacts WHERE user_id=?", (user_id,))
+            self.cur.executemany(
+                f"INSERT INTO contacts ({CONTACT_ROW_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._index_fuzzy(row[:4] for row in rows)
+
+    def delete_user_contacts(self, user_id: int) -> int:
+        """
+        Удаляет все контакты пользователя
+
+        Args:
+            user_id (int): Идентификатор пользователя
+
+        Returns:
+            int: Количество удаленных контактов
+        """
+        self._flush_pending()
+        self.cur.execute("DELETE FROM contacts WHERE user_id=?", (user_id,))
+        deleted = self.cur.rowcount
+        self._commit()
+        return deleted
+
+
+class ShardedDatabaseManager:
+    """
+    Этот класс предоставляет интерфейс DatabaseManager поверх каталога и шардов
+
+    Операции с пользователями и сессиями выполняются в каталоге, операции
+    с контактами - в шарде владельца. Менеджер можно использовать из нескольких
+    потоков: каталог и каждый шард открываются с пулом соединений
+
+    Attributes:
+        path (str): Каталог с файлами хранилища
+        directory (DatabaseManager): База-каталог с пользователями и сессиями
+        ring (HashRing): Кольцо, по которому размещаются новые пользователи
+    """
+
+    def __init__(
+        self,
+        path: str,
+        shard_count: int = DEFAULT_SHARD_COUNT,
+        pool_size: int = 5,
+        replicas: int = RING_REPLICAS,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Инициализирует хранилище, шарды открываются при первом обращении
+
+        Args:
+            path (str): Каталог с файлами хранилища, создается при необходимости
+            shard_count (int): Количество шардов для новых пользователей. По умолчанию 4
+            pool_size (int): Размер пула соединений каталога и каждого шарда. По умолчанию 5
+            replicas (int): Количество точек одного шарда на кольце. По умолчанию 64
+            **kwargs: Остальные параметры DatabaseManager, например search_mode
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self._pool_size = pool_size
+        self._kwargs = kwargs
+        self.directory = DatabaseManager(
+            os.path.join(path, DIRECTORY_FILE), pool_size=pool_size, **kwargs
+        )
+        self.ring = HashRing(shard_names(shard_count), replicas)
+        self._shards: dict[str, ShardDatabaseManager] = {}
+        self._shards_lock = threading.Lock()
+        self._placement = self.directory.get_user_shards()
+        self.directory.release_connection()
+        self._placement_lock = threading.Lock()
+        self._gate = UserGate()
+        self._local = threading.local()
+
+    @property
+    def shard_count(self) -> int:
+        """Количество шардов на кольце"""
+        return len(self.ring.shards)
+
+    def shard(self, name: str) -> ShardDatabaseManager:
+        """
+        Возвращает менеджер шарда, открывая его при первом обращении
+
+        Args:
+            name (str): Имя шарда
+
+        Returns:
+            ShardDatabaseManager: Менеджер базы шарда
+        """
+        shard = self._shards.get(name)
+        if shard is None:
+            with self._shards_lock:
+                shard = self._shards.get(name)
+                if shard is None:
+                    shard = ShardDatabaseManager(
+                        os.path.join(self.path, f"{name}.db"),
+                        pool_size=self._pool_size,
+                        **self._kwargs,
+                    )
+                    self._shards[name] = shard
+        return shard
+
+    def shard_of(self, user_id: int) -> str:
+        """
+        Возвращает шард, в котором хранятся контакты пользователя
+
+        Для пользователя, еще не размещенного ни в одном шарде, возвращается
+        шард по кольцу
+
+        Args:
+            user_id (int): Идентификатор пользователя
+
+        Returns:
+            str: Имя шарда
+        """
+        name = self._placement.get(user_id)
+        return self.ring.shard_for(user_id) if name is None else name
+
+    def _place(self, user_id: int) -> None:
+        """Закрепляет пользователя за шардом по кольцу перед первой записью его контактов"""
+        if user_id in self._placement:
+            return
+        with self._placement_lock:
+            if user_id not in self._placement:
+                name = self.ring.shard_for(user_id)
+                self.directory.set_user_shard(user_id, name)
+                self._placement[user_id] = name
+
+    def _all_shards(self) -> list[ShardDatabaseManager]:
+        """Возвращает шарды кольца и шарды, в которых еще остались пользователи"""
+        names = set(self.ring.shards) | set(self._placement.values())
+        return [self.shard(name) for name in sorted(names)]
+
+    def map_shards(self, func: Callable[[ShardDatabaseManager], Any]) -> list[Any]:
+        """
+        Выполняет функцию над всеми шардами параллельно, по потоку на шард
+
+        Args:
+            func (Callable[[ShardDatabaseManager], Any]): Функция от менеджера шарда
+
+        Returns:
+            list[Any]: Результаты в порядке имен шардов
+        """
+
+        def run(shard: ShardDatabaseManager) -> Any:
+            try:
+                return func(shard)
+            finally:
+                shard.release_connection()
+
+        shards = self._all_shards()
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            return list(executor.map(run, shards))
+
+    @contextmanager
+    def _route(
+        self, user_id: int, place: bool = False
+    ) -> Iterator[ShardDatabaseManager]:
+        """
+        Блок операции над контактами пользователя, возвращает его шард
+
+        Внутри transaction() шард входит в общую транзакцию, а пользователь
+        остается защищенным от переноса до ее фиксации. Операции, добавляющие
+        контакты, передают place=True, чтобы закрепить пользователя за шардом
+        """
+        gates = getattr(self._local, "gates", None)
+        if gates is None:
+            with self._gate.use(user_id):
+                if place:
+                    self._place(user_id)
+                yield self.shard(self.shard_of(user_id))
+            return
+        if user_id not in self._local.users:
+            gates.enter_context(self._gate.use(user_id))
+            self._local.users.add(user_id)
+        if place:
+            self._place(user_id)
+        shard = self.shard(self.shard_of(user_id))
+        if shard not in self._local.shards:
+            self._local.transactions.enter_context(shard.transaction())
+            self._local.shards.append(shard)
+        yield shard
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Объединяет операции с контактами в транзакции затронутых шардов
+
+        Каждый шард входит в блок при первой операции с ним, фиксация выполняется
+        при выходе из самого внешнего блока. Изменения одного шарда атомарны,
+        атомарность между шардами не гарантируется
+        """
+        if getattr(self._local, "gates", None) is not None:
+            yield
+            return
+        with ExitStack() as gates, ExitStack() as transactions:
+            self._local.gates = gates
+            self._local.transactions = transactions
+            self._local.users = set()
+            self._local.shards = []
+            try:
+                yield
+            finally:
+                self._local.gates = None
+
+    def move_user(self, user_id: int, target: str) -> bool:
+        """
+        Переносит контакты пользователя в другой шард
+
+        Контакты копируются в целевой шард, затем каталог переключается на него,
+        и только после этого контакты удаляются из исходного. Если удаление
+        не удалось, в исходном шарде остаются недоступные копии, а данные
+        пользователя не теряются
+
+        Args:
+            user_id (int): Идентификатор пользователя
+            target (str): Имя целевого шарда
+
+        Returns:
+            bool: False, если пользователь уже в целевом шарде
+        """
+        with self._gate.move(user_id):
+            source_name = self.shard_of(user_id)
+            if source_name == target:
+                return False
+            source = self.shard(source_name)
+            self.shard(target).import_user_contacts(
+                user_id,
+                source.export_user_contacts(user_id),
+                source.last_contact_id(user_id),
+            )
+            self.directory.set_user_shard(user_id, target)
+            self._placement[user_id] = target
+            source.delete_user_contacts(user_id)
+        return True
+
+    def rebalance(self, shard_count: int) -> int:
+        """
+        Меняет количество шардов и переносит пользователей, сменивших шард на кольце
+
+        Новые пользователи сразу размещаются по новому кольцу, остальные
+        продолжают работать во время переноса
+
+        Args:
+            shard_count (int): Новое количество шардов
+
+        Returns:
+            int: Количество перенесенных пользователей
+        """
+        with self._placement_lock:
+            self.ring = HashRing(shard_names(shard_count), self.ring.replicas)
+            user_ids = list(self._placement)
+        moved = 0
+        for user_id in user_ids:
+            if self.move_user(user_id, self.ring.shard_for(user_id)):
+                moved += 1
+        return moved
+
+    def placement_counts(self) -> dict[str, int]:
+        """
+        Возвращает количество пользователей в каждом шарде
+
+        Returns:
+            dict[str, int]: Количество размещенных пользователей по имени шарда
+        """
+        return dict(Counter(self._placement.values()))
+
+    def add_user(self, username: str, password: str) -> None:
+        """Добавляет пользователя в каталог"""
+        self.directory.add_user(username, password)
+
+    def add_user_hash(self, username: str, password_hash: str) -> None:
+        """Добавляет пользователя с готовым хэшем пароля в каталог"""
+        self.directory.add_user_hash(username, password_hash)
+
+    def get_user_credentials(self, username: str) -> tuple[int, str] | None:
+        """Возвращает id и хэш пароля пользователя из каталога"""
+        return self.directory.get_user_credentials(username)
+
+    def get_user(self, username: str) -> User | None:
+        """Возвращает пользователя из каталога"""
+        return self.directory.get_user(username)
+
+    def update_password_hash(self, user_id: int, password_hash: str) -> None:
+        """Обновляет хэш пароля пользователя в каталоге"""
+        self.directory.update_password_hash(user_id, password_hash)
+
+    def authenticate_user(self, username: str, password: str) -> int | None:
+        """Проверяет имя и пароль по каталогу и возвращает id пользователя"""
+        return self.directory.authenticate_user(username, password)
+
+    def add_session(self, token_hash: str, user_id: int, expires_at: float) -> None:
+        """Сохраняет сессию в каталоге"""
+        self.directory.add_session(token_hash, user_id, expires_at)
+
+    def get_active_sessions(self, now: float) -> list[tuple[str, int, float]]:
+        """Возвращает неистекшие сессии из каталога"""
+        return self.directory.get_active_sessions(now)
+
+    def delete_session(self, token_hash: str) -> None:
+        """Удаляет сессию из каталога"""
+        self.directory.delete_session(token_hash)
+
+    def delete_expired_sessions(self, now: float) -> int:
+        """Удаляет истекшие сессии из каталога"""
+        return self.directory.delete_expired_sessions(now)
+
+    def check_duplicate_phone(self, phone: str, user_id: int | None = None) -> bool:
+        """
+        Проверяет, существует ли контакт с указанным номером телефона
+
+        Без user_id проверяются все шарды параллельно
+
+        Args:
+            phone (str): Номер телефона для проверки
+            user_id (int | None): Искать только среди контактов этого пользователя. По умолчанию None
+
+        Returns:
+            bool: True, если контакт с таким номером телефона существует, иначе False
+        """
+        if user_id is None:
+            return any(
+                self.map_shards(lambda shard: shard.check_duplicate_phone(phone))
+            )
+        with self._route(user_id) as shard:
+            return shard.check_duplicate_phone(phone, user_id)
+
+    def get_phones(self, user_id: int) -> set[str]:
+        """Возвращает нормализованные номера телефонов пользователя"""
+        with self._route(user_id) as shard:
+            return shard.get_phones(user_id)
+
+    def add_contact(
+        self, user_id: int, first_name: str, last_name: str, phone: str, email: str
+    ) -> int:
+        """Добавляет контакт в шард владельца и возвращает его id"""
+        with self._route(user_id, place=True) as shard:
+            return shard.add_contact(user_id, first_name, last_name, phone, email)
+
+    def add_contacts(self, contacts: Iterable[tuple]) -> None:
+        """
+        Добавляет пачку контактов, разбивая ее по владельцам
+
+        Args:
+            contacts (Iterable[tuple]): Кортежи (user_id, first_name, last_name, phone, email)
+        """
+        by_user: dict[int, list[tuple]] = {}
+        for contact in contacts:
+            by_user.setdefault(contact[0], []).append(contact)
+        for user_id, rows in by_user.items():
+            with self._route(user_id, place=True) as shard:
+                shard.add_contacts(rows)
+
+    def edit_contact(
+        self,
+        contact_id: int,
+        first_name: str | None = None,
+        last_name: str | None = None,
+        phone: str | None = None,
+        email: str | None = None,
+    ) -> None:
+        """Редактирует контакт в шарде владельца"""
+        with self._route(contact_owner(contact_id)) as shard:
+            shard.edit_contact(contact_id, first_name, last_name, phone, email)
+
+    def delete_contact(self, contact_id: int) -> None:
+        """Удаляет контакт из шарда владельца"""
+        with self._route(contact_owner(contact_id)) as shard:
+            shard.delete_contact(contact_id)
+
+    def merge_contacts(
+        self, keep_id: int, duplicate_ids: Iterable[int], fields: dict[str, str]
+    ) -> None:
+        """Объединяет дубликаты одного владельца в шарде владельца"""
+        with self._route(contact_owner(keep_id)) as shard:
+            shard.merge_contacts(keep_id, duplicate_ids, fields)
+
+    def search_contacts(
+        self, user_id: int, query: str, limit: int | None = None
+    ) -> list[Contact]:
+        """Ищет контакты пользователя в его шарде"""
+        with self._route(user_id) as shard:
+            return shard.search_contacts(user_id, query, limit)
+
+    def fuzzy_search(
+        self, user_id: int, query: str, **kwargs: Any
+    ) -> list[tuple[Contact, float]]:
+        """Нечетко ищет контакты пользователя в его шарде"""
+        with self._route(user_id) as shard:
+            return shard.fuzzy_search(user_id, query, **kwargs)
+
+    def get_contact_details(self, contact_id: int) -> Contact | None:
+        """Возвращает контакт из шарда владельца"""
+        with self._route(contact_owner(contact_id)) as shard:
+            return shard.get_contact_details(contact_id)
+
+    def get_contacts(self, user_id: int) -> list[Contact]:
+        """Возвращает все контакты пользователя"""
+        with self._route(user_id) as shard:
+            return shard.get_contacts(user_id)
+
+    def get_contacts_page(
+        self,
+        user_id: int,
+        page_size: int = 50,
+        after_id: int | None = None,
+        before_id: int | None = None,
+    ) -> list[Contact]:
+        """Возвращает страницу контактов пользователя по возрастанию id"""
+        with self._route(user_id) as shard:
+            return shard.get_contacts_page(user_id, page_size, after_id, before_id)
+
+    def iter_contacts(self, user_id: int, page_size: int = 500) -> Iterator[Contact]:
+        """Постранично перебирает контакты пользователя"""
+        with self._route(user_id) as shard:
+            yield from shard.iter_contacts(user_id, page_size)
+
+    def iter_search_contacts(
+        self, user_id: int, query: str, page_size: int = 500
+    ) -> Iterator[Contact]:
+        """Потоково ищет контакты пользователя"""
+        with self._route(user_id) as shard:
+            yield from shard.iter_search_contacts(user_id, query, page_size)
+
+    def iter_all_contacts(self, chunk_size: int = 10000) -> Iterator[Contact]:
+        """
+        Перебирает контакты всех пользователей шард за шардом
+
+        Внутри шарда контакты упорядочены по user_id и id, контакты одного
+        владельца идут подряд. Пользователь, переносимый во время перебора,
+        может встретиться дважды или не встретиться
+
+        Args:
+            chunk_size (int): Количество строк, читаемых за один раз. По умолчанию 10000
+
+        Returns:
+            Iterator[Contact]: Контакты, сгруппированные по владельцу
+        """
+        for shard in self._all_shards():
+            yield from shard.iter_all_contacts(chunk_size)
+
+    def release_connection(self) -> None:
+        """Возвращает соединения текущего потока в пулы каталога и шардов"""
+        self.directory.release_connection()
+        for shard in list(self._shards.values()):
+            shard.release_connection()
+
+    def close_connection(self) -> None:
+        """Закрывает соединения каталога и всех открытых шардов"""
+        for shard in list(self._shards.values()):
+            shard.close_connection()
+        self.directory.close_connection()
@@ -0,0 +1,314 @@
+import argparse
+import csv
+import json
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Iterator
+from contextlib import nullcontext
+
+from db import AuthManager
+from db import DatabaseManager
+from profiles import PROFILES
+
+"""Экспорт контактов в снимок и восстановление из него
+
+Контакты читаются из базы кусками через fetchmany и пишутся в файл по мере чтения,
+поэтому память не зависит от размера адресной книги. Снимок (.snap) хранит каждый
+кусок по столбцам: user_id массивом int64, текстовые поля - массивом длин и общей
+строкой байт UTF-8, кусок целиком сжимается zlib. Одинаковые значения одного столбца
+оказываются рядом и хорошо сжимаются. Кроме снимка поддерживаются CSV и JSONL
+с теми же полями, что понимает importer.py
+
+Формат снимка:
+    SNAPSHOT_MAGIC
+    кусок: <количество строк uint32><длина сжатых данных uint32><данные zlib>
+    ...
+    завершающий кусок с нулевым количеством строк
+
+Числа записываются в порядке little-endian"""
+
+SNAPSHOT_MAGIC = b"CONTACTS-SNAPSHOT\x01"
+SNAPSHOT_FIELDS = ("user_id", "first_name", "last_name", "phone", "email")
+CHUNK_SIZE = 10000
+
+_CHUNK_HEADER = struct.Struct("<II")
+_NULL_LENGTH = 0xFFFFFFFF
+
+
+def _to_little_endian(values: array) -> bytes:
+    """Возвращает байты массива в порядке little-endian"""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, data: bytes) -> array:
+    """Читает массив из байт в порядке little-endian"""
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def encode_chunk(rows: list[tuple], level: int = 6) -> bytes:
+    """
+    Кодирует кусок контактов по столбцам и сжимает его
+
+    Args:
+        rows (list[tuple]): Кортежи (user_id, first_name, last_name, phone, email)
+        level (int): Уровень сжатия zlib. По умолчанию 6
+
+    Returns:
+        bytes: Сжатые данные куска
+    """
+    user_ids, *text_columns = zip(*rows)
+    parts = [_to_little_endian(array("q", user_ids))]
+    for column in text_columns:
+        encoded = [None if value is None else value.encode() for value in column]
+        lengths = array(
+            "I", (_NULL_LENGTH if value is None else len(value) for value in encoded)
+        )
+        parts.append(_to_little_endian(lengths))
+        parts.append(b"".join(value for value in encoded if value is not None))
+    return zlib.compress(b"".join(parts), level)
+
+
+def decode_chunk(data: bytes, count: int) -> list[tuple]:
+    """
+    Распаковывает кусок, записанный encode_chunk
+
+    Args:
+        data (bytes): Сжатые данные куска
+        count (int): Количество строк в куске
+
+    Returns:
+        list[tuple]: Кортежи (user_id, first_name, last_name, phone, email)
+    """
+    data = zlib.decompress(data)
+    offset = 8 * count
+    columns = [_from_little_endian("q", data[:offset])]
+    for _ in SNAPSHOT_FIELDS[1:]:
+        lengths = _from_little_endian("I", data[offset : offset + 4 * count])
+        offset += 4 * count
+        column = []
+        for length in lengths:
+            if length == _NULL_LENGTH:
+                column.append(None)
+            else:
+                column.append(data[offset : offset + length].decode())
+                offset += length
+        columns.append(column)
+    return list(zip(*columns))
+
+
+def export_snapshot(
+    db: DatabaseManager,
+    path: str,
+    user_id: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    level: int = 6,
+) -> int:
+    """
+    Записывает контакты пользователя или всей базы в сжатый снимок
+
+    Args:
+        db (DatabaseManager): Менеджер базы данных
+        path (str): Путь к файлу снимка
+        user_id (int | None): Идентификатор пользователя. По умолчанию None - все контакты
+        chunk_size (int): Количество строк в куске. По умолчанию 10000
+        level (int): Уровень сжатия zlib, 1 - быстрее, 9 - меньше файл. По умолчанию 6
+
+    Returns:
+        int: Количество записанных контактов
+    """
+    total = 0
+    with open(path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        for rows in db.iter_contact_chunks(user_id, chunk_size):
+            data = encode_chunk(rows, level)
+            f.write(_CHUNK_HEADER.pack(len(rows), len(data)))
+            f.write(data)
+            total += len(rows)
+        f.write(_CHUNK_HEADER.pack(0, 0))
+    return total
+
+
+def export_csv(
+    db: DatabaseManager,
+    path: str,
+    user_id: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """
+    Записывает контакты в CSV-файл с заголовком
+
+    Args:
+        db (DatabaseManager): Менеджер базы данных
+        path (str): Путь к файлу
+        user_id (int | None): Идентификатор пользователя. По умолчанию None - все контакты
+        chunk_size (int): Количество строк, читаемых из базы за раз. По умолчанию 10000
+
+    Returns:
+        int: Количество записанных контактов
+    """
+    total = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(SNAPSHOT_FIELDS)
+        for rows in db.iter_contact_chunks(user_id, chunk_size):
+            writer.writerows(rows)
+            total += len(rows)
+    return total
+
+
+def export_jsonl(
+    db: DatabaseManager,
+    path: str,
+    user_id: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """
+    Записывает контакты в JSONL-файл, по одному объекту в строке
+
+    Args:
+        db (DatabaseManager): Менеджер базы данных
+        path (str): Путь к файлу
+        user_id (int | None): Идентификатор пользователя. По умолчанию None - все контакты
+        chunk_size (int): Количество строк, читаемых из базы за раз. По умолчанию 10000
+
+    Returns:
+        int: Количество записанных контактов
+    """
+    total = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for rows in db.iter_contact_chunks(user_id, chunk_size):
+            f.writelines(
+                json.dumps(dict(zip(SNAPSHOT_FIELDS, row)), ensure_ascii=False) + "\n"
+                for row in rows
+            )
+            total += len(rows)
+    return total
+
+
+def export_file(
+    db: DatabaseManager,
+    path: str,
+    user_id: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """
+    Выбирает формат экспорта по расширению файла
+
+    Args:
+        db (DatabaseManager): Менеджер базы данных
+        path (str): Путь к файлу .csv, .jsonl, .json или снимку (любое другое расширение)
+        user_id (int | None): Идентификатор пользователя. По умолчанию None - все контакты
+        chunk_size (int): Количество строк, читаемых из базы за раз. По умолчанию 10000
+
+    Returns:
+        int: Количество записанных контактов
+    """
+    lower = path.lower()
+    if lower.endswith(".csv"):
+        return export_csv(db, path, user_id, chunk_size)
+    if lower.endswith((".jsonl", ".json")):
+        return export_jsonl(db, path, user_id, chunk_size)
+    return export_snapshot(db, path, user_id, chunk_size)
+
+
+def read_snapshot(path: str) -> Iterator[list[tuple]]:
+    """
+    Потоково читает снимок по кускам
+
+    Args:
+        path (str): Путь к файлу снимка
+
+    Returns:
+        Iterator[list[tuple]]: Куски кортежей (user_id, first_name, last_name, phone, email)
+
+    Raises:
+        ValueError: Если файл не является снимком или обрезан
+    """
+    with open(path, "rb") as f:
+        if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} не является снимком контактов")
+        while True:
+            header = f.read(_CHUNK_HEADER.size)
+            if len(header) < _CHUNK_HEADER.size:
+                raise ValueError(f"Снимок {path} обрезан")
+            count, length = _CHUNK_HEADER.unpack(header)
+            if count == 0:
+                return
+            data = f.read(length)
+            if len(data) < length:
+                raise ValueError(f"Снимок {path} обрезан")
+            yield decode_chunk(data, count)
+
+
+def restore_snapshot(
+    db: DatabaseManager, path: str, user_id: int | None = None, bulk: bool = True
+) -> int:
+    """
+    Загружает снимок в таблицу contacts
+
+    В режиме bulk весь снимок загружается одной транзакцией DatabaseManager.bulk_load(),
+    а полнотекстовый индекс перестраивается один раз в конце. Иначе каждый кусок
+    записывается своей транзакцией с построчным обновлением индекса, что выгоднее
+    для небольшого снимка поверх большой базы.
+
+    Контакты получают новые id. Если номер телефона уже есть у владельца,
+    выбрасывается sqlite3.IntegrityError и откатывается вся загрузка (bulk)
+    или текущий кусок
+
+    Args:
+        db (DatabaseManager): Менеджер базы данных
+        path (str): Путь к файлу снимка
+        user_id (int | None): Записать все контакты этому пользователю.
+            По умолчанию None - сохранить владельцев из снимка
+        bulk (bool): Загружать одной транзакцией с перестройкой индекса. По умолчанию True
+
+    Returns:
+        int: Количество загруженных контактов
+    """
+    total = 0
+    with db.bulk_load() if bulk else nullcontext():
+        for rows in read_snapshot(path):
+            if user_id is not None:
+                rows = [(user_id, *row[1:]) for row in rows]
+            with db.transaction():
+                db.add_contacts(rows)
+            total += len(rows)
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Экспорт и восстановление контактов")
+    parser.add_argument("command", choices=["export", "restore"])
+    parser.add_argument("path", help="Файл .snap, .csv или .jsonl")
+    parser.add_argument("--username", help="Только контакты этого пользователя")
+    parser.add_argument("--password")
+    parser.add_argument("--db", default="./contacts.db")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument(
+        "--profile",
+        choices=tuple(PROFILES),
+        help="профиль настроек SQLite, bulk-load - только для восстановления в новый файл или копию",
+    )
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(args.db, profile=args.profile)
+    user_id = None
+    if args.username:
+        user_id = AuthManager(db_manager).login(args.username, args.password or "")
+    if user_id or not args.username:
+        if args.command == "export":
+            count = export_file(db_manager, args.path, user_id, args.chunk_size)
+            print(f"Экспортировано контактов: {count}")
+        else:
+            count = restore_snapshot(db_manager, args.path, user_id)
+            print(f"Восстановлено контактов: {count}")
+    db_manager.close_connection()
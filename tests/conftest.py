@@ -0,0 +1,34 @@
+import pytest
+
+import console_app
+from db import DatabaseManager
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    """Путь к файлу временной базы"""
+    return str(tmp_path / "contacts.db")
+
+
+@pytest.fixture
+def db(db_path):
+    """Менеджер временной базы, закрывается после теста"""
+    manager = DatabaseManager(db_path)
+    yield manager
+    manager.close_connection()
+
+
+def query_plan(conn, sql: str, params: tuple = ()) -> str:
+    """Возвращает план запроса EXPLAIN QUERY PLAN одной строкой"""
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+
+def run_console(
+    monkeypatch, capsys, db_path: str, answers: list[str], *args: str
+) -> str:
+    """Проходит интерактивное меню с заданными ответами и возвращает вывод"""
+    feed = iter(answers)
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(feed))
+    assert console_app.main(["--db", db_path, *args]) == 0
+    return capsys.readouterr().out
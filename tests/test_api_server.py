@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from api_server import ContactsAPI
+from api_server import Request
+from async_db import AsyncDatabaseManager
+from db import DatabaseManager
+from sessions import SessionManager
+from sessions import validate_token
+
+
+def test_unexpected_error_is_logged_and_answered_with_500(db_path, caplog):
+    async def scenario() -> tuple[int, dict]:
+        db_manager = AsyncDatabaseManager(db_path, max_workers=1)
+        api = ContactsAPI(db_manager)
+
+        async def broken(request: Request) -> tuple[int, dict]:
+            raise RuntimeError("сбой")
+
+        api.dispatch = broken
+        request = Request("GET", "/contacts", "HTTP/1.1", {})
+        try:
+            return await api.handle(request)
+        finally:
+            await db_manager.close_connection()
+
+    with caplog.at_level(logging.ERROR, logger="contacts.api"):
+        status, payload = asyncio.run(scenario())
+    assert status == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert "error" in payload
+    assert "GET /contacts" in caplog.text
+    assert "RuntimeError" in caplog.text
+
+
+def auth_request(method: str, path: str, token: str) -> Request:
+    """Запрос с токеном в заголовке Authorization"""
+    return Request(method, path, "HTTP/1.1", {"authorization": f"Bearer {token}"})
+
+
+def login_request() -> Request:
+    """Запрос входа пользователя user с паролем secret"""
+    body = b'{"username": "user", "password": "secret"}'
+    return Request("POST", "/login", "HTTP/1.1", {}, body)
+
+
+async def batched_with_failure(db_manager: AsyncDatabaseManager, operation) -> None:
+    """
+    Выполняет корутину operation в одной пачке писателя с падающей записью
+
+    Писатель задерживается на первой записи, пока operation и следом за ней
+    падающая запись не окажутся в очереди, после чего пачка откатывается
+    и операции повторяются по одной
+    """
+    started = threading.Event()
+    release = threading.Event()
+
+    def block(db) -> None:
+        started.set()
+        release.wait()
+
+    def fail(db) -> None:
+        db.add_user("other", "password")
+        raise RuntimeError("сбой записи")
+
+    blocker = asyncio.ensure_future(db_manager.run_write(block))
+    while not started.is_set():
+        await asyncio.sleep(0.01)
+    pending = asyncio.ensure_future(operation)
+    while db_manager._writes.qsize() < 1:
+        await asyncio.sleep(0.01)
+    failing = asyncio.ensure_future(db_manager.run_write(fail))
+    while db_manager._writes.qsize() < 2:
+        await asyncio.sleep(0.01)
+    release.set()
+    await blocker
+    with pytest.raises(RuntimeError):
+        await failing
+    await pending
+
+
+def test_logout_in_rolled_back_batch_deletes_session(db_path):
+    async def scenario() -> tuple[str, int]:
+        db_manager = AsyncDatabaseManager(db_path, max_workers=1)
+        api = ContactsAPI(db_manager)
+        await api.auth.register_user("user", "secret")
+        status, payload = await api.login(login_request())
+        assert status == HTTPStatus.OK
+        token, user_id = payload["token"], payload["user_id"]
+        await batched_with_failure(
+            db_manager, api.logout(auth_request("POST", "/logout", token), user_id)
+        )
+        assert api.sessions.validate(token) is None
+        await db_manager.close_connection()
+        return token, user_id
+
+    token, user_id = asyncio.run(scenario())
+    db = DatabaseManager(db_path)
+    try:
+        assert validate_token(db, token) is None
+        assert len(SessionManager(db)) == 0
+    finally:
+        db.close_connection()
+
+
+def test_login_in_rolled_back_batch_keeps_one_session(db_path):
+    async def scenario() -> tuple[str, int]:
+        db_manager = AsyncDatabaseManager(db_path, max_workers=1)
+        api = ContactsAPI(db_manager)
+        await api.auth.register_user("user", "secret")
+        login = api.login(login_request())
+        results = []
+
+        async def record() -> None:
+            results.append(await login)
+
+        await batched_with_failure(db_manager, record())
+        ((status, payload),) = results
+        assert status == HTTPStatus.OK
+        assert len(api.sessions) == 1
+        assert api.sessions.validate(payload["token"]) == payload["user_id"]
+        await db_manager.close_connection()
+        return payload["token"], payload["user_id"]
+
+    token, user_id = asyncio.run(scenario())
+    db = DatabaseManager(db_path)
+    try:
+        assert validate_token(db, token) == user_id
+        assert len(SessionManager(db)) == 1
+    finally:
+        db.close_connection()
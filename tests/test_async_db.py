@@ -0,0 +1,64 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from async_db import AsyncDatabaseManager
+from db import ConnectionPool
+from utils import _legacy_hash
+from utils import needs_rehash
+
+
+def test_legacy_hash_is_rehashed_by_writer_thread(db_path, monkeypatch):
+    async def scenario() -> int | None:
+        manager = AsyncDatabaseManager(db_path, max_workers=2)
+        await manager.run_write(
+            lambda db: db.add_user_hash("user", _legacy_hash("secret"))
+        )
+        update = manager.db.update_password_hash
+
+        def record_thread(user_id: int, password_hash: str) -> None:
+            threads.append(threading.current_thread().name)
+            update(user_id, password_hash)
+
+        monkeypatch.setattr(manager.db, "update_password_hash", record_thread)
+        assert await manager.authenticate_user("user", "wrong") is None
+        user_id = await manager.authenticate_user("user", "secret")
+        _, password_hash = await manager.run_read(
+            lambda db: db.get_user_credentials("user")
+        )
+        assert not needs_rehash(password_hash)
+        assert await manager.authenticate_user("user", "secret") == user_id
+        await manager.close_connection()
+        return user_id
+
+    threads: list[str] = []
+    assert asyncio.run(scenario()) is not None
+    assert threads == ["contacts-writer"]
+
+
+def test_close_closes_reader_thread_connections(db_path, monkeypatch):
+    opened: list[sqlite3.Connection] = []
+    connect = ConnectionPool._connect
+
+    def record(pool: ConnectionPool) -> sqlite3.Connection:
+        conn = connect(pool)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(ConnectionPool, "_connect", record)
+
+    async def scenario() -> None:
+        manager = AsyncDatabaseManager(db_path, max_workers=3)
+        await manager.add_user("user", "password")
+        await asyncio.gather(
+            *(manager.run_read(lambda db: db.get_user("user")) for _ in range(6))
+        )
+        await manager.close_connection()
+
+    asyncio.run(scenario())
+    assert len(opened) > 1
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
@@ -0,0 +1,104 @@
+import io
+import json
+import sqlite3
+
+import pytest
+
+import console_app
+from batch import BatchRunner
+from sessions import SessionManager
+
+
+@pytest.fixture
+def user_id(db):
+    """Пользователь с одним контактом"""
+    db.add_user("user", "secret")
+    user_id = db.get_user("user").user_id
+    db.add_contact(user_id, "Иван", "Петров", "89123456789", "i@mail.ru")
+    return user_id
+
+
+def add(first_name: str, phone: str) -> dict:
+    """Операция добавления контакта"""
+    return {
+        "op": "add",
+        "first_name": first_name,
+        "last_name": "Фамилия",
+        "phone": phone,
+        "email": "a@mail.ru",
+    }
+
+
+def run(runner: BatchRunner, operations: list) -> tuple[list[dict], object]:
+    """Выполняет операции и возвращает разобранные результаты и отчёт"""
+    lines = [op if isinstance(op, str) else json.dumps(op) for op in operations]
+    out = io.StringIO()
+    report = runner.run(lines, out)
+    return [json.loads(line) for line in out.getvalue().splitlines()], report
+
+
+def test_operations_run_in_batches(db, user_id, monkeypatch):
+    transactions = []
+    transaction = db.transaction
+
+    def counted():
+        transactions.append(1)
+        return transaction()
+
+    monkeypatch.setattr(db, "transaction", counted)
+    results, report = run(
+        BatchRunner(db, user_id, batch_size=2),
+        [
+            add("Петр", "89001112233"),
+            add("Дубль", "8 (912) 345-67-89"),
+            "не json",
+            {"op": "search", "query": "89001112233"},
+            {"op": "list", "limit": 10},
+        ],
+    )
+    assert len(transactions) == 3
+    assert [r["ok"] for r in results] == [True, False, False, True, True]
+    assert [r["line"] for r in results] == [1, 2, 3, 4, 5]
+    assert results[1]["error"] == "контакт с таким номером телефона уже существует"
+    assert [c["first_name"] for c in results[3]["contacts"]] == ["Петр"]
+    assert [c["first_name"] for c in results[4]["contacts"]] == ["Иван", "Петр"]
+    assert (report.total, report.succeeded, report.failed) == (5, 3, 2)
+
+
+def test_failed_batch_is_rolled_back(db, user_id, monkeypatch):
+    runner = BatchRunner(db, user_id, batch_size=2)
+
+    def locked(contact_id):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(db, "delete_contact", locked)
+    first = db.get_contacts(user_id)[0].id
+    with pytest.raises(sqlite3.OperationalError):
+        run(
+            runner,
+            [
+                add("Петр", "89001112233"),
+                add("Анна", "89004445566"),
+                add("Борис", "89007778899"),
+                {"op": "delete", "id": first},
+            ],
+        )
+    names = sorted(contact.first_name for contact in db.get_contacts(user_id))
+    assert names == ["Анна", "Иван", "Петр"]
+
+
+def test_console_script_accepts_session_token(db_path, db, user_id, tmp_path, capsys):
+    token = SessionManager(db).create(user_id)
+    db.close_connection()
+    script = tmp_path / "script.jsonl"
+    script.write_text(
+        json.dumps(add("Петр", "89001112233"), ensure_ascii=False) + "\n",
+        encoding="utf-8",
+    )
+    args = ["--db", db_path, "--script", str(script)]
+    assert console_app.main([*args, "--token", token]) == 0
+    captured = capsys.readouterr()
+    assert json.loads(captured.out)["ok"] is True
+    assert "succeeded: 1" in captured.err
+    assert console_app.main([*args, "--token", "неверный"]) == 2
+    assert "Неверный токен" in capsys.readouterr().err
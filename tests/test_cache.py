@@ -0,0 +1,52 @@
+import pytest
+
+from cache import CachedDatabaseManager
+
+
+@pytest.fixture
+def cached(db_path):
+    """Менеджер с кэшем и три контакта одного пользователя"""
+    manager = CachedDatabaseManager(db_path)
+    manager.add_user("user", "password")
+    user_id = manager.get_user("user").user_id
+    for number in range(3):
+        manager.add_contact(
+            user_id, f"Имя{number}", "Фамилия", f"8900000000{number}", "a@mail.ru"
+        )
+    yield manager, user_id
+    manager.close_connection()
+
+
+def test_changing_returned_contact_does_not_change_cache(cached):
+    manager, user_id = cached
+    contact_id = manager.get_contacts(user_id)[0].id
+    manager.get_contact_details(contact_id).first_name = "Чужое"
+    manager.get_contacts(user_id)[0].first_name = "Чужое"
+    manager.get_contacts_page(user_id, 2)[0].first_name = "Чужое"
+    assert manager.get_contact_details(contact_id).first_name == "Имя0"
+    assert manager.get_contacts(user_id)[0].first_name == "Имя0"
+    assert manager.get_contacts_page(user_id, 2)[0].first_name == "Имя0"
+
+
+def test_pages_are_cached_and_reset_by_edit(cached):
+    manager, user_id = cached
+    first_page = manager.get_contacts_page(user_id, 2)
+    manager.cache.reset_stats()
+    assert list(manager.iter_contacts(user_id, 2))[:2] == first_page
+    assert manager.cache_stats()["hits"] == 1
+
+    manager.edit_contact(first_page[0].id, last_name="Новая")
+    assert manager.get_contacts_page(user_id, 2)[0].last_name == "Новая"
+    assert [contact.last_name for contact in manager.iter_contacts(user_id, 2)] == [
+        "Новая",
+        "Фамилия",
+        "Фамилия",
+    ]
+
+
+def test_added_contact_appears_on_cached_page(cached):
+    manager, user_id = cached
+    last = manager.get_contacts_page(user_id, 2, after_id=2)
+    contact_id = manager.add_contact(user_id, "Новый", "Контакт", "89000000009", "")
+    page = manager.get_contacts_page(user_id, 2, after_id=2)
+    assert [contact.id for contact in page] == [last[0].id, contact_id]
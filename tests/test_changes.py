@@ -0,0 +1,68 @@
+import pytest
+
+from changes import ContactMirror
+from db import ChangeLogCompactedError
+
+
+@pytest.fixture
+def users(db):
+    """Два пользователя, id пользователей"""
+    for username in ("alice", "bob"):
+        db.add_user(username, "password")
+    return db.get_user("alice").user_id, db.get_user("bob").user_id
+
+
+def reuse_contact_id(db, alice: int, bob: int) -> int:
+    """Контакт alice удаляется, и его id достается новому контакту bob"""
+    contact_id = db.add_contact(alice, "Анна", "Петрова", "89000000001", "")
+    db.delete_contact(contact_id)
+    assert db.add_contact(bob, "Борис", "Секретов", "89000000002", "") == contact_id
+    return contact_id
+
+
+def test_changes_do_not_return_other_users_contact_with_reused_id(db, users):
+    alice, bob = users
+    reuse_contact_id(db, alice, bob)
+    changes = list(db.iter_changes(0, alice))
+    assert [change.op for change in changes] == ["insert", "delete"]
+    assert all(change.contact is None for change in changes)
+    assert [change.contact.user_id for change in db.iter_changes(0, bob)] == [bob]
+
+
+def test_compaction_keeps_delete_when_id_is_reused(db, users):
+    alice, bob = users
+    mirror = ContactMirror(db, alice)
+    mirror.sync()
+    contact_id = db.add_contact(alice, "Анна", "Петрова", "89000000001", "")
+    db.edit_contact(contact_id, last_name="Иванова")
+    mirror.sync()
+    assert mirror.contacts[contact_id].last_name == "Иванова"
+
+    db.delete_contact(contact_id)
+    db.add_contact(bob, "Борис", "Секретов", "89000000002", "")
+    assert db.compact_changes() == 2
+    assert mirror.sync() == 1
+    assert mirror.contacts == {}
+
+
+def test_mirror_syncs_incrementally_and_reloads_after_horizon(db, users):
+    alice, _ = users
+    mirror = ContactMirror(db, alice)
+    first = db.add_contact(alice, "Анна", "Петрова", "89000000001", "")
+    assert mirror.sync() == 1
+    second = db.add_contact(alice, "Вера", "Сидорова", "89000000003", "")
+    db.edit_contact(first, first_name="Аня")
+    assert mirror.sync() == 2
+    assert mirror.full_loads == 1
+    assert mirror.contacts == {
+        contact.id: contact for contact in db.get_contacts(alice)
+    }
+
+    seq = mirror.seq
+    db.delete_contact(second)
+    db.compact_changes(db.get_change_seq())
+    with pytest.raises(ChangeLogCompactedError):
+        list(db.iter_changes(seq))
+    mirror.sync()
+    assert mirror.full_loads == 2
+    assert list(mirror.contacts) == [first]
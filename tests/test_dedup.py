@@ -0,0 +1,66 @@
+from dedup import Deduplicator
+from dedup import find_groups
+from schemas.contacts import Contact
+
+
+def contact(contact_id: int, first_name: str, last_name: str, phone: str, email):
+    """Контакт пользователя 1"""
+    return Contact(contact_id, 1, first_name, last_name, phone, email)
+
+
+def test_same_phone_in_any_format_is_a_duplicate():
+    groups = find_groups(
+        [
+            contact(1, "Иван", "Петров", "8 (912) 345-67-89", None),
+            contact(2, "Ваня", "", "+79123456789", "ivan@mail.ru"),
+            contact(3, "Анна", "Сидорова", "89001112233", None),
+        ]
+    )
+    assert len(groups) == 1
+    assert groups[0].keep.id == 1
+    assert [duplicate.id for duplicate in groups[0].duplicates] == [2]
+    assert groups[0].fields == {
+        "first_name": "Иван",
+        "last_name": "Петров",
+        "phone": "8 (912) 345-67-89",
+        "email": "ivan@mail.ru",
+    }
+
+
+def test_shared_email_needs_similar_name():
+    groups = find_groups(
+        [
+            contact(1, "Иван", "Петров", "89000000001", "Family@Mail.ru"),
+            contact(2, "Ivan", "Petrov", "89000000002", "family@mail.ru "),
+            contact(3, "Мария", "Петрова", "89000000003", "family@mail.ru"),
+        ]
+    )
+    assert [
+        [group.keep.id, *(duplicate.id for duplicate in group.duplicates)]
+        for group in groups
+    ] == [[1, 2]]
+
+
+def test_run_merges_groups_in_database(db):
+    db.add_user("user", "password")
+    user_id = db.get_user("user").user_id
+    keep = db.add_contact(user_id, "Иван", "Петров", "89000000001", "")
+    duplicate = db.add_contact(user_id, "Ivan", "Petrov", "89000000002", "i@mail.ru")
+    db.add_contact(user_id, "Анна", "Сидорова", "89000000003", "i@mail.ru")
+    db.edit_contact(keep, email="I@mail.ru")
+
+    report = Deduplicator(db).run(user_id)
+    assert (report.scanned, report.groups, report.duplicates, report.merged) == (
+        3,
+        1,
+        1,
+        0,
+    )
+    report = Deduplicator(db).run(user_id, apply=True)
+    assert report.merged == 1
+    assert db.get_contact_details(duplicate) is None
+    assert [contact.first_name for contact in db.get_contacts(user_id)] == [
+        "Иван",
+        "Анна",
+    ]
+    assert Deduplicator(db).run(user_id).groups == 0
@@ -0,0 +1,48 @@
+import pytest
+
+from db import DatabaseManager
+from fuzzy import phonetic_key
+from fuzzy import similarity
+
+
+@pytest.fixture
+def fuzzy_db(db_path):
+    """Менеджер с нечетким поиском и контактами с похожими фамилиями"""
+    manager = DatabaseManager(db_path, search_mode="fuzzy")
+    manager.add_user("user", "password")
+    user_id = manager.get_user("user").user_id
+    names = [("Иван", "Иванов"), ("Пётр", "Иваненко"), ("Анна", "Петрова")]
+    for number, (first_name, last_name) in enumerate(names):
+        manager.add_contact(user_id, first_name, last_name, f"8900000000{number}", "")
+    yield manager, user_id
+    manager.close_connection()
+
+
+def test_similar_spellings_share_phonetic_key():
+    assert phonetic_key("ivanov") == phonetic_key("ivanof") == phonetic_key("iwanow")
+
+
+def test_similarity_prefers_closer_spelling():
+    assert similarity(["ivanof"], ["ivanov"]) > similarity(["ivanof"], ["ivanenko"])
+    assert similarity(["ivanov"], ["ivanov"]) == 1.0
+
+
+def test_fuzzy_search_ranks_best_match_first(fuzzy_db):
+    manager, user_id = fuzzy_db
+    found = manager.fuzzy_search(user_id, "Ivanof", time_budget_ms=None)
+    assert found[0][0].last_name == "Иванов"
+    assert "Петрова" not in [contact.last_name for contact, _ in found]
+    scores = [score for _, score in found]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_renamed_contact_is_reindexed(fuzzy_db):
+    manager, user_id = fuzzy_db
+    contact_id = manager.fuzzy_search(user_id, "Петрова")[0][0].id
+    manager.edit_contact(contact_id, last_name="Смирнова")
+    assert contact_id not in [
+        contact.id for contact, _ in manager.fuzzy_search(user_id, "Петрова")
+    ]
+    assert [contact.id for contact in manager.search_contacts(user_id, "Smirnova")] == [
+        contact_id
+    ]
@@ -0,0 +1,110 @@
+import pytest
+
+from importer import ContactImporter
+from importer import read_csv
+from importer import read_file
+from importer import read_jsonl
+
+
+@pytest.fixture
+def user_id(db):
+    """Пользователь с одним контактом"""
+    db.add_user("user", "password")
+    user_id = db.get_user("user").user_id
+    db.add_contact(user_id, "Старый", "Контакт", "89000000000", "old@mail.ru")
+    return user_id
+
+
+def row(first_name: str, phone: str, email: str = "a@mail.ru") -> dict:
+    """Строка импорта с фамилией и почтой по умолчанию"""
+    return {
+        "first_name": first_name,
+        "last_name": "Фамилия",
+        "phone": phone,
+        "email": email,
+    }
+
+
+def test_csv_reader_numbers_lines_after_header(tmp_path):
+    path = tmp_path / "contacts.csv"
+    path.write_text(
+        "first_name,last_name,phone,email\n"
+        "Иван,Петров,89123456789,i@mail.ru\n"
+        "Анна,,89001112233,\n",
+        encoding="utf-8",
+    )
+    rows = list(read_csv(str(path)))
+    assert [line_no for line_no, _ in rows] == [2, 3]
+    assert rows[0][1]["phone"] == "89123456789"
+    assert rows[1][1]["last_name"] == ""
+
+
+def test_jsonl_reader_skips_blank_lines_and_keeps_bad_ones(tmp_path):
+    path = tmp_path / "contacts.jsonl"
+    path.write_text(
+        '{"first_name": "Иван", "phone": "89123456789"}\n' "\n" "не json\n" "[1, 2]\n",
+        encoding="utf-8",
+    )
+    assert list(read_jsonl(str(path))) == [
+        (1, {"first_name": "Иван", "phone": "89123456789"}),
+        (3, {}),
+        (4, {}),
+    ]
+    assert list(read_file(str(path))) == list(read_jsonl(str(path)))
+
+
+def test_rejection_reasons(db, user_id):
+    rows = [
+        row("Пусто", ""),
+        row("Буквы", "8912abc4567"),
+        row("Формат", "+7+7+7+7+7"),
+        row("Почта", "89123456789", "не почта"),
+        row("Старый", "+7 900 000-00-00"),
+        row("Новый", "89123456789", "new@mail.ru"),
+    ]
+    report = ContactImporter(db).import_rows(user_id, enumerate(rows, start=1))
+    assert report.total == 6
+    assert report.imported == 1
+    assert report.rejected == [
+        (1, "пустой номер телефона"),
+        (2, "недопустимые символы в номере"),
+        (3, "неверный формат номера"),
+        (4, "в email нет символа @"),
+        (5, "номер телефона уже существует"),
+    ]
+
+
+def test_in_file_duplicates_are_rejected_across_batches(db, user_id):
+    rows = [
+        row("Первый", "89123456781"),
+        row("Второй", "89123456782"),
+        row("Дубль", "+7 912 345-67-81"),
+        row("Третий", "89123456783"),
+        row("Дубль", "9123456783"),
+    ]
+    report = ContactImporter(db, batch_size=2).import_rows(
+        user_id, enumerate(rows, start=1)
+    )
+    assert report.imported == 3
+    assert report.rejected == [
+        (3, "номер телефона уже существует"),
+        (5, "номер телефона уже существует"),
+    ]
+    assert [contact.first_name for contact in db.get_contacts(user_id)] == [
+        "Старый",
+        "Первый",
+        "Второй",
+        "Третий",
+    ]
+
+
+def test_numbers_without_digits_are_not_duplicates_of_each_other(db, user_id):
+    rows = [row("Первый", "-----"), row("Второй", "------")]
+    report = ContactImporter(db).import_rows(user_id, enumerate(rows, start=1))
+    assert report.rejected == []
+    assert report.imported == 2
+
+
+def test_batch_size_must_be_positive(db):
+    with pytest.raises(ValueError):
+        ContactImporter(db, batch_size=0)
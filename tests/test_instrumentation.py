@@ -0,0 +1,72 @@
+import logging
+
+import pytest
+
+from tests.conftest import run_console
+
+
+@pytest.fixture
+def stats(db):
+    """Статистика запросов менеджера с одним пользователем и двумя контактами"""
+    db.add_user("user", "password")
+    user_id = db.get_user("user").user_id
+    db.add_contact(user_id, "Иван", "Петров", "89123456789", "i@mail.ru")
+    db.add_contact(user_id, "Петр", "Сидоров", "89001112233", "p@mail.ru")
+    return db.enable_instrumentation(slow_query_ms=None), user_id
+
+
+def entry_for(snapshot: list[dict], fragment: str) -> dict:
+    """Возвращает единственную запись статистики, текст которой содержит fragment"""
+    (entry,) = [item for item in snapshot if fragment in item["sql"]]
+    return entry
+
+
+def test_queries_are_counted_and_timed(db, stats):
+    query_stats, user_id = stats
+    assert db.query_stats is query_stats
+    for _ in range(3):
+        assert len(db.get_contacts(user_id)) == 2
+    db.edit_contact(db.get_contacts(user_id)[0].id, last_name="Иванов")
+    snapshot = query_stats.snapshot()
+    select = entry_for(snapshot, "FROM contacts WHERE user_id=?")
+    assert select["count"] == 4
+    assert select["rows"] == 8
+    assert 0 < select["max_ms"] <= select["total_ms"]
+    assert select["avg_ms"] == pytest.approx(select["total_ms"] / 4)
+    assert entry_for(snapshot, "UPDATE contacts")["rows"] == 1
+    totals = [item["total_ms"] for item in snapshot]
+    assert totals == sorted(totals, reverse=True)
+
+
+def test_reset_and_disable_stop_counting(db, stats):
+    query_stats, user_id = stats
+    db.get_contacts(user_id)
+    query_stats.reset()
+    assert query_stats.snapshot() == []
+    db.disable_instrumentation()
+    db.get_contacts(user_id)
+    assert db.query_stats is None
+    assert query_stats.snapshot() == []
+
+
+def test_slow_query_is_logged_with_plan(db, stats, caplog):
+    query_stats, user_id = stats
+    query_stats.slow_query_ms = 0
+    with caplog.at_level(logging.WARNING, logger="contacts.db"):
+        db.get_contacts(user_id)
+    assert "Медленный запрос" in caplog.text
+    assert "План:" in caplog.text
+
+
+def test_console_menu_shows_query_stats(monkeypatch, capsys, db_path):
+    out = run_console(
+        monkeypatch,
+        capsys,
+        db_path,
+        ["1", "user", "secret", "2", "user", "secret"]
+        + ["0", "5", "Иван", "0", "нет", "8", "3"],
+    )
+    assert "Сбор статистики запросов включен" in out
+    assert "Статистика запросов (по суммарному времени):" in out
+    assert "FROM contacts" in out
+    assert "Кэш: попаданий" in out
@@ -0,0 +1,67 @@
+import sqlite3
+
+import pytest
+
+from migrations import SCHEMA_VERSION
+from migrations import get_version
+from tests.conftest import query_plan
+from tests.conftest import run_console
+
+
+def test_new_database_is_migrated_to_latest_version(db):
+    assert get_version(db.conn) == SCHEMA_VERSION
+
+
+def test_duplicate_check_uses_user_phone_index(db):
+    plan = query_plan(
+        db.conn,
+        "SELECT 1 FROM contacts WHERE user_id=? AND phone_norm=? LIMIT 1",
+        (1, "+79123456789"),
+    )
+    assert "ux_contacts_user_phone" in plan
+
+
+def test_global_duplicate_check_uses_phone_index(db):
+    plan = query_plan(
+        db.conn,
+        "SELECT 1 FROM contacts WHERE phone_norm=? LIMIT 1",
+        ("+79123456789",),
+    )
+    assert "idx_contacts_phone" in plan
+
+
+def test_user_contacts_use_user_index(db):
+    plan = query_plan(
+        db.conn,
+        "SELECT id, first_name FROM contacts WHERE user_id=? ORDER BY id",
+        (1,),
+    )
+    assert "idx_contacts_user_id" in plan
+    assert "SCAN contacts" not in plan
+
+
+def test_same_phone_in_other_format_is_rejected(db):
+    db.add_contact(1, "Иван", "Иванов", "8 912 345-67-89", "a@example.com")
+    with pytest.raises(sqlite3.IntegrityError):
+        db.add_contact(1, "Иван", "Дубль", "+79123456789", "b@example.com")
+    db.add_contact(2, "Иван", "Чужой", "+79123456789", "c@example.com")
+
+
+def test_console_edit_to_existing_phone_reports_duplicate(
+    monkeypatch, capsys, db_path
+):
+    out = run_console(
+        monkeypatch,
+        capsys,
+        db_path,
+        # регистрация и вход
+        ["1", "user", "secret", "2", "user", "secret"]
+        # два контакта
+        + ["1", "Анна", "Первая", "89123456789", "a@example.com", "да"]
+        + ["Борис", "Второй", "89120000000", "b@example.com", "нет"]
+        # второму контакту номер первого
+        + ["3", "", "2", "", "", "+7 912 345-67-89", ""]
+        + ["8", "3"],
+    )
+    assert "Контакт с таким номером телефона уже существует!" in out
+    assert "Контакт успешно отредактирован!" not in out
@@ -0,0 +1,43 @@
+import pytest
+
+
+@pytest.fixture
+def paged(db):
+    """Пользователь с семью контактами"""
+    db.add_user("user", "password")
+    user_id = db.get_user("user").user_id
+    ids = [
+        db.add_contact(user_id, f"Имя{i}", "Фамилия", f"8900000000{i}", "a@mail.ru")
+        for i in range(7)
+    ]
+    return user_id, ids
+
+
+def test_pages_cover_all_contacts_in_order(db, paged):
+    user_id, ids = paged
+    first = db.get_contacts_page(user_id, 3)
+    second = db.get_contacts_page(user_id, 3, after_id=first[-1].id)
+    last = db.get_contacts_page(user_id, 3, after_id=second[-1].id)
+    assert [c.id for c in first + second + last] == ids
+    assert len(last) == 1
+    assert db.get_contacts_page(user_id, 3, after_id=last[-1].id) == []
+    assert db.get_contacts_page(user_id, 3, before_id=last[0].id) == second
+
+
+def test_changes_between_pages_give_no_duplicates_or_gaps(db, paged):
+    user_id, ids = paged
+    first = db.get_contacts_page(user_id, 3)
+    db.delete_contact(ids[1])
+    db.edit_contact(ids[0], last_name="Новая")
+    db.delete_contact(ids[3])
+    db.edit_contact(ids[4], last_name="Новая")
+    rest = []
+    after_id = first[-1].id
+    while page := db.get_contacts_page(user_id, 3, after_id):
+        rest.extend(page)
+        after_id = page[-1].id
+    assert [c.id for c in rest] == [ids[4], ids[5], ids[6]]
+    assert rest[0].last_name == "Новая"
+    seen = [c.id for c in first + rest]
+    assert len(seen) == len(set(seen))
+    assert set(ids) - {ids[1], ids[3]} <= set(seen)
@@ -0,0 +1,57 @@
+import sqlite3
+import threading
+
+import pytest
+
+from db import ConnectionPool
+from db import DatabaseManager
+
+
+@pytest.fixture
+def opened(monkeypatch) -> list[sqlite3.Connection]:
+    """Список всех соединений, открытых пулами во время теста"""
+    connections = []
+    connect = ConnectionPool._connect
+
+    def record(pool: ConnectionPool) -> sqlite3.Connection:
+        conn = connect(pool)
+        connections.append(conn)
+        return conn
+
+    monkeypatch.setattr(ConnectionPool, "_connect", record)
+    return connections
+
+
+def test_readers_see_committed_data_during_write(db_path, opened):
+    manager = DatabaseManager(db_path, pool_size=4)
+    manager.add_user("user", "password")
+    user_id = manager.get_user("user").user_id
+    manager.add_contact(user_id, "Иван", "Петров", "89123456789", "i@mail.ru")
+    results = []
+    errors = []
+
+    def read() -> None:
+        try:
+            results.append(
+                [c.first_name for c in manager.get_contacts_page(user_id, 10)]
+            )
+        except Exception as error:
+            errors.append(error)
+        finally:
+            manager.release_connection()
+
+    with manager.transaction():
+        manager.add_contact(user_id, "Петр", "Сидоров", "89001112233", "p@mail.ru")
+        readers = [threading.Thread(target=read) for _ in range(3)]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+    assert errors == []
+    assert results == [["Иван"]] * 3
+    assert len(manager.get_contacts_page(user_id, 10)) == 2
+    manager.close_connection()
+    assert len(opened) > 1
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
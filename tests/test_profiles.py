@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+import console_app
+from db import DatabaseManager
+from profiles import PROFILES
+from profiles import current_pragmas
+from tests.conftest import run_console
+
+
+@pytest.mark.parametrize("profile", list(PROFILES))
+def test_new_database_gets_profile_pragmas(tmp_path, profile):
+    db = DatabaseManager(str(tmp_path / f"{profile}.db"), profile=profile)
+    pragmas = current_pragmas(db.conn)
+    db.close_connection()
+    expected = PROFILES[profile]
+    assert pragmas["page_size"] == expected["page_size"]
+    assert pragmas["journal_mode"].upper() == expected["journal_mode"]
+    assert pragmas["cache_size"] == expected["cache_size"]
+    assert (
+        pragmas["synchronous"]
+        == {"OFF": 0, "NORMAL": 1, "FULL": 2}[expected["synchronous"]]
+    )
+
+
+def test_unknown_profile_is_rejected(db_path):
+    with pytest.raises(ValueError, match="Неизвестный профиль"):
+        DatabaseManager(db_path, profile="fast")
+
+
+def test_console_uses_selected_profile(monkeypatch, capsys, db_path):
+    out = run_console(
+        monkeypatch,
+        capsys,
+        db_path,
+        ["1", "user", "secret", "3"],
+        "--profile",
+        "balanced",
+    )
+    assert "Добро пожаловать" in out
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+
+def test_console_rejects_bulk_load_profile(monkeypatch, capsys, db_path):
+    with pytest.raises(SystemExit):
+        console_app.main(["--db", db_path, "--profile", "bulk-load"])
+    monkeypatch.setenv(console_app.PROFILE_ENV, "bulk-load")
+    assert console_app.main(["--db", db_path]) == 2
+    assert "bulk-load" in capsys.readouterr().err
@@ -0,0 +1,86 @@
+import pytest
+
+from reges import ValidationResult
+from reges import normalize_phone
+from reges import validate_emails
+from reges import validate_phones
+
+
+@pytest.mark.parametrize(
+    ("phone", "normalized"),
+    [
+        ("8 (912) 345-67-89", "+79123456789"),
+        ("+7 912 345 67 89", "+79123456789"),
+        ("89123456789", "+79123456789"),
+        ("79123456789", "+79123456789"),
+        ("9123456789", "+79123456789"),
+        ("+44 20 7946 0958", "+442079460958"),
+        ("45-67-89", "456789"),
+        ("-----", None),
+        ("", None),
+    ],
+)
+def test_normalize_phone(phone, normalized):
+    assert normalize_phone(phone) == normalized
+
+
+def test_normalize_phone_uses_country_code():
+    assert normalize_phone("9123456789", country_code="375") == "+3759123456789"
+
+
+@pytest.mark.parametrize(
+    ("phone", "expected"),
+    [
+        (
+            "8 (912) 345-67-89",
+            ValidationResult("8 (912) 345-67-89", True, None, "+79123456789"),
+        ),
+        ("+79123456789", ValidationResult("+79123456789", True, None, "+79123456789")),
+        ("45-67-89", ValidationResult("45-67-89", True, None, "456789")),
+        ("-----", ValidationResult("-----", True, None, None)),
+        ("", ValidationResult("", False, "пустой номер телефона", None)),
+        (
+            "8912abc4567",
+            ValidationResult(
+                "8912abc4567", False, "недопустимые символы в номере", None
+            ),
+        ),
+        ("12", ValidationResult("12", False, "неверный формат номера", None)),
+    ],
+)
+def test_validate_phones(phone, expected):
+    assert validate_phones([phone]) == [expected]
+
+
+@pytest.mark.parametrize(
+    ("email", "expected"),
+    [
+        (
+            "Ivan.Petrov@Mail.ru",
+            ValidationResult("Ivan.Petrov@Mail.ru", True, None, "ivan.petrov@mail.ru"),
+        ),
+        (
+            "a_b-c@my-site.com",
+            ValidationResult("a_b-c@my-site.com", True, None, "a_b-c@my-site.com"),
+        ),
+        ("", ValidationResult("", False, "пустой email", None)),
+        ("mail.ru", ValidationResult("mail.ru", False, "в email нет символа @", None)),
+        (
+            "ivan@mail",
+            ValidationResult("ivan@mail", False, "неверный формат email", None),
+        ),
+        (
+            "ivan@@mail.ru",
+            ValidationResult("ivan@@mail.ru", False, "неверный формат email", None),
+        ),
+    ],
+)
+def test_validate_emails(email, expected):
+    assert validate_emails([email]) == [expected]
+
+
+def test_batches_keep_input_order():
+    phones = ["89123456789", "", "12"]
+    assert [r.value for r in validate_phones(iter(phones))] == phones
+    emails = ["a@mail.ru", "b", "c@mail.ru"]
+    assert [r.valid for r in validate_emails(emails)] == [True, False, True]
@@ -0,0 +1,81 @@
+import sqlite3
+import time
+
+import pytest
+
+from replica import ReplicatedDatabaseManager
+
+
+@pytest.fixture
+def replicated(db_path):
+    """Менеджер с репликой без фоновой синхронизации и с отставанием до часа"""
+    manager = ReplicatedDatabaseManager(
+        db_path, max_staleness=3600.0, sync_interval=None, pool_size=2
+    )
+    manager.add_user("user", "password")
+    user_id = manager.get_user("user").user_id
+    yield manager, user_id
+    manager.close_connection()
+
+
+def names(manager, user_id: int) -> list[str]:
+    """Имена контактов пользователя, прочитанные с реплики"""
+    return [contact.first_name for contact in manager.get_contacts(user_id)]
+
+
+def test_reads_lag_until_sync(replicated):
+    manager, user_id = replicated
+    contact_id = manager.add_contact(user_id, "Анна", "Петрова", "89000000001", "")
+    assert names(manager, user_id) == []
+    assert manager.replica_lag()["changes"] == 1
+
+    assert manager.replica.sync() == 1
+    assert names(manager, user_id) == ["Анна"]
+    manager.edit_contact(contact_id, first_name="Аня")
+    manager.replica.sync()
+    assert names(manager, user_id) == ["Аня"]
+    assert manager.replica_lag()["changes"] == 0
+
+
+def test_stale_replica_is_synced_before_read(replicated):
+    manager, user_id = replicated
+    manager.add_contact(user_id, "Анна", "Петрова", "89000000001", "")
+    manager.replica.synced_at = time.time() - 2 * manager.max_staleness
+    assert names(manager, user_id) == ["Анна"]
+    assert manager.replica.staleness() < 1.0
+
+
+def test_zero_staleness_reads_own_writes(replicated):
+    manager, user_id = replicated
+    manager.max_staleness = 0.0
+    contact_id = manager.add_contact(user_id, "Анна", "Петрова", "89000000001", "")
+    assert manager.get_contact_details(contact_id).first_name == "Анна"
+    manager.delete_contact(contact_id)
+    assert manager.get_contact_details(contact_id) is None
+
+
+def test_replica_is_copied_again_after_log_compaction(replicated):
+    manager, user_id = replicated
+    manager.add_contact(user_id, "Анна", "Петрова", "89000000001", "")
+    manager.add_contact(user_id, "Вера", "Сидорова", "89000000002", "")
+    manager.compact_changes(manager.get_change_seq())
+    snapshots = manager.replica.snapshots
+    assert manager.replica.sync() == 0
+    assert manager.replica.snapshots == snapshots + 1
+    assert names(manager, user_id) == ["Анна", "Вера"]
+
+
+def test_replica_reads_primary_without_changing_it(db_path):
+    manager = ReplicatedDatabaseManager(db_path, sync_interval=None)
+    try:
+        manager.add_user("user", "password")
+        user_id = manager.get_user("user").user_id
+        manager.add_contact(user_id, "Анна", "Петрова", "89000000001", "")
+        assert manager.replica.sync() == 1
+        assert names(manager, user_id) == ["Анна"]
+        with pytest.raises(sqlite3.OperationalError):
+            manager.replica._source.execute("DELETE FROM contacts")
+    finally:
+        manager.close_connection()
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ("delete",)
@@ -0,0 +1,126 @@
+import pytest
+
+from scan import AllOf
+from scan import AnyOf
+from scan import EmailDomain
+from scan import FieldRegex
+from scan import Not
+from scan import ParallelScanner
+from scan import PhonePrefix
+from scan import Predicate
+
+ROWS = [
+    (1, 1, "Иван", "Петров", "8 (912) 345-67-89", "+79123456789", "ivan@mail.ru"),
+    (2, 1, "Анна", "Смирнова", "+7 900 111-22-33", "+79001112233", "anna@corp.mail.ru"),
+    (3, 2, "John", "Smith", "+44 20 7946 0958", "+442079460958", "john@example.com"),
+    (4, 2, "Петр", "Иванов", "456789", "456789", "не почта"),
+]
+
+
+@pytest.fixture
+def contacts(db, db_path):
+    """Два пользователя с контактами, часть контактов удалена"""
+    user_ids = []
+    for name in ("first", "second"):
+        db.add_user(name, "password")
+        user_ids.append(db.get_user(name).user_id)
+    ids = {user_id: [] for user_id in user_ids}
+    for i in range(30):
+        user_id = user_ids[i % 3 == 0]
+        ids[user_id].append(
+            db.add_contact(
+                user_id, f"Имя{i}", f"Фамилия{i % 4}", f"8900{i:07d}", f"u{i}@mail.ru"
+            )
+        )
+    for contact_id in ids[user_ids[0]][3:8]:
+        db.delete_contact(contact_id)
+        ids[user_ids[0]].remove(contact_id)
+    db.close_connection()
+    return db_path, ids
+
+
+def ids_of(rows) -> list[int]:
+    """Идентификаторы строк"""
+    return [row[0] for row in rows]
+
+
+def test_predicate_is_abstract():
+    with pytest.raises(TypeError):
+        Predicate()
+
+
+@pytest.mark.parametrize(
+    ("predicate", "expected"),
+    [
+        (FieldRegex("last_name", "ов$"), [1, 4]),
+        (FieldRegex("email", r"\.com$"), [3]),
+        (PhonePrefix("8 912"), [1]),
+        (PhonePrefix("+7"), [1, 2]),
+        (EmailDomain("mail.ru"), [1, 2]),
+        (EmailDomain("mail.ru", subdomains=False), [1]),
+        (AllOf(PhonePrefix("+7"), EmailDomain("MAIL.RU", subdomains=False)), [1]),
+        (AnyOf(PhonePrefix("+44"), FieldRegex("first_name", "^пет")), [3, 4]),
+        (Not(EmailDomain("mail.ru", "example.com")), [4]),
+    ],
+)
+def test_predicates_filter_rows(predicate, expected):
+    assert ids_of(predicate.filter(ROWS)) == expected
+    assert [row[0] for row in ROWS if predicate.matches(row)] == expected
+
+
+def test_invalid_predicates_are_rejected():
+    with pytest.raises(ValueError):
+        FieldRegex("password", ".")
+    with pytest.raises(ValueError):
+        PhonePrefix("+")
+    with pytest.raises(ValueError):
+        EmailDomain()
+
+
+@pytest.mark.parametrize("owner", [None, 0, 1])
+def test_partitions_cover_rows_without_overlap(contacts, owner):
+    db_path, ids = contacts
+    user_id = None if owner is None else list(ids)[owner]
+    expected = sorted(
+        contact_id
+        for uid, contact_ids in ids.items()
+        if user_id in (None, uid)
+        for contact_id in contact_ids
+    )
+    scanner = ParallelScanner(db_path, workers=1, chunk_size=4)
+    try:
+        ranges = scanner.partitions(user_id)
+    finally:
+        scanner.close()
+    assert all(low <= high for low, high in ranges)
+    assert all(prev[1] < low for prev, (low, _) in zip(ranges, ranges[1:]))
+    covered = [
+        contact_id
+        for contact_id in expected
+        for low, high in ranges
+        if low <= contact_id <= high
+    ]
+    assert covered == expected
+    if user_id is not None:
+        sizes = [
+            sum(low <= contact_id <= high for contact_id in expected)
+            for low, high in ranges
+        ]
+        assert sizes[:-1] == [4] * (len(ranges) - 1)
+
+
+@pytest.mark.parametrize("owner", [None, 0])
+def test_process_pool_matches_serial_scan(contacts, owner):
+    db_path, ids = contacts
+    user_id = None if owner is None else list(ids)[owner]
+    predicate = AllOf(FieldRegex("last_name", "[13]$"), Not(PhonePrefix("8900000000")))
+    serial = ParallelScanner(db_path, workers=1, chunk_size=4)
+    parallel = ParallelScanner(db_path, workers=2, chunk_size=4)
+    try:
+        expected = serial.scan(predicate, user_id)
+        assert expected
+        assert parallel.scan(predicate, user_id) == expected
+        assert parallel.scan(predicate, user_id, limit=2) == expected[:2]
+    finally:
+        serial.close()
+        parallel.close()
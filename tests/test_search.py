@@ -0,0 +1,53 @@
+import pytest
+
+from db import DatabaseManager
+from db import fts_match_query
+
+
+@pytest.fixture
+def fts_db(db_path):
+    """Менеджер временной базы с поиском через FTS5 и одним контактом"""
+    manager = DatabaseManager(db_path, search_mode="fts")
+    manager.add_user("user", "password")
+    user_id = manager.get_user("user").user_id
+    manager.add_contact(user_id, "Иван", "Петров", "8 (912) 345-67-89", "i@mail.ru")
+    yield manager, user_id
+    manager.close_connection()
+
+
+def test_local_number_is_matched_in_e164():
+    assert fts_match_query("9123456789") == '"79123456789"*'
+    assert fts_match_query("8-912-345-67-89") == '"79123456789"*'
+    assert fts_match_query("+7 (912)345-67-89") == '"79123456789"*'
+
+
+def test_spaced_number_is_joined():
+    assert fts_match_query("+7 912 345 67 89") == '"79123456789"*'
+    assert fts_match_query("8 912 345-67-89") == '"79123456789"*'
+    assert fts_match_query("Иван 8 912 345 67 89") == '"Иван"* "79123456789"*'
+
+
+def test_partial_number_falls_back_to_like():
+    assert fts_match_query("912") == ""
+    assert fts_match_query("Иван 4567") == ""
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "9123456789",
+        "89123456789",
+        "+79123456789",
+        "+7 912 345 67 89",
+        "8 912 345-67-89",
+        "912",
+        "345-67",
+        "Ива",
+    ],
+)
+def test_fts_search_finds_contact_by_phone_and_name(fts_db, query):
+    manager, user_id = fts_db
+    assert manager.fts_available
+    assert [
+        contact.first_name for contact in manager.search_contacts(user_id, query)
+    ] == ["Иван"]
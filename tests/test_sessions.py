@@ -0,0 +1,22 @@
+from sessions import SessionManager
+from sessions import hash_token
+from sessions import validate_token
+from tests.conftest import query_plan
+
+
+def test_validate_token_reads_one_session(db):
+    db.add_user("user", "password")
+    user_id = db.get_user("user").user_id
+    token = SessionManager(db, ttl=60, clock=lambda: 1000.0).create(user_id)
+    assert validate_token(db, token, clock=lambda: 1059.0) == user_id
+    assert validate_token(db, token, clock=lambda: 1060.0) is None
+    assert validate_token(db, "unknown", clock=lambda: 1000.0) is None
+
+
+def test_session_lookup_uses_primary_key(db):
+    plan = query_plan(
+        db.conn,
+        "SELECT user_id FROM sessions WHERE token_hash=? AND expires_at > ?",
+        (hash_token("token"), 0.0),
+    )
+    assert "sqlite_autoindex_sessions_1" in plan
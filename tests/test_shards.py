@@ -0,0 +1,98 @@
+import sqlite3
+
+import pytest
+
+from shards import HashRing
+from shards import ShardedDatabaseManager
+from shards import contact_owner
+from shards import shard_names
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Хранилище из двух шардов, 20 пользователей по 2 контакта"""
+    manager = ShardedDatabaseManager(str(tmp_path / "store"), shard_count=2)
+    contact_ids = {}
+    for number in range(20):
+        manager.add_user(f"user{number}", "password")
+        user_id = manager.get_user(f"user{number}").user_id
+        contact_ids[user_id] = [
+            manager.add_contact(
+                user_id, f"Имя{number}", "Фамилия", f"8900{number:03d}000{i}", ""
+            )
+            for i in range(2)
+        ]
+    yield manager, contact_ids
+    manager.close_connection()
+
+
+def shard_rows(path: str, name: str) -> list[tuple[int, int]]:
+    """Читает (user_id, id) контактов из файла шарда"""
+    with sqlite3.connect(f"{path}/{name}.db") as conn:
+        return conn.execute("SELECT user_id, id FROM contacts").fetchall()
+
+
+def test_growing_ring_moves_users_only_to_new_shard():
+    old = HashRing(shard_names(4))
+    new = HashRing(shard_names(5))
+    moved = [
+        user_id
+        for user_id in range(1, 2001)
+        if old.shard_for(user_id) != new.shard_for(user_id)
+    ]
+    assert {new.shard_for(user_id) for user_id in moved} == {"shard_4"}
+    assert 0.1 < len(moved) / 2000 < 0.3
+
+
+def test_rebalance_moves_contacts_with_their_ids(store):
+    manager, contact_ids = store
+    before = {user_id: manager.shard_of(user_id) for user_id in contact_ids}
+    moved = manager.rebalance(4)
+    changed = [
+        user_id
+        for user_id in contact_ids
+        if manager.shard_of(user_id) != before[user_id]
+    ]
+    assert moved == len(changed) > 0
+    assert sum(manager.placement_counts().values()) == len(contact_ids)
+
+    for user_id, ids in contact_ids.items():
+        assert manager.shard_of(user_id) == manager.ring.shard_for(user_id)
+        assert [contact.id for contact in manager.get_contacts(user_id)] == ids
+        assert all(contact_owner(contact_id) == user_id for contact_id in ids)
+        assert manager.get_contact_details(ids[0]).user_id == user_id
+
+    for name in shard_names(4):
+        for user_id, _ in shard_rows(manager.path, name):
+            assert manager.shard_of(user_id) == name
+    assert manager.rebalance(4) == 0
+
+
+def test_placement_survives_reopen(store):
+    manager, contact_ids = store
+    manager.rebalance(3)
+    placement = {user_id: manager.shard_of(user_id) for user_id in contact_ids}
+    reopened = ShardedDatabaseManager(manager.path, shard_count=2)
+    assert {user_id: reopened.shard_of(user_id) for user_id in contact_ids} == placement
+    user_id = next(iter(contact_ids))
+    assert [contact.id for contact in reopened.get_contacts(user_id)] == contact_ids[
+        user_id
+    ]
+    reopened.close_connection()
+
+
+def test_deleted_contact_id_is_not_reused(store):
+    manager, contact_ids = store
+    user_id, (first, last) = next(iter(contact_ids.items()))
+    manager.delete_contact(last)
+    added = manager.add_contact(user_id, "Новый", "Фамилия", "89990000001", "")
+    assert added == last + 1
+    manager.delete_contact(added)
+    target = next(name for name in shard_names(2) if name != manager.shard_of(user_id))
+    assert manager.move_user(user_id, target)
+    manager.add_contacts(
+        [(user_id, "Пачка", "Фамилия", f"8999000000{i}", "") for i in range(2, 4)]
+    )
+    ids = [contact.id for contact in manager.get_contacts(user_id)]
+    assert ids == [first, added + 1, added + 2]
+    assert all(contact_owner(contact_id) == user_id for contact_id in ids)
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from db import DatabaseManager
+from snapshot import export_snapshot
+from snapshot import read_snapshot
+from snapshot import restore_snapshot
+
+ROWS = [
+    ("Иван", "Петров", "89123456780", "ivan@mail.ru"),
+    ("Анна", "Сидорова", "89123456781", None),
+    ("John", "", "89123456782", "john@example.com"),
+    ("Пётр", "Ёлкин", "89123456783", "пётр@почта.рф"),
+    ("Мария", "Иванова", "89123456784", "maria@mail.ru"),
+]
+
+
+@pytest.fixture
+def snapshot(db, tmp_path):
+    """Снимок пяти контактов одного пользователя кусками по 2 строки"""
+    db.add_user("user", "password")
+    user_id = db.get_user("user").user_id
+    db.add_contacts([(user_id, *row) for row in ROWS])
+    path = str(tmp_path / "contacts.snap")
+    assert export_snapshot(db, path, user_id, chunk_size=2) == len(ROWS)
+    return path, user_id
+
+
+def contact_rows(db: DatabaseManager, user_id: int) -> list[tuple]:
+    """Поля контактов пользователя без id в порядке добавления"""
+    return [contact.as_tuple()[1:] for contact in db.iter_contacts(user_id)]
+
+
+def test_snapshot_is_read_in_chunks(snapshot):
+    path, user_id = snapshot
+    chunks = list(read_snapshot(path))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [row for chunk in chunks for row in chunk] == [
+        (user_id, *row) for row in ROWS
+    ]
+
+
+@pytest.mark.parametrize("bulk", [True, False])
+def test_restore_round_trip(snapshot, tmp_path, bulk):
+    path, user_id = snapshot
+    target = DatabaseManager(str(tmp_path / "restored.db"))
+    target.add_user("other", "password")
+    other_id = target.get_user("other").user_id
+    assert restore_snapshot(target, path, other_id, bulk=bulk) == len(ROWS)
+    assert contact_rows(target, other_id) == [(other_id, *row) for row in ROWS]
+    assert [
+        contact.first_name for contact in target.search_contacts(other_id, "Ёлк")
+    ] == ["Пётр"]
+    target.close_connection()
+
+
+def test_truncated_snapshot_is_rejected_and_rolled_back(snapshot, tmp_path):
+    path, user_id = snapshot
+    truncated = str(tmp_path / "truncated.snap")
+    with open(path, "rb") as src, open(truncated, "wb") as dst:
+        dst.write(src.read()[: os.path.getsize(path) - 10])
+    with pytest.raises(ValueError, match="обрезан"):
+        list(read_snapshot(truncated))
+
+    target = DatabaseManager(str(tmp_path / "restored.db"))
+    with pytest.raises(ValueError, match="обрезан"):
+        restore_snapshot(target, truncated, user_id)
+    assert target.get_contacts(user_id) == []
+    target.close_connection()
+
+
+def test_file_without_magic_is_rejected(tmp_path):
+    path = tmp_path / "contacts.csv"
+    path.write_text("user_id,first_name,last_name,phone,email\n")
+    with pytest.raises(ValueError, match="не является снимком"):
+        list(read_snapshot(str(path)))
@@ -0,0 +1,53 @@
+import pytest
+
+from schemas.users import User
+from utils import _legacy_hash
+from utils import hash_password
+from utils import needs_rehash
+from utils import verify_password
+
+
+def test_constructor_keeps_positional_order_and_hashes_password():
+    user = User(1, "89123456789", "user", "secret")
+    assert (user.user_id, user.phone, user.username) == (1, "89123456789", "user")
+    assert user.password != "secret"
+    assert verify_password("secret", user.password)
+
+
+def test_user_from_database_keeps_stored_hash(db):
+    db.add_user("user", "secret")
+    _, password_hash = db.get_user_credentials("user")
+    user = db.get_user("user")
+    assert user.username == "user"
+    assert user.password == password_hash
+
+
+def test_legacy_hash_is_upgraded_only_on_successful_login(db):
+    db.add_user_hash("user", _legacy_hash("secret"))
+    legacy = db.get_user_credentials("user")[1]
+    assert db.authenticate_user("user", "wrong") is None
+    assert db.get_user_credentials("user")[1] == legacy
+    user_id = db.authenticate_user("user", "secret")
+    assert user_id == db.get_user("user").user_id
+    _, password_hash = db.get_user_credentials("user")
+    assert not needs_rehash(password_hash)
+    assert verify_password("secret", password_hash)
+    assert db.authenticate_user("user", "secret") == user_id
+    assert db.get_user_credentials("user")[1] == password_hash
+
+
+@pytest.mark.parametrize(
+    "stored_hash",
+    [
+        None,
+        b"bytes",
+        "",
+        "пароль",
+        "scrypt$",
+        "scrypt$x$8$1$00$00",
+        "scrypt$16384$8$1$zz$00",
+        hash_password("secret")[:-1] + "я",
+    ],
+)
+def test_malformed_hash_does_not_match(stored_hash):
+    assert verify_password("secret", stored_hash) is False
@@ -0,0 +1,82 @@
+import sqlite3
+
+import pytest
+
+from db import DatabaseManager
+
+
+@pytest.fixture
+def contacts(db):
+    """Два контакта одного пользователя, отложенная запись включена"""
+    db.add_user("user", "password")
+    user_id = db.get_user("user").user_id
+    first = db.add_contact(user_id, "Иван", "Петров", "89123456789", "i@mail.ru")
+    second = db.add_contact(user_id, "Петр", "Сидоров", "89001112233", "p@mail.ru")
+    db.enable_write_behind(max_pending=100, max_delay=60.0)
+    return first, second
+
+
+def stored_last_name(db_path: str, contact_id: int) -> str | None:
+    """Читает фамилию контакта отдельным соединением, минуя очередь менеджера"""
+    with sqlite3.connect(db_path) as conn:
+        row = conn.execute(
+            "SELECT last_name FROM contacts WHERE id=?", (contact_id,)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def test_edit_is_queued_until_read(db, db_path, contacts):
+    first, _ = contacts
+    db.edit_contact(first, last_name="Иванов")
+    assert stored_last_name(db_path, first) == "Петров"
+    assert db.get_contact_details(first).last_name == "Иванов"
+    assert stored_last_name(db_path, first) == "Иванов"
+
+
+def test_close_writes_queued_operations(db_path, contacts, db):
+    first, second = contacts
+    db.edit_contact(first, last_name="Иванов")
+    db.delete_contact(second)
+    db.close_connection()
+    assert stored_last_name(db_path, first) == "Иванов"
+    assert stored_last_name(db_path, second) is None
+
+
+def test_rejected_edit_does_not_block_other_operations(db, db_path, contacts):
+    first, second = contacts
+    db.edit_contact(second, phone="8 (912) 345-67-89")
+    db.edit_contact(first, last_name="Иванов")
+    rejected = db.flush()
+    assert list(rejected) == [second]
+    assert isinstance(rejected[second], sqlite3.IntegrityError)
+    assert stored_last_name(db_path, first) == "Иванов"
+    assert db.get_contact_details(second).phone == "89001112233"
+    assert db.flush() == {}
+
+
+def test_rejected_edit_does_not_break_reads_and_close(db_path, contacts, db):
+    first, second = contacts
+    db.edit_contact(second, phone="89123456789")
+    db.edit_contact(first, last_name="Иванов")
+    assert db.get_contact_details(first).last_name == "Иванов"
+    db.edit_contact(first, first_name="Иоанн")
+    db.close_connection()
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute(
+            "SELECT first_name FROM contacts WHERE id=?", (first,)
+        ).fetchone() == ("Иоанн",)
+
+
+def test_other_errors_return_operations_to_queue(db, contacts, monkeypatch):
+    first, _ = contacts
+    db.edit_contact(first, last_name="Иванов")
+
+    def locked(pending):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(db, "_write_pending", locked)
+    with pytest.raises(sqlite3.OperationalError):
+        db.flush()
+    monkeypatch.undo()
+    assert db.flush() == {}
+    assert db.get_contact_details(first).last_name == "Иванов"
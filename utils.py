@@ -1,8 +1,79 @@
-import hashlib
+import os
 
+SCRYPT_N = 2**14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_SIZE = 16
+KEY_SIZE = 64
+
+
+def _legacy_hash(password: str) -> str:
+    """Хэширует пароль одним SHA-512 без соли, как в старых записях таблицы users"""
+    import hashlib
 
-def hash_password(password: str) -> str:
-    """Хэширует пароль с использованием SHA-512"""
     binary_password: bytes = password.encode()
     hashed_password: str = hashlib.sha512(binary_password).hexdigest()
     return hashed_password
+
+
+def hash_password(
+    password: str, n: int = SCRYPT_N, r: int = SCRYPT_R, p: int = SCRYPT_P
+) -> str:
+    """
+    Хэширует пароль с солью с помощью scrypt
+
+    Параметры стоимости и соль сохраняются в результате в виде
+    "scrypt$n$r$p$соль$хэш", поэтому их можно менять без потери старых паролей
+
+    hashlib и hmac импортируются при первом обращении: загрузка OpenSSL заметна
+    на старте приложения, а пароль нужен только при входе и регистрации
+    """
+    import hashlib
+
+    salt = os.urandom(SALT_SIZE)
+    key = hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r, dklen=KEY_SIZE
+    )
+    return f"scrypt${n}${r}${p}${salt.hex()}${key.hex()}"
+
+
+def verify_password(password: str, stored_hash: str) -> bool:
+    """
+    Проверяет пароль по сохраненному хэшу за время, не зависящее от совпадения
+
+    Поддерживает и хэши scrypt, и старые хэши SHA-512 без соли.
+    Поврежденный или отсутствующий хэш считается несовпадением
+    """
+    import hashlib
+    import hmac
+
+    if not isinstance(stored_hash, str):
+        return False
+    if not stored_hash.startswith("scrypt$"):
+        try:
+            return hmac.compare_digest(_legacy_hash(password), stored_hash)
+        except TypeError:
+            return False
+    try:
+        _, n, r, p, salt, key = stored_hash.split("$")
+        n, r, p = int(n), int(r), int(p)
+        expected = bytes.fromhex(key)
+        candidate = hashlib.scrypt(
+            password.encode(),
+            salt=bytes.fromhex(salt),
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r,
+            dklen=len(expected),
+        )
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(candidate, expected)
+
+
+def needs_rehash(
+    stored_hash: str, n: int = SCRYPT_N, r: int = SCRYPT_R, p: int = SCRYPT_P
+) -> bool:
+    """Возвращает True, если хэш старого формата или посчитан с другими параметрами"""
+    return not stored_hash.startswith(f"scrypt${n}${r}${p}$")